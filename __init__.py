@@ -0,0 +1,79 @@
+'''
+__init__.py
+
+Lazy entry point, the module holding a name is only imported on first access
+
+'''
+
+import importlib
+
+# name -> module, the modules import each other by top level name
+_lazy_attributes = {
+    'MyFantasyLeagueAPISession' : 'session',
+    'AsyncMyFantasyLeagueAPISession' : 'async_session',
+    'MFLTransport' : 'mfl_transport',
+    'MFLRetryPolicy' : 'mfl_transport',
+    'MFLCircuitBreaker' : 'mfl_transport',
+    'MFLCircuitOpenError' : 'mfl_transport',
+    'MFLResponseCache' : 'mfl_cache',
+    'MFLMemoryCacheBackend' : 'mfl_cache',
+    'MFLSqliteCacheBackend' : 'mfl_cache',
+    'MFLRecordingTransport' : 'mfl_replay',
+    'MFLReplayTransport' : 'mfl_replay',
+    'MFLReplayMissError' : 'mfl_replay',
+    'MFLSingleFlight' : 'mfl_singleflight',
+    'MFLHooks' : 'mfl_metrics',
+    'MFLMetricsCollector' : 'mfl_metrics',
+    'MFLCookieStore' : 'mfl_cookie_store',
+    'MFLPlayerStore' : 'mfl_player_store',
+    'MFLBatchEngine' : 'mfl_batch',
+    'LiveScoringPoller' : 'mfl_live_scoring',
+    'LeagueState' : 'mfl_league_state',
+    'MFLHistoryLoader' : 'mfl_history',
+    'MFLPipeline' : 'mfl_pipeline',
+    'MFLRuleSet' : 'mfl_scoring',
+    'MFLScoringEngine' : 'mfl_scoring',
+    'get_decoder' : 'mfl_json',
+    'MFLLoginRequest' : 'mfl_request',
+    'MFLRostersRequest' : 'mfl_request',
+    'MFLPlayersRequest' : 'mfl_request',
+    'MFLLeagueRequest' : 'mfl_request',
+    'MFLLiveScoringRequest' : 'mfl_request',
+    'MFLPlayerScoresRequest' : 'mfl_request',
+    'MFLTransactionsRequest' : 'mfl_request',
+    'MFLStandingsRequest' : 'mfl_request',
+    'MFLScheduleRequest' : 'mfl_request',
+    'MFLProjectedScoresRequest' : 'mfl_request',
+    'MFLDraftResultsRequest' : 'mfl_request',
+    'MFLRulesRequest' : 'mfl_request',
+    'MFLEndpoint' : 'mfl_request',
+    'MFLParam' : 'mfl_request',
+    'endpoints' : 'mfl_request',
+    'MFLResponse' : 'mfl_response',
+    'MFLResponseError' : 'mfl_response',
+    'MFLHTTPError' : 'mfl_response',
+    'MFLRostersResponse' : 'mfl_response',
+    'MFLPlayersResponse' : 'mfl_response',
+    'MFLLeagueResponse' : 'mfl_response',
+    'MFLLiveScoringResponse' : 'mfl_response',
+    'MFLPlayerScoresResponse' : 'mfl_response',
+    'MFLTransactionsResponse' : 'mfl_response',
+    'MFLStandingsResponse' : 'mfl_response',
+    'MFLScheduleResponse' : 'mfl_response',
+    'MFLProjectedScoresResponse' : 'mfl_response',
+    'MFLDraftResultsResponse' : 'mfl_response',
+    'MFLRulesResponse' : 'mfl_response',
+}
+
+__all__ = list(_lazy_attributes)
+
+def __getattr__(name):
+    module_name = _lazy_attributes.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,97 @@
+'''
+async_session.py
+
+AsyncMyFantasyLeagueAPISession object
+
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+from session import MyFantasyLeagueAPISession, add_endpoint_methods
+from mfl_response import MFLResponse
+from mfl_transport import MFLTransport
+import asyncio
+import functools
+
+class AsyncMyFantasyLeagueAPISession():
+    """Asyncio version of MyFantasyLeagueAPISession.
+
+    Every call runs the blocking MFL request on a worker thread that shares the session's pooled
+    transport, and a semaphore bounds how many calls are in flight at once. There is an async method
+    for every endpoint in the request registry, generated like MyFantasyLeagueAPISession's, taking the
+    same arguments and returning the same MFL*Response types as the blocking method it runs. Any other keyword
+    argument (player_store, singleflight, hooks, cookie_store, json_decoder) is passed on to the wrapped
+    MyFantasyLeagueAPISession.
+
+    Attributes:
+        session (MyFantasyLeagueAPISession): The wrapped blocking session.
+        max_concurrency (int): Maximum number of concurrent MFL requests.
+
+    """
+
+    def __init__(self, year, league_id="", username="", password="", transport: MFLTransport=None, max_concurrency: int=10, **session_options):
+        if transport is None:
+            transport = MFLTransport(pool_maxsize=max_concurrency)
+
+        self.session = MyFantasyLeagueAPISession(year, league_id, username, password, transport, **session_options)
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    @classmethod
+    def initalize_generic_session(cls, year, max_concurrency: int=10, **session_options):
+        return cls(year, max_concurrency=max_concurrency, **session_options)
+
+    @classmethod
+    def initialize_league_session(cls, year, league_id, max_concurrency: int=10, **session_options):
+        return cls(year, league_id, max_concurrency=max_concurrency, **session_options)
+
+    @classmethod
+    async def initialize_authenticated_league_session(cls, year, league_id, username, password, max_concurrency: int=10, **session_options):
+        new_instance = cls(year, league_id, username, password, max_concurrency=max_concurrency, **session_options)
+        await new_instance.login()
+        return new_instance
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    async def _call(self, method: str, *args, **kwargs):
+        """Run a MyFantasyLeagueAPISession method on the worker pool once a concurrency slot is free"""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(getattr(self.session, method), *args, **kwargs))
+
+    async def login(self):
+        await self._call('login')
+
+    async def gather_many(self, calls, return_exceptions: bool=False) -> list:
+        """Run many session calls concurrently, bounded by max_concurrency
+
+        Args:
+            calls: Iterable of (method, league_id, kwargs) tuples, e.g. ('live_scoring', '12345', {'week' : 3}).
+                    kwargs may be None.
+            return_exceptions: When True, failed calls return their exception instead of raising.
+
+        Returns:
+            List of MFL*Response objects in the same order as calls
+        """
+        coroutines = [getattr(self, method)(league_id, **(kwargs or {})) for method, league_id, kwargs in calls]
+        return await asyncio.gather(*coroutines, return_exceptions=return_exceptions)
+
+def async_endpoint_method(endpoint):
+    """An async session method running the blocking registry endpoint method on the worker pool"""
+    async def method(self, league_id: str=None, *args, **kwargs) -> MFLResponse:
+        return await self._call(endpoint.method, league_id, *args, **kwargs)
+
+    method.__name__ = endpoint.method
+    method.__qualname__ = f"AsyncMyFantasyLeagueAPISession.{endpoint.method}"
+    method.__doc__ = f"See MyFantasyLeagueAPISession.{endpoint.method}"
+    return method
+
+add_endpoint_methods(AsyncMyFantasyLeagueAPISession, async_endpoint_method)
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+# the library modules live at the repository root, the stub server and payloads with the tests
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'tests'))
+sys.path.insert(0, root)
+
+from mfl_stub import MFLStubServer
+
+@pytest.fixture
+def stub():
+    with MFLStubServer() as server:
+        yield server
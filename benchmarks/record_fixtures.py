@@ -0,0 +1,44 @@
+'''
+record_fixtures.py
+
+Records the export archive replayed by the benchmarks, run from the repository root:
+
+    python benchmarks/record_fixtures.py
+
+'''
+
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'tests'))
+sys.path.insert(0, root)
+
+import payloads
+from mfl_replay import MFLRecordingTransport
+from mfl_stub import MFLStubServer
+
+archive_path = os.path.join(root, 'benchmarks', 'fixtures', 'exports.zip')
+year, league_id, week = 2024, '12345', 3
+
+# a 12 team league with 30 man rosters and the 2500 player universe MFL returns with details
+bodies = {
+    'rosters' : payloads.rosters(franchises=12, players=30, week=week),
+    'players' : payloads.players(2500, details=True),
+    'liveScoring' : payloads.live_scoring(franchises=12, players=22, week=week),
+    'playerScores' : payloads.player_scores(2000, week=week),
+}
+
+def record(path: str=archive_path):
+    if os.path.exists(path):
+        os.remove(path)
+    with MFLStubServer(bodies, compress=False) as server:
+        session = server.session(year, league_id, transport=MFLRecordingTransport(path, compress=False))
+        session.rosters(week=week)
+        session.players(details=True)
+        session.live_scoring(week=week)
+        session.player_scores(week=week)
+        session.close()
+
+if __name__ == '__main__':
+    record()
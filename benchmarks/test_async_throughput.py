@@ -0,0 +1,45 @@
+import asyncio
+
+import payloads
+from async_session import AsyncMyFantasyLeagueAPISession
+
+leagues = [str(10000 + index) for index in range(40)]
+latency = 0.02
+
+def serve(stub):
+    # every league answers after a simulated network round trip
+    stub.bodies['liveScoring'] = payloads.live_scoring()
+    stub.delays['liveScoring'] = latency
+
+def test_sync_sequential(benchmark, stub):
+    serve(stub)
+    session = stub.session(2024)
+
+    def run():
+        return [session.live_scoring(league_id, week=1) for league_id in leagues]
+
+    responses = benchmark.pedantic(run, rounds=5, warmup_rounds=1)
+    # stats is None under --benchmark-disable
+    if benchmark.stats is not None:
+        benchmark.extra_info['leagues_per_second'] = len(leagues) / benchmark.stats.stats.mean
+    assert len(responses) == len(leagues)
+    session.close()
+
+def test_async_gather(benchmark, stub):
+    serve(stub)
+    # the session's semaphore belongs to the loop it first waited on, every round runs on the same loop
+    loop = asyncio.new_event_loop()
+    session = AsyncMyFantasyLeagueAPISession(2024, max_concurrency=10)
+    stub.configure(session.session)
+    calls = [('live_scoring', league_id, {'week' : 1}) for league_id in leagues]
+
+    def run():
+        return loop.run_until_complete(session.gather_many(calls))
+
+    responses = benchmark.pedantic(run, rounds=5, warmup_rounds=1)
+    # stats is None under --benchmark-disable
+    if benchmark.stats is not None:
+        benchmark.extra_info['leagues_per_second'] = len(leagues) / benchmark.stats.stats.mean
+    assert len(responses) == len(leagues)
+    session.close()
+    loop.close()
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from mfl_json import get_decoder
+from mfl_replay import MFLArchive
+
+archive_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'exports.zip')
+
+def recorded_bodies() -> dict:
+    archive = MFLArchive(archive_path)
+    return {entry['params']['TYPE'] : archive.bodies[key] for key, entry in archive.index.items()}
+
+bodies = recorded_bodies()
+
+def decoder(name):
+    try:
+        return get_decoder(name)
+    except ImportError as error:
+        pytest.skip(str(error))
+
+@pytest.mark.parametrize('request_type', sorted(bodies))
+@pytest.mark.parametrize('name', ['stdlib', 'orjson', 'simdjson'])
+def test_decode(benchmark, name, request_type):
+    """Decode one recorded export body"""
+    benchmark.group = request_type
+    decode = decoder(name)
+    body = bodies[request_type]
+    benchmark.extra_info['body_bytes'] = len(body)
+    assert benchmark(decode, body) is not None
+
+@pytest.mark.parametrize('name', ['stdlib', 'orjson', 'simdjson'])
+def test_decode_and_build_players(benchmark, name):
+    """Decode the players export with details and build the players view, the parse path MFLPlayersResponse takes"""
+    from mfl_response import MFLPlayersResponse
+    from mfl_transport import build_response
+
+    decode = decoder(name)
+    response = build_response('http://stub/2024/export', 200, {}, bodies['players'])
+    players = benchmark(lambda: MFLPlayersResponse(response, decoder=decode).players)
+    assert len(players) == 2500
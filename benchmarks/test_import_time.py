@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_time(module: str) -> int:
+    """Cumulative microseconds python -X importtime reports for importing module in a fresh interpreter"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"], cwd=root, capture_output=True, text=True, check=True)
+    for line in reversed(result.stderr.splitlines()):
+        _, cumulative, name = line.split('|')
+        if name.strip() == module:
+            return int(cumulative)
+    raise LookupError(module)
+
+def test_session_import(benchmark):
+    benchmark.extra_info['cumulative_us'] = benchmark.pedantic(import_time, args=('session',), rounds=10)
+
+def test_transport_import(benchmark):
+    """For comparison, what a session pays once it creates its transport"""
+    benchmark.extra_info['cumulative_us'] = benchmark.pedantic(import_time, args=('mfl_transport',), rounds=10)
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from mfl_replay import MFLReplayTransport
+from session import MyFantasyLeagueAPISession
+
+archive_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'exports.zip')
+week = 3
+
+@pytest.fixture(scope='module')
+def session():
+    # the archive is recorded by benchmarks/record_fixtures.py, replayed without any network access
+    session = MyFantasyLeagueAPISession(2024, '12345', transport=MFLReplayTransport(archive_path))
+    yield session
+    session.close()
+
+def test_rosters(benchmark, session):
+    rosters = benchmark(lambda: session.rosters(week=week).rosters)
+    assert len(rosters) == 12
+
+def test_players_details(benchmark, session):
+    players = benchmark(lambda: session.players(details=True).players)
+    assert len(players) == 2500
+
+def test_players_details_streamed(benchmark, session):
+    count = benchmark(lambda: sum(1 for _ in session.players(details=True, stream=True).iter_players()))
+    assert count == 2500
+
+def test_live_scoring(benchmark, session):
+    franchises = benchmark(lambda: session.live_scoring(week=week).franchise_live_scoring)
+    assert len(franchises) == 12
+
+def test_player_scores(benchmark, session):
+    player_scores = benchmark(lambda: session.player_scores(week=week).player_scores)
+    assert len(player_scores) == 2000
@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+import payloads
+
+numpy = pytest.importorskip('numpy')
+
+from mfl_pipeline import MFLPipeline
+
+leagues = [str(10000 + index) for index in range(48)]
+weeks = [1, 2]
+
+@pytest.mark.parametrize('workers', sorted({1, 4, os.cpu_count() or 1}))
+def test_pipeline_throughput(benchmark, stub, workers):
+    stub.bodies['rosters'] = payloads.rosters()
+    stub.bodies['playerScores'] = payloads.player_scores(500)
+    pipeline = MFLPipeline(2024, max_workers=workers, session_options={'host' : stub.host, 'protocol' : 'http'})
+
+    # every round starts its own pool, worker start up is part of the cost of a run
+    result = benchmark.pedantic(pipeline.run, args=(leagues, weeks), rounds=3, warmup_rounds=1)
+    benchmark.extra_info['workers'] = workers
+    # stats is None under --benchmark-disable
+    if benchmark.stats is not None:
+        benchmark.extra_info['leagues_per_second'] = len(leagues) / benchmark.stats.stats.mean
+    assert result.errors == []
+    assert len(result.rosters) == len(leagues) * 12 * 30
+    assert len(result.scores) == len(leagues) * len(weeks) * 500
@@ -0,0 +1,28 @@
+import pytest
+
+import payloads
+from mfl_transport import MFLTransport
+
+requests_per_round = 50
+
+@pytest.mark.parametrize('keep_alive', [True, False], ids=['pooled', 'connection_per_request'])
+def test_sequential_requests(benchmark, stub, keep_alive):
+    """50 sequential rosters requests, requests per second and TCP connections opened are in extra_info"""
+    stub.bodies['rosters'] = payloads.rosters(franchises=2, players=5)
+    session = stub.session(2024, '12345', transport=MFLTransport(keep_alive=keep_alive))
+
+    rounds = []
+
+    def run():
+        rounds.append(None)
+        for _ in range(requests_per_round):
+            session.rosters()
+
+    # a single round runs under --benchmark-disable, count the rounds rather than assume them
+    benchmark.pedantic(run, rounds=10, warmup_rounds=1)
+    # stats is None under --benchmark-disable
+    if benchmark.stats is not None:
+        benchmark.extra_info['requests_per_second'] = requests_per_round / benchmark.stats.stats.mean
+    benchmark.extra_info['connections_per_round'] = stub.connections / len(rounds)
+    assert stub.connections == (1 if keep_alive else requests_per_round * len(rounds))
+    session.close()
@@ -0,0 +1,63 @@
+import gc
+import json
+import tracemalloc
+
+import pytest
+
+import payloads
+from mfl_json import stdlib_decoder
+from mfl_response import MFLLiveScoringResponse, MFLPlayerScoresResponse, MFLRostersResponse, as_list, dig
+from mfl_transport import build_response
+
+weeks = range(1, 18)
+
+@pytest.fixture(scope='module')
+def season() -> list:
+    """Encoded rosters, playerScores and liveScoring bodies of a 12 team league for 17 weeks"""
+    return [(json.dumps(payloads.rosters(12, 30, week)).encode(), json.dumps(payloads.player_scores(2000, week)).encode(),
+                json.dumps(payloads.live_scoring(12, 22, week)).encode()) for week in weeks]
+
+def record_views(rosters_body, scores_body, live_body) -> tuple:
+    responses = [response_type(build_response('http://stub/2024/export', 200, {}, body), decoder=stdlib_decoder)
+                    for response_type, body in ((MFLRostersResponse, rosters_body), (MFLPlayerScoresResponse, scores_body),
+                                                (MFLLiveScoringResponse, live_body))]
+    return responses[0].rosters, responses[1].player_scores, responses[2].franchise_live_scoring
+
+def dict_views(rosters_body, scores_body, live_body) -> tuple:
+    """The views as they were built before the record types, one dict of strings per player"""
+    rosters = {franchise['id'] : {'week' : franchise['week'], 'players' : {player['id'] : {'status' : player['status'], 'salary' : player['salary']}
+                                    for player in as_list(franchise.get('player'))}}
+                for franchise in as_list(dig(json.loads(rosters_body), 'rosters', 'franchise'))}
+    player_scores = {player['id'] : {'score' : player['score'], 'isAvailable' : player['isAvailable']}
+                        for player in as_list(dig(json.loads(scores_body), 'playerScores', 'playerScore'))}
+    live_scoring = {}
+    for matchup in as_list(dig(json.loads(live_body), 'liveScoring', 'matchup')):
+        for franchise in as_list(matchup.get('franchise')):
+            players = {player['id'] : {key : value for key, value in player.items() if key != 'id'}
+                        for player in as_list(dig(franchise, 'players', 'player'))}
+            live_scoring[franchise['id']] = {key : franchise[key] for key in ('playersCurrentlyPlaying', 'isHome', 'gameSecondsRemaining',
+                                                                                'playersYetToPlay', 'score')}
+            live_scoring[franchise['id']]['players'] = players
+    return rosters, player_scores, live_scoring
+
+def retained_memory(build, season) -> int:
+    """Bytes still traced once the views of every week are built and the decoded JSON is gone"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        views = [build(*bodies) for bodies in season]
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del views
+    return retained
+
+@pytest.mark.parametrize('build', [record_views, dict_views], ids=['records', 'dicts'])
+def test_season_views_memory(benchmark, season, build):
+    """Memory retained by 17 weeks of rosters, player scores and live scoring views, in extra_info"""
+    retained = benchmark.pedantic(retained_memory, args=(build, season), rounds=3)
+    benchmark.extra_info['retained_bytes'] = retained
+
+def test_records_retain_less_than_dicts(season):
+    assert retained_memory(record_views, season) < retained_memory(dict_views, season) / 2
@@ -0,0 +1,33 @@
+import json
+
+import payloads
+from mfl_response import MFLRostersResponse
+from mfl_transport import build_response
+
+reads = 100
+
+def make_response():
+    body = json.dumps(payloads.rosters()).encode()
+    return MFLRostersResponse(build_response('http://stub/2024/export', 200, {'Content-Type' : 'application/json'}, body))
+
+def test_repeated_reads_cached(benchmark):
+    response = make_response()
+
+    def read():
+        for _ in range(reads):
+            response.rosters
+            response.week
+
+    benchmark(read)
+
+def test_repeated_reads_rebuilt(benchmark):
+    # every read decodes the body and rebuilds the view, as before the views were cached
+    response = make_response()
+
+    def read():
+        for _ in range(reads):
+            response.invalidate()
+            response.rosters
+            response.week
+
+    benchmark(read)
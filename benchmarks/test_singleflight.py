@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+import payloads
+from mfl_singleflight import MFLSingleFlight
+from mfl_transport import MFLTransport
+
+callers = 100
+
+def burst(function):
+    barrier = threading.Barrier(callers)
+
+    def call():
+        barrier.wait()
+        function()
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+@pytest.mark.parametrize('coalesce', [False, True], ids=['no_singleflight', 'singleflight'])
+def test_burst_upstream_requests(benchmark, stub, coalesce):
+    """100 simultaneous identical rosters calls, upstream requests per burst are in extra_info"""
+    stub.bodies['rosters'] = payloads.rosters()
+    stub.delays['rosters'] = 0.05
+    session = stub.session(2024, '12345', transport=MFLTransport(pool_maxsize=callers), singleflight=MFLSingleFlight() if coalesce else None)
+
+    bursts = []
+
+    def run():
+        bursts.append(burst(session.rosters))
+
+    # a single round runs under --benchmark-disable, count the bursts rather than assume the rounds
+    benchmark.pedantic(run, rounds=5, warmup_rounds=1)
+    benchmark.extra_info['upstream_requests_per_burst'] = stub.count('rosters') / len(bursts)
+    if coalesce:
+        assert stub.count('rosters') == len(bursts)
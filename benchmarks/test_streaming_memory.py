@@ -0,0 +1,65 @@
+import json
+import tracemalloc
+
+import pytest
+
+import payloads
+
+pytest.importorskip('ijson')
+
+body_size = 50 * 1024 * 1024
+
+def large_players_body() -> tuple:
+    """(body, player count) of a players export with details of at least body_size bytes"""
+    template = payloads.players(1000, details=True)['players']['player']
+    chunks, size, count = [], 0, 0
+    while size < body_size:
+        chunk = ','.join(json.dumps(dict(record, id=str(100000 + count + index))) for index, record in enumerate(template))
+        chunks.append(chunk)
+        size += len(chunk) + 1
+        count += len(template)
+    return ('{"players":{"timestamp":"1700000000","player":[' + ','.join(chunks) + ']}}').encode(), count
+
+@pytest.fixture(scope='module')
+def players_body():
+    return large_players_body()
+
+def peak_memory(function) -> tuple:
+    tracemalloc.start()
+    try:
+        result = function()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_streamed_players_memory_is_flat(benchmark, stub, players_body):
+    """Iterating a streamed 50 MB players export keeps the traced peak far below the body size"""
+    body, count = players_body
+    stub.bodies['players'] = body
+    stub.compress = False
+    session = stub.session(2024, '12345')
+
+    def run():
+        return sum(1 for _ in session.players(details=True, stream=True).iter_players())
+
+    parsed, peak = benchmark.pedantic(peak_memory, args=(run,), rounds=1, iterations=1)
+    benchmark.extra_info['body_bytes'] = len(body)
+    benchmark.extra_info['peak_traced_bytes'] = peak
+    assert parsed == count
+    assert peak < len(body) / 10
+
+def test_buffered_players_memory(benchmark, stub, players_body):
+    """The same export downloaded and decoded in full, for comparison"""
+    body, count = players_body
+    stub.bodies['players'] = body
+    stub.compress = False
+    session = stub.session(2024, '12345')
+
+    def run():
+        return len(session.players(details=True).json_response['players']['player'])
+
+    parsed, peak = benchmark.pedantic(peak_memory, args=(run,), rounds=1, iterations=1)
+    benchmark.extra_info['body_bytes'] = len(body)
+    benchmark.extra_info['peak_traced_bytes'] = peak
+    assert parsed == count
+    assert peak > len(body)
@@ -0,0 +1,162 @@
+'''
+mfl_batch.py
+
+MFLBatchEngine object
+
+'''
+
+from mfl_request import endpoints
+from typing import NamedTuple
+import itertools
+import queue
+import threading
+import time
+
+### MFLTokenBucket ###########################################################
+
+class MFLTokenBucket:
+    """Class to rate limit requests, allows rate requests per second with bursts of up to capacity"""
+
+    def __init__(self, rate: float, capacity: float=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+##############################################################################
+
+### MFLBatchEngine ###########################################################
+
+class MFLBatchJob:
+    """A session call waiting to run, lower priority values run first"""
+    __slots__ = ('priority', 'sequence', 'method', 'league_id', 'kwargs', 'session')
+
+    def __init__(self, priority: int, sequence: int, method: str, league_id: str, kwargs: dict, session):
+        self.priority = priority
+        self.sequence = sequence
+        self.method = method
+        self.league_id = league_id
+        self.kwargs = kwargs
+        self.session = session
+
+    def __lt__(self, other):
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+    def __repr__(self):
+        return f"MFLBatchJob(method={self.method!r}, league_id={self.league_id!r}, priority={self.priority})"
+
+class MFLBatchResult(NamedTuple):
+    """Outcome of a MFLBatchJob, error is set instead of response when the call raised"""
+    job: MFLBatchJob
+    response: object
+    error: Exception
+
+class MFLBatchEngine:
+    """Class to refresh many leagues on a worker pool under a global rate limit
+
+    Jobs are session method calls ('rosters', 'league', 'live_scoring', ...). Queued jobs are dispatched
+    by priority, so live scoring submitted behind a large roster refresh still goes out next. A token
+    bucket caps the global request rate and a semaphore per host caps concurrent requests to each MFL node.
+
+    Attributes:
+        session (MyFantasyLeagueAPISession): Default session jobs run on.
+        rate_limiter (MFLTokenBucket): Global request rate limit.
+        per_host_concurrency (int): Maximum concurrent requests per host.
+    """
+
+    # priority of methods that are not registry endpoints
+    default_priority = 50
+
+    def __init__(self, session, max_workers: int=8, rate: float=10.0, burst: float=None, per_host_concurrency: int=4):
+        self.session = session
+        self.rate_limiter = MFLTokenBucket(rate, burst)
+        self.per_host_concurrency = per_host_concurrency
+
+        self._jobs = queue.PriorityQueue()
+        self._results = queue.Queue()
+        self._sequence = itertools.count()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._host_semaphores = {}
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(max_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, method: str, league_id: str=None, priority: int=None, session=None, **kwargs) -> MFLBatchJob:
+        """Queue a session call, priority defaults to the priority of the method's endpoint in the request registry"""
+        if priority is None:
+            endpoint = endpoints.get(method)
+            priority = endpoint.priority if endpoint is not None else self.default_priority
+        job = MFLBatchJob(priority, next(self._sequence), method, league_id, kwargs, session if session is not None else self.session)
+        with self._lock:
+            self._pending += 1
+        self._jobs.put(job)
+        return job
+
+    def refresh(self, league_ids, methods, priority: int=None, **kwargs):
+        """Queue every method for every league and yield MFLBatchResults as they complete"""
+        for league_id in league_ids:
+            for method in methods:
+                self.submit(method, league_id, priority, **kwargs)
+        return self.as_completed()
+
+    def as_completed(self):
+        """Yield MFLBatchResults as jobs complete until every submitted job has been returned"""
+        while True:
+            with self._lock:
+                if self._pending == 0:
+                    return
+            result = self._results.get()
+            with self._lock:
+                self._pending -= 1
+            yield result
+
+    def close(self):
+        """Stop the workers once the queued jobs have run"""
+        for _ in self._workers:
+            self._jobs.put(MFLBatchJob(float('inf'), next(self._sequence), None, None, None, None))
+        for worker in self._workers:
+            worker.join()
+
+    def _host_semaphore(self, host):
+        with self._lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._host_semaphores[host] = threading.BoundedSemaphore(self.per_host_concurrency)
+            return semaphore
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job.method is None:
+                return
+            with self._host_semaphore(job.session.host):
+                self.rate_limiter.acquire()
+                try:
+                    response = getattr(job.session, job.method)(job.league_id, **job.kwargs)
+                    result = MFLBatchResult(job, response, None)
+                except Exception as error:
+                    result = MFLBatchResult(job, None, error)
+            self._results.put(result)
+
+##############################################################################
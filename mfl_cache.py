@@ -0,0 +1,269 @@
+'''
+mfl_cache.py
+
+MFLResponseCache object and its storage backends
+
+'''
+
+from collections import OrderedDict
+from mfl_request import endpoints
+from mfl_transport import MFLCircuitOpenError, build_response
+import hashlib
+import json
+import requests
+import sqlite3
+import threading
+import time
+
+### MFLCacheEntry #############################################################
+
+class MFLCacheEntry:
+    """A stored MFL response body with the headers needed to revalidate it"""
+    __slots__ = ('key', 'request_type', 'status_code', 'headers', 'body', 'stored_at')
+
+    def __init__(self, key: str, request_type: str, status_code: int, headers: dict, body: bytes, stored_at: float):
+        self.key = key
+        self.request_type = request_type
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    @property
+    def size(self):
+        return len(self.body)
+
+    @property
+    def etag(self):
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self):
+        return self.headers.get('Last-Modified')
+
+    def to_response(self, url: str):
+        return build_response(url, self.status_code, self.headers, self.body)
+
+##############################################################################
+
+### MFLMemoryCacheBackend ####################################################
+
+class MFLMemoryCacheBackend:
+    """In-memory cache storage, evicts least recently used entries once max_bytes of bodies are held"""
+
+    def __init__(self, max_bytes: int=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, entry: MFLCacheEntry):
+        with self._lock:
+            self._discard(entry.key)
+            if entry.size > self.max_bytes:
+                return
+            self._entries[entry.key] = entry
+            self.total_bytes += entry.size
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+
+    def delete(self, key: str):
+        with self._lock:
+            self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+##############################################################################
+
+### MFLSqliteCacheBackend ####################################################
+
+class MFLSqliteCacheBackend:
+    """On-disk cache storage in a sqlite file, evicts least recently used entries once max_bytes of bodies are held"""
+
+    def __init__(self, path: str, max_bytes: int=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('''CREATE TABLE IF NOT EXISTS mfl_cache (
+                                        key TEXT PRIMARY KEY, request_type TEXT, status_code INTEGER, headers TEXT,
+                                        body BLOB, size INTEGER, stored_at REAL, accessed_at REAL)''')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS mfl_cache_accessed_at ON mfl_cache (accessed_at)')
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._connection.execute('SELECT request_type, status_code, headers, body, stored_at FROM mfl_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._connection.execute('UPDATE mfl_cache SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        request_type, status_code, headers, body, stored_at = row
+        return MFLCacheEntry(key, request_type, status_code, json.loads(headers), bytes(body), stored_at)
+
+    def set(self, entry: MFLCacheEntry):
+        if entry.size > self.max_bytes:
+            self.delete(entry.key)
+            return
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO mfl_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                        (entry.key, entry.request_type, entry.status_code, json.dumps(entry.headers),
+                                            entry.body, entry.size, entry.stored_at, time.time()))
+            self._evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._connection.execute('DELETE FROM mfl_cache WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM mfl_cache')
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            return self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM mfl_cache').fetchone()[0]
+
+    def _evict(self):
+        excess = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM mfl_cache').fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        for key, size in self._connection.execute('SELECT key, size FROM mfl_cache ORDER BY accessed_at').fetchall():
+            self._connection.execute('DELETE FROM mfl_cache WHERE key = ?', (key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+##############################################################################
+
+### MFLResponseCache #########################################################
+
+class MFLResponseCache:
+    """Class to manage a TTL cache of MFL export responses
+
+    Entries are keyed on the request URL (host, year and endpoint), the request params and a hash of the
+    user cookie. Each export TYPE has its own TTL in seconds, the ttl of its MFLEndpoint in the request
+    registry unless ttls overrides it. A TTL of 0 (or a TYPE missing from ttls) means responses of that
+    TYPE are never cached. Once an entry is stale it is revalidated with
+    If-None-Match / If-Modified-Since when the server sent an ETag or Last-Modified header. If the
+    server can't be reached (error, 5xx, 429 or an open circuit breaker) a stale entry is served instead.
+
+    Attributes:
+        backend: Storage backend, MFLMemoryCacheBackend (default) or MFLSqliteCacheBackend.
+        ttls (dict): TTL in seconds per export TYPE, built from the registry when the cache is created.
+        hits (int): Requests answered from a fresh entry.
+        misses (int): Requests sent to the server with no usable entry.
+        revalidations (int): Stale entries confirmed unchanged by a 304 response.
+        stale_hits (int): Requests answered from a stale entry because the server failed.
+        bytes_saved (int): Response body bytes not downloaded thanks to hits and revalidations.
+    """
+
+    def __init__(self, backend=None, ttls: dict=None):
+        self.backend = backend if backend is not None else MFLMemoryCacheBackend()
+        self.ttls = self.default_ttls()
+        if ttls is not None:
+            self.ttls.update(ttls)
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.stale_hits = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_ttls() -> dict:
+        """TTL per export TYPE of every endpoint in the request registry"""
+        return {endpoint.request_type : endpoint.ttl for endpoint in endpoints.values()}
+
+    @staticmethod
+    def make_key(url: str, data: dict, cookies: dict) -> str:
+        cookie = (cookies or {}).get('MFL_USER_ID') or ''
+        cookie_identity = hashlib.sha256(cookie.encode()).hexdigest()[:16] if cookie else ''
+        params = sorted((str(key), str(value)) for key, value in data.items())
+        return hashlib.sha256(json.dumps([url, params, cookie_identity]).encode()).hexdigest()
+
+    def ttl_for(self, data: dict) -> float:
+        return self.ttls.get(data.get('TYPE'), 0)
+
+    def fetch(self, url: str, data: dict, cookies: dict, send):
+        """Answer the request from the cache when possible, otherwise call send(url, data, cookies, headers)"""
+        ttl = self.ttl_for(data)
+        if not ttl:
+            return send(url, data, cookies)
+
+        key = self.make_key(url, data, cookies)
+        entry = self.backend.get(key)
+        if entry is not None and time.time() - entry.stored_at < ttl:
+            self._count(hits=1, bytes_saved=entry.size)
+            return entry.to_response(url)
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        try:
+            response = send(url, data, cookies, headers or None)
+        except(MFLCircuitOpenError, requests.RequestException):
+            if entry is None:
+                raise
+            self._count(stale_hits=1)
+            return entry.to_response(url)
+
+        if entry is not None and (response.status_code >= 500 or response.status_code == 429):
+            self._count(stale_hits=1)
+            return entry.to_response(url)
+
+        if response.status_code == 304 and entry is not None:
+            entry.stored_at = time.time()
+            self.backend.set(entry)
+            self._count(revalidations=1, bytes_saved=entry.size)
+            return entry.to_response(url)
+
+        self._count(misses=1)
+        # MFL reports errors (e.g. a rejected cookie) as a 200 JSON error object, never keep those
+        if response.status_code == 200 and b'"error"' not in response.content[:256]:
+            self.backend.set(MFLCacheEntry(key, data.get('TYPE'), response.status_code, dict(response.headers), response.content, time.time()))
+        return response
+
+    def invalidate(self, url: str, data: dict, cookies: dict):
+        self.backend.delete(self.make_key(url, data, cookies))
+
+    def clear(self):
+        self.backend.clear()
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.revalidations + self.misses
+        return (self.hits + self.revalidations) / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {'hits' : self.hits, 'misses' : self.misses, 'revalidations' : self.revalidations,
+                'stale_hits' : self.stale_hits, 'bytes_saved' : self.bytes_saved, 'hit_ratio' : self.hit_ratio}
+
+    def _count(self, hits=0, misses=0, revalidations=0, stale_hits=0, bytes_saved=0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.revalidations += revalidations
+            self.stale_hits += stale_hits
+            self.bytes_saved += bytes_saved
+
+##############################################################################
@@ -0,0 +1,128 @@
+'''
+mfl_columnar.py
+
+Columnar (NumPy) views of MFL player scores and live scoring responses
+
+'''
+
+from mfl_records import to_float, to_int
+from mfl_response import as_list, dig
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def require_numpy():
+    if numpy is None:
+        raise ImportError("Columnar MFL output requires the numpy package")
+
+# week column values of year-to-date and weekly average exports, real weeks are 1 and up
+week_sentinels = {'YTD' : -1, 'AVG' : -2}
+
+def week_number(week) -> int:
+    """The week column value of an export's week, raises ValueError for anything but a week number, 'YTD' or 'AVG'"""
+    if week in week_sentinels:
+        return week_sentinels[week]
+    try:
+        return int(week)
+    except(TypeError, ValueError):
+        raise ValueError(f"MFL week must be a number, 'YTD' or 'AVG', got {week!r}")
+
+def _week_column(week, size):
+    return numpy.full(size, week_number(week), dtype=numpy.int16)
+
+def _league_column(league_id, size):
+    try:
+        league = int(league_id)
+    except(TypeError, ValueError):
+        raise ValueError(f"MFL league ids are numeric, got {league_id!r}")
+    return numpy.full(size, league, dtype=numpy.int32)
+
+def player_scores_to_arrays(json_response: dict, league_id: str=None) -> dict:
+    """Columns of a playerScores export: player_id (int32), score (float32), is_available (bool), week (int16)
+        and league_id (int32) when a league id is given. YTD and AVG exports get the week_sentinels week.
+    """
+    require_numpy()
+    rows = as_list(dig(json_response, 'playerScores', 'playerScore'))
+    size = len(rows)
+
+    arrays = {
+        'player_id' : numpy.fromiter((int(row['id']) for row in rows), dtype=numpy.int32, count=size),
+        'score' : numpy.fromiter((to_float(row.get('score')) for row in rows), dtype=numpy.float32, count=size),
+        'is_available' : numpy.fromiter((row.get('isAvailable') == '1' for row in rows), dtype=numpy.bool_, count=size),
+        'week' : _week_column(dig(json_response, 'playerScores', 'week'), size),
+    }
+    if league_id is not None:
+        arrays['league_id'] = _league_column(league_id, size)
+    return arrays
+
+def live_scoring_to_arrays(json_response: dict, league_id: str=None, level: str='player') -> dict:
+    """Columns of a liveScoring export
+
+    With level='player' there is one row per franchise player: franchise_id (int32), player_id (int32),
+    score (float32), game_seconds_remaining (int32), is_starter (bool). With level='franchise' there is one
+    row per franchise: franchise_id, score, game_seconds_remaining, players_yet_to_play (int16),
+    players_currently_playing (int16), is_home (bool). Both include week (int16) and league_id (int32)
+    when a league id is given.
+    """
+    require_numpy()
+    franchises = [franchise for matchup in as_list(dig(json_response, 'liveScoring', 'matchup'))
+                    for franchise in as_list(matchup.get('franchise'))]
+
+    if level == 'franchise':
+        size = len(franchises)
+        arrays = {
+            'franchise_id' : numpy.fromiter((int(row['id']) for row in franchises), dtype=numpy.int32, count=size),
+            'score' : numpy.fromiter((to_float(row.get('score')) for row in franchises), dtype=numpy.float32, count=size),
+            'game_seconds_remaining' : numpy.fromiter((to_int(row.get('gameSecondsRemaining')) for row in franchises), dtype=numpy.int32, count=size),
+            'players_yet_to_play' : numpy.fromiter((to_int(row.get('playersYetToPlay')) for row in franchises), dtype=numpy.int16, count=size),
+            'players_currently_playing' : numpy.fromiter((to_int(row.get('playersCurrentlyPlaying')) for row in franchises), dtype=numpy.int16, count=size),
+            'is_home' : numpy.fromiter((row.get('isHome') == '1' for row in franchises), dtype=numpy.bool_, count=size),
+        }
+    elif level == 'player':
+        rows = [(franchise['id'], player) for franchise in franchises
+                    for player in as_list(dig(franchise, 'players', 'player'))]
+        size = len(rows)
+        arrays = {
+            'franchise_id' : numpy.fromiter((int(franchise_id) for franchise_id, _ in rows), dtype=numpy.int32, count=size),
+            'player_id' : numpy.fromiter((int(row['id']) for _, row in rows), dtype=numpy.int32, count=size),
+            'score' : numpy.fromiter((to_float(row.get('score')) for _, row in rows), dtype=numpy.float32, count=size),
+            'game_seconds_remaining' : numpy.fromiter((to_int(row.get('gameSecondsRemaining')) for _, row in rows), dtype=numpy.int32, count=size),
+            'is_starter' : numpy.fromiter((row.get('status') == 'starter' for _, row in rows), dtype=numpy.bool_, count=size),
+        }
+    else:
+        raise ValueError("level must be 'player' or 'franchise'")
+
+    arrays['week'] = _week_column(dig(json_response, 'liveScoring', 'week'), size)
+    if league_id is not None:
+        arrays['league_id'] = _league_column(league_id, size)
+    return arrays
+
+def stack_arrays(arrays_list) -> dict:
+    """Concatenate the columns of many to_arrays() results (weeks, leagues) into one contiguous block"""
+    require_numpy()
+    arrays_list = list(arrays_list)
+    if not arrays_list:
+        return {}
+    columns = arrays_list[0].keys()
+    for arrays in arrays_list:
+        if arrays.keys() != columns:
+            raise ValueError("all arrays must have the same columns")
+    return {column : numpy.concatenate([arrays[column] for arrays in arrays_list]) for column in columns}
+
+def to_frame(arrays: dict):
+    """pandas.DataFrame from to_arrays() / stack_arrays() columns"""
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("to_frame requires the pandas package")
+    return pandas.DataFrame(arrays, copy=False)
+
+def to_table(arrays: dict):
+    """pyarrow.Table from to_arrays() / stack_arrays() columns"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("to_table requires the pyarrow package")
+    return pyarrow.table(arrays)
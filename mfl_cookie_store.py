@@ -0,0 +1,129 @@
+'''
+mfl_cookie_store.py
+
+MFLCookieStore object
+
+'''
+
+from contextlib import contextmanager
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class MFLCookieStore:
+    """Class to share MFL login cookies between processes through an encrypted file
+
+    Cookies are keyed by username and year and encrypted at rest with Fernet (requires the cryptography
+    package). lock() takes an exclusive file lock so that when many workers find no valid cookie only
+    one of them logs in and the others pick up its cookie.
+
+    Attributes:
+        path (str): Encrypted store file, a '.lock' file is created next to it.
+        max_age (float): Seconds a stored cookie is considered valid.
+    """
+
+    key_environment_variable = 'MFL_COOKIE_STORE_KEY'
+
+    def __init__(self, path: str, key: bytes=None, max_age: float=7 * 24 * 3600):
+        if Fernet is None:
+            raise ImportError("MFLCookieStore requires the cryptography package")
+
+        key = key if key is not None else os.environ.get(self.key_environment_variable)
+        if not key:
+            raise ValueError(f"MFLCookieStore needs a key, pass one or set {self.key_environment_variable} (see generate_key())")
+
+        self.path = path
+        self.max_age = max_age
+        self._fernet = Fernet(key)
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+
+    @staticmethod
+    def generate_key() -> bytes:
+        if Fernet is None:
+            raise ImportError("MFLCookieStore requires the cryptography package")
+        return Fernet.generate_key()
+
+    @contextmanager
+    def lock(self):
+        """Exclusive, re-entrant lock across threads and (where fcntl is available) processes"""
+        with self._thread_lock:
+            if fcntl is None or self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+
+            with open(self.path + '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, username: str, year) -> str:
+        """The stored cookie for username and year, None if there is none or it has expired"""
+        entry = self._read().get(self._key(username, year))
+        if entry is None or time.time() >= entry['expires']:
+            return None
+        return entry['cookie']
+
+    def set(self, username: str, year, cookie: str):
+        with self.lock():
+            entries = self._read()
+            entries[self._key(username, year)] = {'cookie' : cookie, 'expires' : time.time() + self.max_age}
+            self._write(entries)
+
+    def delete(self, username: str, year):
+        with self.lock():
+            entries = self._read()
+            if entries.pop(self._key(username, year), None) is not None:
+                self._write(entries)
+
+    @staticmethod
+    def _key(username, year):
+        return f"{username}/{year}"
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'rb') as store_file:
+                token = store_file.read()
+        except(FileNotFoundError):
+            return {}
+        if not token:
+            return {}
+        try:
+            entries = json.loads(self._fernet.decrypt(token))
+        except(InvalidToken):
+            # unreadable with this key, treat as empty, it is replaced on next write
+            return {}
+        now = time.time()
+        return {key : entry for key, entry in entries.items() if entry['expires'] > now}
+
+    def _write(self, entries: dict):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(descriptor, 'wb') as store_file:
+                store_file.write(self._fernet.encrypt(json.dumps(entries).encode()))
+            os.chmod(temporary_path, 0o600)
+            os.replace(temporary_path, self.path)
+        except:
+            os.unlink(temporary_path)
+            raise
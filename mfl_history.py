@@ -0,0 +1,147 @@
+'''
+mfl_history.py
+
+MFLHistoryLoader object
+
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+from mfl_response import MFLRostersResponse, MFLLiveScoringResponse, MFLPlayerScoresResponse
+from mfl_transport import build_response
+import os
+import tempfile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class MFLHistoryLoader:
+    """Class to prefetch past weeks of a league and keep finalized weeks in an immutable on-disk cache
+
+    A week is final once every franchise in its live scoring has no game seconds remaining. The raw
+    JSON bodies of a final week are written once, atomically and read-only, under
+    directory/<league id>/<year>/week-<week>/, later loads read them back without any request.
+    Weeks that are still in progress, or for which any of the three exports came back as an error,
+    are fetched on every load and never written.
+
+    Usage:
+        loader = MFLHistoryLoader(session, 'mfl-history')
+        weeks = loader.load(range(1, 18))
+        weeks[3]['player_scores'].player_scores
+        loader.arrays(3, 'player_scores')['score']
+
+    Attributes:
+        session (MyFantasyLeagueAPISession): Session the missing weeks are fetched with.
+        directory (str): Root directory of the week cache.
+        max_workers (int): Number of weeks fetched concurrently.
+    """
+
+    response_types = {
+        'rosters' : MFLRostersResponse,
+        'player_scores' : MFLPlayerScoresResponse,
+        'live_scoring' : MFLLiveScoringResponse,
+    }
+
+    def __init__(self, session, directory: str, league_id: str=None, max_workers: int=8):
+        self.session = session
+        self.directory = directory
+        self.league_id = league_id if league_id is not None else session.league_id
+        self.max_workers = max_workers
+        self.network_loads = 0
+        self.disk_loads = 0
+
+    def week_directory(self, week) -> str:
+        return os.path.join(self.directory, str(self.league_id), str(self.session.year), f"week-{int(week):02d}")
+
+    def path(self, week, endpoint: str, extension: str='json') -> str:
+        return os.path.join(self.week_directory(week), f"{endpoint}.{extension}")
+
+    def is_cached(self, week) -> bool:
+        return all(os.path.exists(self.path(week, endpoint)) for endpoint in self.response_types)
+
+    def load(self, weeks) -> dict:
+        """week -> {'rosters', 'player_scores', 'live_scoring' : response} for every week, missing weeks fetched concurrently"""
+        weeks = list(weeks)
+        history = {week : self.load_cached(week) for week in weeks if self.is_cached(week)}
+        self.disk_loads += len(history)
+
+        missing = [week for week in weeks if week not in history]
+        self.network_loads += len(missing)
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for week, responses in zip(missing, executor.map(self.fetch, missing)):
+                    history[week] = responses
+        return history
+
+    def load_cached(self, week) -> dict:
+        responses = {}
+        for endpoint, response_type in self.response_types.items():
+            with open(self.path(week, endpoint), 'rb') as week_file:
+                content = week_file.read()
+            response = build_response(self.path(week, endpoint), 200, {'Content-Type' : 'application/json'}, content)
+            responses[endpoint] = response_type(response, hooks=self.session.hooks, decoder=self.session.json_decoder)
+        return responses
+
+    def fetch(self, week) -> dict:
+        responses = {
+            'rosters' : self.session.rosters(self.league_id, week=week),
+            'player_scores' : self.session.player_scores(self.league_id, week=week),
+            'live_scoring' : self.session.live_scoring(self.league_id, week=week),
+        }
+        if self.is_valid(responses) and self.is_final(responses['live_scoring']):
+            self.store(week, responses)
+        return responses
+
+    @staticmethod
+    def is_valid(responses: dict) -> bool:
+        """True when every response is a 200 without an MFL error object, anything else is never stored"""
+        return all(response.status_code == 200 and response.error is None for response in responses.values())
+
+    @staticmethod
+    def is_final(live_scoring) -> bool:
+        franchises = live_scoring.franchise_live_scoring
+        return bool(franchises) and all(franchise.gameSecondsRemaining == 0 for franchise in franchises.values())
+
+    def store(self, week, responses: dict):
+        os.makedirs(self.week_directory(week), exist_ok=True)
+        # live_scoring is written last, a week missing any file is refetched
+        for endpoint in ('rosters', 'player_scores', 'live_scoring'):
+            self._write(self.path(week, endpoint), responses[endpoint].raw_response.content)
+
+    def arrays(self, week, endpoint: str='player_scores'):
+        """Structured NumPy array of a cached week's player_scores or live_scoring columns (see mfl_columnar),
+            saved next to the JSON on first use and memory-mapped read-only afterwards
+        """
+        if numpy is None:
+            raise ImportError("MFLHistoryLoader.arrays requires the numpy package")
+        if endpoint not in ('player_scores', 'live_scoring'):
+            raise ValueError("endpoint must be 'player_scores' or 'live_scoring'")
+        if not self.is_cached(week):
+            raise LookupError(f"Week {week} of league {self.league_id} is not in the history cache")
+
+        path = self.path(week, endpoint, 'npy')
+        if not os.path.exists(path):
+            columns = self.load_cached(week)[endpoint].to_arrays(self.league_id)
+            size = len(next(iter(columns.values())))
+            rows = numpy.empty(size, dtype=[(name, column.dtype) for name, column in columns.items()])
+            for name, column in columns.items():
+                rows[name] = column
+            self._write(path, rows, numpy.save)
+        return numpy.load(path, mmap_mode='r')
+
+    @staticmethod
+    def _write(path: str, content, write=None):
+        directory = os.path.dirname(path)
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(descriptor, 'wb') as week_file:
+                if write is None:
+                    week_file.write(content)
+                else:
+                    write(week_file, content)
+            os.chmod(temporary_path, 0o444)
+            os.replace(temporary_path, path)
+        except:
+            os.unlink(temporary_path)
+            raise
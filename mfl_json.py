@@ -0,0 +1,60 @@
+'''
+mfl_json.py
+
+Pluggable JSON decoders for MFL response bodies
+
+'''
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+def stdlib_decoder(content: bytes):
+    return json.loads(content)
+
+def orjson_decoder(content: bytes):
+    return orjson.loads(content)
+
+def simdjson_decoder(content: bytes):
+    """On-demand decoding, returns lazy simdjson proxies that only materialize the values that are read.
+        Each body gets its own parser because a parser invalidates its previous document.
+    """
+    return simdjson.Parser().parse(content)
+
+decoders = {'stdlib' : stdlib_decoder, 'orjson' : orjson_decoder, 'simdjson' : simdjson_decoder}
+
+def get_decoder(name: str='auto'):
+    """The decoder function for a backend name
+
+    Args:
+        name: 'stdlib', 'orjson', 'simdjson' or 'auto' (orjson when installed, otherwise stdlib).
+                simdjson is never picked automatically since it returns lazy proxies instead of dicts.
+                A callable taking the body bytes is returned unchanged.
+    """
+    if callable(name):
+        return name
+    if name == 'auto':
+        return orjson_decoder if orjson is not None else stdlib_decoder
+    if name not in decoders:
+        raise ValueError(f"Unknown JSON decoder '{name}', use one of {sorted(decoders)} or 'auto'")
+    if name == 'orjson' and orjson is None:
+        raise ImportError("The orjson decoder requires the orjson package")
+    if name == 'simdjson' and simdjson is None:
+        raise ImportError("The simdjson decoder requires the pysimdjson package")
+    return decoders[name]
+
+def materialize(value):
+    """Plain dicts and lists from a (possibly lazy simdjson) decoded value"""
+    if hasattr(value, 'as_dict'):
+        return value.as_dict()
+    if hasattr(value, 'as_list'):
+        return value.as_list()
+    return value
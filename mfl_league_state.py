@@ -0,0 +1,109 @@
+'''
+mfl_league_state.py
+
+LeagueState object
+
+'''
+
+from mfl_response import MFLRostersResponse, MFLPlayersResponse, MFLPlayerScoresResponse, MFLLeagueResponse
+import threading
+
+class LeagueState:
+    """Class to keep indexed, in-process state of a league built from its export responses
+
+    Feed rosters, players, player_scores and league responses to update() as they arrive, each one
+    only replaces the index entries it carries (a single franchise roster, a SINCE players delta, one
+    week of scores). Lookups are single dict reads and never touch the network.
+
+    Usage:
+        state = LeagueState()
+        state.refresh(session, week=3)
+        franchise_id, player, score = state.lookup('13593', 3)
+
+    Attributes:
+        player_franchise (dict): player id -> franchise id of the roster holding the player.
+        rosters (dict): franchise id -> {'week', 'players' : {player id : RosterEntry}}.
+        players (dict): player id -> Player.
+        scores (dict): (player id, week) -> PlayerScore.
+        franchises (dict): franchise id -> franchise details from the league export.
+    """
+
+    def __init__(self):
+        self.player_franchise = {}
+        self.rosters = {}
+        self.players = {}
+        self.scores = {}
+        self.franchises = {}
+        self._lock = threading.RLock()
+
+    def update(self, response):
+        """Merge an export response into the indexes, returns self"""
+        if isinstance(response, MFLRostersResponse):
+            self.update_rosters(response.rosters)
+        elif isinstance(response, MFLPlayersResponse):
+            self.update_players(response.players)
+        elif isinstance(response, MFLPlayerScoresResponse):
+            self.update_scores(response.week, response.player_scores)
+        elif isinstance(response, MFLLeagueResponse):
+            self.update_franchises(response.franchises)
+        else:
+            raise ValueError(f"LeagueState can not be updated from {type(response).__name__}")
+        return self
+
+    def update_rosters(self, rosters: dict):
+        with self._lock:
+            for franchise_id, roster in rosters.items():
+                previous = self.rosters.get(franchise_id)
+                if previous is not None:
+                    for player_id in previous['players']:
+                        if self.player_franchise.get(player_id) == franchise_id:
+                            del self.player_franchise[player_id]
+                for player_id in roster['players']:
+                    self.player_franchise[player_id] = franchise_id
+                self.rosters[franchise_id] = roster
+
+    def update_players(self, players: dict):
+        with self._lock:
+            self.players.update(players)
+
+    def update_scores(self, week, player_scores: dict):
+        week = str(week)
+        with self._lock:
+            self.scores.update(((player_id, week), score) for player_id, score in player_scores.items())
+
+    def update_franchises(self, franchises: dict):
+        with self._lock:
+            self.franchises.update(franchises)
+
+    def refresh(self, session, league_id: str=None, week: int=None, players: bool=True):
+        """Fetch and merge rosters, player scores for week and (unless players=False) the player database"""
+        self.update(session.rosters(league_id, week=week))
+        self.update(session.player_scores(league_id, week=week))
+        if players:
+            self.update(session.players(league_id))
+        return self
+
+    def franchise_of(self, player_id: str) -> str:
+        """Id of the franchise rostering the player, None for free agents"""
+        return self.player_franchise.get(player_id)
+
+    def roster(self, franchise_id: str) -> dict:
+        return self.rosters.get(franchise_id)
+
+    def player(self, player_id: str):
+        return self.players.get(player_id)
+
+    def score(self, player_id: str, week):
+        return self.scores.get((player_id, str(week)))
+
+    def lookup(self, player_id: str, week) -> tuple:
+        """(franchise id, Player, PlayerScore) for a player and week, None for whatever is not known"""
+        return self.franchise_of(player_id), self.player(player_id), self.score(player_id, week)
+
+    def clear(self):
+        with self._lock:
+            self.player_franchise.clear()
+            self.rosters.clear()
+            self.players.clear()
+            self.scores.clear()
+            self.franchises.clear()
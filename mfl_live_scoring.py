@@ -0,0 +1,124 @@
+'''
+mfl_live_scoring.py
+
+LiveScoringPoller object
+
+'''
+
+from typing import NamedTuple
+from mfl_request import MFLLiveScoringRequest
+from mfl_records import to_float, to_int, intern
+from mfl_json import materialize
+from mfl_response import as_list, dig
+import time
+
+class LiveScoringEvent(NamedTuple):
+    """A single change between two live scoring snapshots, player_id is None for franchise level changes"""
+    franchise_id: str
+    player_id: str
+    field: str
+    old: object
+    new: object
+
+class LiveScoringPoller:
+    """Class to poll MFL live scoring and emit only what changed
+
+    Franchises are compared with a single dict comparison of their raw JSON and only those that differ
+    are diffed field by field, so the Python level work per poll follows the number of changes rather
+    than the league size. The interval drops to
+    min_interval after a change, backs off towards max_interval while nothing changes and switches to
+    idle_interval once every franchise has 0 gameSecondsRemaining.
+
+    Attributes:
+        session (MyFantasyLeagueAPISession): Session used to send the requests.
+        league_id (str): League Id, defaults to the session's league.
+        week (int): Week to poll, None polls the current week.
+        details (bool): Include non-starters.
+        interval (float): Seconds to wait before the next poll.
+        polls (int): Number of requests sent.
+    """
+
+    franchise_fields = {'score' : to_float, 'gameSecondsRemaining' : to_int, 'playersCurrentlyPlaying' : to_int, 'playersYetToPlay' : to_int}
+    player_fields = {'score' : to_float, 'status' : intern, 'gameSecondsRemaining' : to_int}
+
+    def __init__(self, session, league_id: str=None, week: int=None, details: bool=False,
+                    min_interval: float=15, max_interval: float=30, idle_interval: float=600, backoff: float=1.5):
+        self.session = session
+        self.league_id = league_id if league_id is not None else session.league_id
+        self.week = week
+        self.details = details
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.idle_interval = idle_interval
+        self.backoff = backoff
+
+        self.interval = min_interval
+        self.polls = 0
+        self.response = None
+        self.snapshot = {}
+        self._running = False
+
+    @property
+    def is_final(self) -> bool:
+        """True once every franchise in the last snapshot has no game seconds remaining"""
+        return bool(self.snapshot) and all(to_int(franchise.get('gameSecondsRemaining')) == 0 for franchise in self.snapshot.values())
+
+    def poll(self) -> list:
+        """Fetch live scoring once and return the LiveScoringEvents since the previous poll (none on the first poll)"""
+        request = MFLLiveScoringRequest(self.league_id, self.week, self.details)
+        self.response = self.session.send(request)
+        self.polls += 1
+
+        snapshot = {}
+        for matchup in as_list(dig(self.response.json_response, 'liveScoring', 'matchup')):
+            for franchise in as_list(matchup.get('franchise')):
+                snapshot[franchise['id']] = materialize(franchise)
+
+        events = []
+        if self.snapshot:
+            for franchise_id, franchise in snapshot.items():
+                previous = self.snapshot.get(franchise_id)
+                if previous is not None and previous != franchise:
+                    events.extend(self._diff_franchise(franchise_id, previous, franchise))
+        self.snapshot = snapshot
+
+        if self.is_final:
+            self.interval = self.idle_interval
+        elif events:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return events
+
+    def run(self, sleep=time.sleep):
+        """Poll until stop() is called, yielding each non-empty list of LiveScoringEvents"""
+        self._running = True
+        while self._running:
+            events = self.poll()
+            if events:
+                yield events
+            if self._running:
+                sleep(self.interval)
+
+    def stop(self):
+        self._running = False
+
+    def _diff_franchise(self, franchise_id, previous, current):
+        events = []
+        for field, convert in self.franchise_fields.items():
+            if previous.get(field) != current.get(field):
+                events.append(LiveScoringEvent(franchise_id, None, field, convert(previous.get(field)), convert(current.get(field))))
+
+        previous_players = {player['id'] : player for player in as_list(dig(previous, 'players', 'player'))}
+        for player in as_list(dig(current, 'players', 'player')):
+            player_id = player['id']
+            previous_player = previous_players.pop(player_id, None)
+            if previous_player is None:
+                events.append(LiveScoringEvent(franchise_id, player_id, 'player', None, player))
+            elif previous_player != player:
+                for field, convert in self.player_fields.items():
+                    if previous_player.get(field) != player.get(field):
+                        events.append(LiveScoringEvent(franchise_id, player_id, field, convert(previous_player.get(field)), convert(player.get(field))))
+        for player_id, previous_player in previous_players.items():
+            events.append(LiveScoringEvent(franchise_id, player_id, 'player', previous_player, None))
+        return events
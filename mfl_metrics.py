@@ -0,0 +1,190 @@
+'''
+mfl_metrics.py
+
+MFLHooks and MFLMetricsCollector objects
+
+'''
+
+import threading
+import weakref
+
+### MFLHooks #################################################################
+
+class MFLHooks:
+    """Class to hold the callbacks run around MFL requests
+
+    Attributes:
+        before_request (list): Called as hook(request) before a request is sent.
+        after_response (list): Called as hook(request, response, elapsed) with the parsed MFLResponse.
+        on_error (list): Called as hook(request, error, elapsed) when the request raised.
+        after_parse (list): Called as hook(response, name, elapsed) after json_response is decoded
+                    or a derived view (rosters, players, ...) is built.
+    """
+
+    def __init__(self):
+        self.before_request = []
+        self.after_response = []
+        self.on_error = []
+        self.after_parse = []
+
+    def register(self, collector):
+        """Add every hook method the collector defines"""
+        for name in ('before_request', 'after_response', 'on_error', 'after_parse'):
+            hook = getattr(collector, name, None)
+            if hook is not None:
+                getattr(self, name).append(hook)
+        return collector
+
+##############################################################################
+
+### MFLMetricsCollector ######################################################
+
+class MFLHistogram:
+    """Cumulative histogram of observed values"""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def as_dict(self) -> dict:
+        return {'buckets' : dict(zip(self.buckets, self.counts)), 'sum' : self.sum, 'count' : self.count}
+
+class MFLMetricsCollector:
+    """Class to collect MFL request metrics through MFLHooks
+
+    Records per TYPE request latency histograms, error counts, bytes on the wire (compressed, 0 when served
+    from a cache) and body bytes retained after decoding, JSON decode time and derived view build time per
+    response class, and the hit ratio of an optional MFLResponseCache. Bytes are counted once per response,
+    however many single-flight callers shared it.
+
+    Usage:
+        hooks = MFLHooks()
+        metrics = hooks.register(MFLMetricsCollector())
+        session = MyFantasyLeagueAPISession(year, league_id, hooks=hooks)
+    """
+
+    latency_buckets = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    parse_buckets = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.latency = {}
+        self.errors = {}
+        self.payload_bytes = {}
+        self.wire_bytes = {}
+        self.decode_time = {}
+        self.view_build_time = {}
+        # raw responses already counted, single-flight waiters all report the one response they share
+        self._counted = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def request_type(request) -> str:
+        return getattr(request, 'request_type', request.request_base_type)
+
+    @staticmethod
+    def wire_size(raw_response) -> int:
+        """Bytes read off the connection before decompression, 0 for responses built from a cache or archive"""
+        tell = getattr(raw_response.raw, 'tell', None)
+        return tell() if tell is not None else 0
+
+    def after_response(self, request, response, elapsed):
+        request_type = self.request_type(request)
+        with self._lock:
+            self._histogram(self.latency, request_type, self.latency_buckets).observe(elapsed)
+            if not response.stream and response.raw_response not in self._counted:
+                self._counted.add(response.raw_response)
+                self.payload_bytes[request_type] = self.payload_bytes.get(request_type, 0) + len(response.raw_response.content)
+                self.wire_bytes[request_type] = self.wire_bytes.get(request_type, 0) + self.wire_size(response.raw_response)
+
+    def on_error(self, request, error, elapsed):
+        request_type = self.request_type(request)
+        with self._lock:
+            self._histogram(self.latency, request_type, self.latency_buckets).observe(elapsed)
+            self.errors[request_type] = self.errors.get(request_type, 0) + 1
+
+    def after_parse(self, response, name, elapsed):
+        with self._lock:
+            if name == 'json_response':
+                self._histogram(self.decode_time, type(response).__name__, self.parse_buckets).observe(elapsed)
+            else:
+                self._histogram(self.view_build_time, (type(response).__name__, name), self.parse_buckets).observe(elapsed)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            metrics = {
+                'latency' : {key : histogram.as_dict() for key, histogram in self.latency.items()},
+                'errors' : dict(self.errors),
+                'payload_bytes' : dict(self.payload_bytes),
+                'wire_bytes' : dict(self.wire_bytes),
+                'decode_time' : {key : histogram.as_dict() for key, histogram in self.decode_time.items()},
+                'view_build_time' : {'.'.join(key) : histogram.as_dict() for key, histogram in self.view_build_time.items()},
+            }
+        if self.cache is not None:
+            metrics['cache'] = self.cache.stats()
+        return metrics
+
+    def to_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            self._prometheus_histograms(lines, 'mfl_request_duration_seconds', 'MFL request latency by export TYPE',
+                                        {key : {'type' : key} for key in self.latency}, self.latency)
+            self._prometheus_counter(lines, 'mfl_request_errors_total', 'MFL requests that raised by export TYPE', self.errors)
+            self._prometheus_counter(lines, 'mfl_response_bytes_total', 'MFL response body bytes retained after decoding by export TYPE', self.payload_bytes)
+            self._prometheus_counter(lines, 'mfl_response_wire_bytes_total', 'MFL response bytes on the wire by export TYPE', self.wire_bytes)
+            self._prometheus_histograms(lines, 'mfl_json_decode_seconds', 'MFL response JSON decode time by response class',
+                                        {key : {'response' : key} for key in self.decode_time}, self.decode_time)
+            self._prometheus_histograms(lines, 'mfl_view_build_seconds', 'MFL derived view build time by response class and view',
+                                        {key : {'response' : key[0], 'view' : key[1]} for key in self.view_build_time}, self.view_build_time)
+        if self.cache is not None:
+            stats = self.cache.stats()
+            for name in ('hits', 'misses', 'revalidations', 'stale_hits', 'bytes_saved'):
+                lines.append(f"# TYPE mfl_cache_{name}_total counter")
+                lines.append(f"mfl_cache_{name}_total {stats[name]}")
+            lines.append("# TYPE mfl_cache_hit_ratio gauge")
+            lines.append(f"mfl_cache_hit_ratio {stats['hit_ratio']}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _histogram(histograms, key, buckets):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = MFLHistogram(buckets)
+        return histogram
+
+    @staticmethod
+    def _labels(labels: dict) -> str:
+        return ','.join(f'{name}="{value}"' for name, value in labels.items())
+
+    def _prometheus_histograms(self, lines, name, help_text, labels, histograms):
+        if not histograms:
+            return
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for key, histogram in histograms.items():
+            label = self._labels(labels[key])
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{label}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{label}}} {histogram.count}")
+
+    def _prometheus_counter(self, lines, name, help_text, counters):
+        if not counters:
+            return
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for key, value in counters.items():
+            lines.append(f'{name}{{type="{key}"}} {value}')
+
+##############################################################################
@@ -0,0 +1,158 @@
+'''
+mfl_pipeline.py
+
+MFLPipeline object
+
+'''
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import NamedTuple
+from mfl_records import to_int
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def require_numpy():
+    if numpy is None:
+        raise ImportError("MFLPipeline requires the numpy package")
+
+### Shard worker #############################################################
+
+roster_dtype = [('league_id', 'i4'), ('franchise_id', 'i4'), ('player_id', 'i4'), ('week', 'i2'), ('salary', 'f4'), ('status', 'S16')]
+score_dtype = [('league_id', 'i4'), ('player_id', 'i4'), ('week', 'i2'), ('score', 'f4'), ('is_available', '?')]
+
+# one session per worker process, built by the pool initializer and reused for every shard it runs
+_worker_session = None
+
+def _init_worker(year, session_options: dict):
+    global _worker_session
+    from session import MyFantasyLeagueAPISession
+    _worker_session = MyFantasyLeagueAPISession(year)
+    for name, value in session_options.items():
+        setattr(_worker_session, name, value)
+
+def _roster_rows(league_id: str, response) -> list:
+    league = int(league_id)
+    return [(league, to_int(franchise_id), to_int(player_id), to_int(roster['week']), entry.salary, entry.status.encode()[:16])
+                for franchise_id, roster in response.rosters.items() for player_id, entry in roster['players'].items()]
+
+def _to_shared_memory(rows, dtype) -> tuple:
+    """Copy rows into a new shared memory block, returns (name, dtype descr, count). The parent unlinks it."""
+    array = numpy.array(rows, dtype=dtype)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    numpy.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    block.close()
+    return block.name, array.dtype.descr, len(array)
+
+def _run_shard(league_ids: list, weeks: list) -> dict:
+    """Fetch, parse and normalize rosters and player scores of a shard of leagues in a worker process"""
+    session = _worker_session
+    roster_rows, score_rows, errors = [], [], []
+    for league_id in league_ids:
+        # a league's rows are only kept when all of its exports succeeded, a failed league is only in errors
+        try:
+            league_rosters = _roster_rows(league_id, session.rosters(league_id))
+            league_scores = []
+            for week in weeks:
+                arrays = session.player_scores(league_id, week=week).to_arrays(league_id)
+                league_scores.extend(zip(arrays['league_id'].tolist(), arrays['player_id'].tolist(), arrays['week'].tolist(),
+                                        arrays['score'].tolist(), arrays['is_available'].tolist()))
+        except Exception as error:
+            errors.append((league_id, repr(error)))
+            continue
+        roster_rows.extend(league_rosters)
+        score_rows.extend(league_scores)
+    return {
+        'rosters' : _to_shared_memory(roster_rows, roster_dtype),
+        'scores' : _to_shared_memory(score_rows, score_dtype),
+        'errors' : errors,
+    }
+
+##############################################################################
+
+### MFLPipeline ##############################################################
+
+class MFLPipelineResult(NamedTuple):
+    rosters: 'numpy.ndarray'
+    scores: 'numpy.ndarray'
+    errors: list
+
+class MFLPipeline:
+    """Class to ingest many leagues in a pool of processes, sidestepping the GIL for parsing and normalizing
+
+    League ids are split into shards and each worker process fetches, parses and normalizes its shards
+    with its own session and transport. A shard's rows are written to shared memory blocks as NumPy
+    structured arrays and only the block names cross the process boundary, the parent copies the
+    rows out and unlinks the blocks.
+
+    Usage:
+        pipeline = MFLPipeline(2024, max_workers=8)
+        result = pipeline.run(league_ids, weeks=range(1, 18))
+        result.scores[result.scores['league_id'] == 12345]
+
+    Attributes:
+        year (int): Season passed to every worker session.
+        max_workers (int): Number of worker processes, os.cpu_count() by default.
+        shards_per_worker (int): Shards per worker, more shards even out slow leagues.
+        session_options (dict): Attributes set on every worker session (host, protocol, ...).
+    """
+
+    def __init__(self, year, max_workers: int=None, shards_per_worker: int=4, session_options: dict=None):
+        require_numpy()
+        self.year = year
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+        self.shards_per_worker = shards_per_worker
+        self.session_options = session_options if session_options is not None else {}
+
+    def shard(self, league_ids) -> list:
+        league_ids = list(league_ids)
+        count = max(1, min(len(league_ids), self.max_workers * self.shards_per_worker))
+        return [league_ids[index::count] for index in range(count) if league_ids[index::count]]
+
+    def run(self, league_ids, weeks=(None,)) -> MFLPipelineResult:
+        """Rosters and player scores (for each of weeks, the current week by default) of every league
+
+        Returns:
+            MFLPipelineResult of a roster_dtype array, a score_dtype array and (league id, error) pairs.
+                    A league in errors has no rows in either array.
+
+        Raises:
+            ValueError: A league id is not numeric, it could not be stored in the int32 league_id column.
+        """
+        league_ids = [str(league_id) for league_id in league_ids]
+        invalid = [league_id for league_id in league_ids if not league_id.isdigit()]
+        if invalid:
+            raise ValueError(f"MFL league ids are numeric, got {invalid}")
+        weeks = list(weeks)
+        rosters, scores, errors = [], [], []
+        # workers must share the parent's resource tracker, their own would unlink unread blocks when they exit
+        resource_tracker.ensure_running()
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                    initargs=(self.year, self.session_options)) as executor:
+            futures = [executor.submit(_run_shard, shard, weeks) for shard in self.shard(league_ids)]
+            for future in futures:
+                shard_result = future.result()
+                rosters.append(self._read(*shard_result['rosters']))
+                scores.append(self._read(*shard_result['scores']))
+                errors.extend(shard_result['errors'])
+
+        return MFLPipelineResult(self._concatenate(rosters, roster_dtype), self._concatenate(scores, score_dtype), errors)
+
+    @staticmethod
+    def _read(name: str, descr: list, count: int) -> 'numpy.ndarray':
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            return numpy.ndarray(count, dtype=numpy.dtype(descr), buffer=block.buf).copy()
+        finally:
+            block.close()
+            block.unlink()
+
+    @staticmethod
+    def _concatenate(arrays: list, dtype) -> 'numpy.ndarray':
+        return numpy.concatenate(arrays) if arrays else numpy.empty(0, dtype=dtype)
+
+##############################################################################
@@ -0,0 +1,171 @@
+'''
+mfl_player_store.py
+
+MFLPlayerStore object
+
+'''
+
+from mfl_json import materialize
+from mfl_request import MFLPlayersRequest
+from mfl_response import MFLPlayersResponse, MFLResponseError, as_list, dig
+from mfl_transport import build_response
+import json
+import sqlite3
+import threading
+import time
+
+class MFLPlayerStore:
+    """Class to manage a persistent local copy of the MFL player database
+
+    The first sync downloads the full player universe with details, later syncs only ask MFL for the
+    players changed since the last timestamp (SINCE) and merge them into an indexed sqlite table.
+    A store holds one season, syncing with a session of another year replaces it with a full load.
+
+    Attributes:
+        path (str): sqlite database file, ':memory:' keeps the store in memory only.
+        refresh_interval (float): Seconds before a lookup through the session triggers a new delta sync.
+    """
+
+    def __init__(self, path: str=':memory:', refresh_interval: float=3600):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('''CREATE TABLE IF NOT EXISTS players (
+                                        id TEXT PRIMARY KEY, name TEXT, position TEXT, team TEXT, status TEXT, details TEXT)''')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS players_position ON players (position)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS players_team ON players (team)')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM players').fetchone()[0]
+
+    @property
+    def timestamp(self):
+        """MFL timestamp of the last applied sync, None before the first full load"""
+        return self._get_meta('timestamp')
+
+    @property
+    def year(self):
+        """Season of the players in the store, None before the first full load"""
+        return self._get_meta('year')
+
+    @property
+    def synced_at(self):
+        """Local time of the last sync, 0 before the first full load"""
+        return float(self._get_meta('synced_at') or 0)
+
+    def is_stale(self, year=None) -> bool:
+        """True once refresh_interval has passed since the last sync, or when year is not the store's season"""
+        if year is not None and self.year != str(year):
+            return True
+        return time.time() - self.synced_at >= self.refresh_interval
+
+    def sync(self, session, league_id: str=None) -> int:
+        """Full load on first use and for a session of another season, SINCE delta afterwards
+
+        Args:
+            session: MyFantasyLeagueAPISession used to send the request.
+            league_id: League Id, includes the league's custom players when set.
+
+        Returns:
+            Number of player records merged into the store
+
+        Raises:
+            MFLResponseError: MFL answered with an error object or without players.timestamp,
+                    the store and its timestamp are left as they were.
+        """
+        with self._lock:
+            year = str(session.year)
+            # a SINCE delta only applies to the season the store holds
+            same_season = self.year == year
+            since = self.timestamp if same_season else None
+            request = MFLPlayersRequest(league_id, details=True, since=since)
+            response = session.send(request)
+
+            # an error object or a body without MFL's timestamp leaves the store untouched, the local clock
+            # is never a valid SINCE value and would skip every change made before it
+            if response.error is not None:
+                raise MFLResponseError(f"players sync failed: {response.error}")
+            try:
+                timestamp = response.timestamp
+            except(AttributeError):
+                raise MFLResponseError("players sync failed: response has no players.timestamp")
+
+            records = [materialize(record) for record in as_list(dig(response.json_response, 'players', 'player'))]
+
+            rows = [self._row(record) for record in records]
+            self._connection.execute('BEGIN')
+            try:
+                if not same_season:
+                    self._connection.execute('DELETE FROM players')
+                self._connection.executemany('INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?, ?)', rows)
+                self._set_meta('year', year)
+                self._set_meta('timestamp', timestamp)
+                self._set_meta('synced_at', time.time())
+            except:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+            return len(rows)
+
+    def get(self, player_id: str, details: bool=False) -> dict:
+        """A single player record, or None if the player is not in the store"""
+        with self._lock:
+            row = self._connection.execute('SELECT * FROM players WHERE id = ?', (player_id,)).fetchone()
+        return self._record(row, details) if row is not None else None
+
+    def find(self, players: str=None, position: str=None, team: str=None, details: bool=False) -> list:
+        """Player records filtered by a comma separated list of player ids, position and/or team"""
+        clauses, values = [], []
+        if players is not None:
+            player_ids = [player_id.strip() for player_id in str(players).split(',') if player_id.strip()]
+            if not player_ids:
+                return []
+            clauses.append('id IN (%s)' % ','.join('?' * len(player_ids)))
+            values.extend(player_ids)
+        if position is not None:
+            clauses.append('position = ?')
+            values.append(position)
+        if team is not None:
+            clauses.append('team = ?')
+            values.append(team)
+
+        query = 'SELECT * FROM players'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        with self._lock:
+            rows = self._connection.execute(query, values).fetchall()
+        return [self._record(row, details) for row in rows]
+
+    def players_response(self, session, league_id: str=None, players: str=None, details: bool=False) -> MFLPlayersResponse:
+        """Answer a players export from the store, syncing first when the store is stale or holds another season"""
+        # checked and synced under the lock, concurrent callers finding the store stale wait for one sync
+        with self._lock:
+            if self.is_stale(session.year):
+                self.sync(session, league_id)
+            body = {'players' : {'timestamp' : self.timestamp, 'player' : self.find(players, details=details)}}
+        response = build_response(f"{session.protocol}://{session.host}/{session.year}/export", 200,
+                                    {'Content-Type' : 'application/json'}, json.dumps(body).encode())
+        return MFLPlayersResponse(response)
+
+    def _row(self, record):
+        return (record['id'], record.get('name', ''), record.get('position', ''), record.get('team', ''),
+                record.get('status', ''), json.dumps(record))
+
+    def _record(self, row, details):
+        if details:
+            return json.loads(row[5])
+        record = {'id' : row[0], 'name' : row[1], 'position' : row[2], 'team' : row[3]}
+        if row[4]:
+            record['status'] = row[4]
+        return record
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def _set_meta(self, key, value):
+        self._connection.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, str(value)))
@@ -0,0 +1,124 @@
+'''
+mfl_records.py
+
+Compact record types built by the MFL response descriptors
+
+'''
+
+from collections.abc import Mapping
+import sys
+
+def to_float(value, default: float=0.0) -> float:
+    try:
+        return float(value)
+    except(TypeError, ValueError):
+        return default
+
+def to_int(value, default: int=0) -> int:
+    try:
+        return int(value)
+    except(TypeError, ValueError):
+        return default
+
+def to_bool(value) -> bool:
+    return value in ('1', 1, True)
+
+def intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+class MFLRecord(Mapping):
+    """Base class for slotted response records
+
+    Fields are parsed once into int/float/bool and stored in __slots__. Records can still be read like
+    the dicts they replace (record['score'], record.get('status'), dict(record)).
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f"{key}={getattr(self, key)!r}" for key in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> dict:
+        return {key : getattr(self, key) for key in self.__slots__}
+
+class RosterEntry(MFLRecord):
+    """A player on a franchise roster"""
+    __slots__ = ('status', 'salary')
+
+    def __init__(self, status: str, salary: float):
+        self.status = status
+        self.salary = salary
+
+    @classmethod
+    def from_json(cls, player: dict):
+        return cls(intern(player.get('status', '')), to_float(player.get('salary')))
+
+class Player(MFLRecord):
+    """A player from the MFL player database"""
+    __slots__ = ('name', 'position', 'team', 'status')
+
+    def __init__(self, name: str, position: str, team: str, status: str):
+        self.name = name
+        self.position = position
+        self.team = team
+        self.status = status
+
+    @classmethod
+    def from_json(cls, player: dict):
+        return cls(player['name'], intern(player['position']), intern(player['team']), intern(player.get('status', '')))
+
+class PlayerScore(MFLRecord):
+    """A player's fantasy score for a week"""
+    __slots__ = ('isAvailable', 'score')
+
+    def __init__(self, isAvailable: bool, score: float):
+        self.isAvailable = isAvailable
+        self.score = score
+
+    @classmethod
+    def from_json(cls, player: dict):
+        return cls(to_bool(player.get('isAvailable')), to_float(player.get('score')))
+
+class LiveScoringPlayer(MFLRecord):
+    """A player's live score within a franchise"""
+    __slots__ = ('status', 'score', 'gameSecondsRemaining', 'updatedStats')
+
+    def __init__(self, status: str, score: float, gameSecondsRemaining: int, updatedStats: str):
+        self.status = status
+        self.score = score
+        self.gameSecondsRemaining = gameSecondsRemaining
+        self.updatedStats = updatedStats
+
+    @classmethod
+    def from_json(cls, player: dict):
+        return cls(intern(player.get('status', '')), to_float(player.get('score')),
+                    to_int(player.get('gameSecondsRemaining')), player.get('updatedStats', ''))
+
+class FranchiseLiveScore(MFLRecord):
+    """A franchise's live score with its players keyed by player id"""
+    __slots__ = ('playersCurrentlyPlaying', 'isHome', 'gameSecondsRemaining', 'playersYetToPlay', 'score', 'players')
+
+    def __init__(self, playersCurrentlyPlaying: int, isHome: bool, gameSecondsRemaining: int, playersYetToPlay: int, score: float, players: dict):
+        self.playersCurrentlyPlaying = playersCurrentlyPlaying
+        self.isHome = isHome
+        self.gameSecondsRemaining = gameSecondsRemaining
+        self.playersYetToPlay = playersYetToPlay
+        self.score = score
+        self.players = players
+
+    @classmethod
+    def from_json(cls, franchise: dict, players: dict):
+        return cls(to_int(franchise.get('playersCurrentlyPlaying')), to_bool(franchise.get('isHome')),
+                    to_int(franchise.get('gameSecondsRemaining')), to_int(franchise.get('playersYetToPlay')),
+                    to_float(franchise.get('score')), players)
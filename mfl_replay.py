@@ -0,0 +1,141 @@
+'''
+mfl_replay.py
+
+MFLRecordingTransport and MFLReplayTransport objects
+
+'''
+
+from mfl_transport import MFLTransport, build_response
+from urllib.parse import urlsplit
+import hashlib
+import io
+import json
+import os
+import threading
+import zipfile
+
+class MFLReplayMissError(LookupError):
+    """Raised by MFLReplayTransport when a request is not in the archive"""
+
+### MFLArchive ###############################################################
+
+class MFLArchive:
+    """Class to manage a zip archive of recorded MFL export responses
+
+    The archive holds an index.json with the URL path, params, status code and headers of every
+    recorded request and one deflated member per response body. Requests are matched on URL path
+    and params only, so an archive recorded on one MFL host, or with one user cookie, replays on any.
+    Login requests are never recorded, credentials and cookies stay out of the archive.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index = {}
+        self.bodies = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self.load()
+
+    @staticmethod
+    def make_key(url: str, data: dict) -> str:
+        params = sorted((str(key), str(value)) for key, value in data.items())
+        return hashlib.sha256(json.dumps([urlsplit(url).path, params]).encode()).hexdigest()[:32]
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def load(self):
+        with zipfile.ZipFile(self.path) as archive:
+            index = json.loads(archive.read('index.json'))
+            bodies = {key : archive.read(f"bodies/{key}") for key in index}
+        with self._lock:
+            self.index.update(index)
+            self.bodies.update(bodies)
+
+    def save(self):
+        with self._lock:
+            temporary_path = self.path + '.tmp'
+            with zipfile.ZipFile(temporary_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr('index.json', json.dumps(self.index, indent=1))
+                for key, body in self.bodies.items():
+                    archive.writestr(f"bodies/{key}", body)
+            os.replace(temporary_path, self.path)
+
+    def add(self, url: str, data: dict, response):
+        key = self.make_key(url, data)
+        with self._lock:
+            self.index[key] = {'path' : urlsplit(url).path, 'params' : {str(k) : str(v) for k, v in data.items()},
+                                'status_code' : response.status_code, 'headers' : dict(response.headers)}
+            self.bodies[key] = response.content
+
+    def get(self, url: str, data: dict):
+        """A requests.Response rebuilt from the archive, None when the request was not recorded"""
+        key = self.make_key(url, data)
+        with self._lock:
+            entry = self.index.get(key)
+            body = self.bodies.get(key)
+        if entry is None:
+            return None
+        response = build_response(url, entry['status_code'], entry['headers'], body)
+        # lets streamed parsing (iter_players(), ...) read the recorded body too
+        response.raw = io.BytesIO(body)
+        return response
+
+##############################################################################
+
+### MFLRecordingTransport ####################################################
+
+class MFLRecordingTransport(MFLTransport):
+    """MFLTransport that records every export request and response into an MFLArchive, call save() when done"""
+
+    def __init__(self, archive_path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = MFLArchive(archive_path)
+
+    def send(self, url: str, data: dict, cookies: dict, headers: dict=None, stream: bool=False):
+        # bodies are recorded in full, even when the caller asked for a stream
+        response = super().send(url, data, cookies, headers)
+        if 'TYPE' in data and response.status_code == 200:
+            self.archive.add(url, data, response)
+        if stream:
+            response.raw = io.BytesIO(response.content)
+        return response
+
+    def save(self):
+        self.archive.save()
+
+    def close(self):
+        self.save()
+        super().close()
+
+##############################################################################
+
+### MFLReplayTransport #######################################################
+
+class MFLReplayTransport(MFLTransport):
+    """MFLTransport that answers export requests from an MFLArchive without touching the network
+
+    Login requests succeed with a placeholder cookie. Requests missing from the archive raise
+    MFLReplayMissError.
+    """
+
+    replay_cookie = 'replay'
+
+    def __init__(self, archive_path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = MFLArchive(archive_path)
+
+    def send(self, url: str, data: dict, cookies: dict, headers: dict=None, stream: bool=False):
+        if 'TYPE' not in data:
+            body = f'<status MFL_USER_ID="{self.replay_cookie}">OK</status>'.encode()
+            return build_response(url, 200, {'Content-Type' : 'application/xml'}, body)
+
+        response = self.archive.get(url, data)
+        if response is None:
+            raise MFLReplayMissError(f"No recorded response for {urlsplit(url).path} {data}")
+        return response
+
+##############################################################################
@@ -1,198 +1,375 @@
-from mfl_response import MFLLoginResponse, MFLRostersResponse, MFLPlayersResponse, MFLLeagueResponse, MFLLiveScoringResponse, MFLPlayerScoresResponse
-import requests
+from mfl_response import MFLHTTPError, MFLLoginResponse, MFLRostersResponse, MFLPlayersResponse, MFLLeagueResponse, MFLLiveScoringResponse, MFLPlayerScoresResponse, \
+    MFLTransactionsResponse, MFLStandingsResponse, MFLScheduleResponse, MFLProjectedScoresResponse, MFLDraftResultsResponse, MFLRulesResponse
+from urllib.parse import urlsplit
+import time
 
 ### MFLRequest ###############################################################
 
 class MFLRequestUrl:
-    """A non-data descriptor that returns a formatted MFL login request URL string"""
+    """A non-data descriptor that returns a formatted MFL request URL string, 
+        for the request's own year when it has one and the session year otherwise
+    """
     def __get__(self, obj, type):
         if obj.request_base_type == "login":
             host = "api.myfantasyleague.com"
         else:
             host = obj.host
-        return f"{obj.protocol}://{host}/{obj.default_year}/{obj.request_base_type}" 
+        year = obj.year if obj.year is not None else obj.default_year
+        return f"{obj.protocol}://{host}/{year}/{obj.request_base_type}" 
 
 class MFLRequest:
     """Class to manage MFL requests""" 
     protocol=""
     host=""
     default_year=""
+    year=None
     user_cookie=""
+    transport=None
+    singleflight=None
+    hooks=None
+    json_decoder=None
+    response_type=None
+    stream=False
+    fields=None
     request_url = MFLRequestUrl()
 
+    def bind_session(self, session):
+        """Copy the session context onto this request instance, 
+            so requests from concurrent sessions never share host, year, cookie or transport
+        """
+        self.protocol = session.protocol
+        self.host = session.host
+        self.default_year = session.year
+        self.user_cookie = session.user_cookie
+        self.transport = session.transport
+        self.singleflight = session.singleflight
+        self.hooks = session.hooks
+        self.json_decoder = session.json_decoder
+        return self
+
     def make_request(self):
-        print(self.request_url)
-        print(self.request_params)
-        return requests.post(url=self.request_url, data=self.request_params, cookies={'MFL_USER_ID' : self.user_cookie})
+        hooks = self.hooks
+        if hooks is None:
+            return self.dispatch_request()
+
+        for hook in hooks.before_request:
+            hook(self)
+        started = time.perf_counter()
+        try:
+            response = self.dispatch_request()
+        except Exception as error:
+            elapsed = time.perf_counter() - started
+            for hook in hooks.on_error:
+                hook(self, error, elapsed)
+            raise
+        elapsed = time.perf_counter() - started
+        for hook in hooks.after_response:
+            hook(self, response, elapsed)
+        return response
+
+    def dispatch_request(self):
+        if self.singleflight is not None and self.request_base_type == "export" and not self.stream:
+            key = (self.request_url, tuple(sorted(self.request_params.items())), self.user_cookie, self.fields)
+            return self.singleflight.do(key, self.send_request)
+        return self.send_request()
+
+    def send_request(self):
+        response = self.transport.post(url=self.request_url, data=self.request_params, cookies={'MFL_USER_ID' : self.user_cookie}, stream=self.stream)
+        # the transport returns the last attempt once its retries ran out, its body is an error page and not JSON
+        if response.status_code >= 400:
+            response.close()
+            raise MFLHTTPError(response.status_code, urlsplit(self.request_url).netloc, response)
+        return self.response_type(response, stream=self.stream, hooks=self.hooks, decoder=self.json_decoder, fields=self.fields)
 
 ##############################################################################
 
 #### MFLExportRequest ########################################################
 
+# method name -> MFLEndpoint of every export request class, session methods are generated from it
+endpoints = {}
+
+def to_week(value):
+    """A week number, or 'YTD' / 'AVG' where MFL accepts them"""
+    if value in ('YTD', 'AVG'):
+        return value
+    return int(value)
+
+class MFLParam:
+    """Schema of one export request parameter
+
+    Attributes:
+        name (str): Request attribute and constructor argument name.
+        key (str): MFL query parameter, None for arguments that are kept on the request but not sent as a parameter.
+        flag (bool): Sent as KEY=1 when true instead of by value.
+        required (bool): A ValueError is raised when the value is None.
+        convert (callable): Validates and normalizes a value that is not None, 
+                    raising TypeError or ValueError when it is invalid.
+    """
+    __slots__ = ('name', 'key', 'flag', 'required', 'convert')
+
+    def __init__(self, name: str, key: str, flag: bool=False, required: bool=False, convert=None):
+        self.name = name
+        self.key = key
+        self.flag = flag
+        self.required = required
+        self.convert = convert
+
+    def validate(self, value, request_type: str):
+        if value is None:
+            if self.required:
+                raise ValueError(f"{request_type} request requires {self.name}")
+            return None
+        if self.flag:
+            return bool(value)
+        if self.convert is not None:
+            try:
+                return self.convert(value)
+            except(TypeError, ValueError):
+                raise ValueError(f"Invalid {self.name} {value!r} for {request_type} request")
+        return value
+
+class MFLEndpoint:
+    """Registry entry mapping an MFL export TYPE to its parameter schema and response type
+
+    Attributes:
+        method (str): Name of the MyFantasyLeagueAPISession method.
+        request_type (str): MFL export TYPE.
+        params (tuple): MFLParam schema, in constructor argument order.
+        response_type (type): MFLExportResponse subclass the response is parsed into.
+        stream (bool): The request takes a trailing stream argument.
+        description (str): First line of the generated session method docstring.
+        ttl (float): Seconds MFLResponseCache keeps a response, 0 never caches it.
+        priority (int): MFLBatchEngine dispatch priority, lower goes out first.
+        request_class (type): The MFLExportRequest subclass declaring this endpoint.
+    """
+
+    def __init__(self, method: str, request_type: str, params: tuple, response_type, stream: bool=False, description: str="",
+                    ttl: float=0, priority: int=50):
+        self.method = method
+        self.request_type = request_type
+        self.params = params
+        self.response_type = response_type
+        self.stream = stream
+        self.description = description
+        self.ttl = ttl
+        self.priority = priority
+        self.request_class = None
+
+    @property
+    def argument_names(self) -> tuple:
+        names = tuple(param.name for param in self.params)
+        return names + ('stream',) if self.stream else names
+
+class MFLExportRequestParams:
+    """A non-data descriptor that serializes the request's endpoint params once and caches the dictionary on the instance"""
+    def __get__(self, obj, type):
+        if obj is None:
+            return self
+        params = {'TYPE' : obj.request_type}
+        for param in obj.endpoint.params:
+            value = getattr(obj, param.name)
+            if param.key is None or value is None or value is False:
+                continue
+            params[param.key] = 1 if param.flag else value
+        params['JSON'] = obj.json
+        obj.__dict__['request_params'] = params
+        return params
+
 class MFLExportRequest(MFLRequest):
-    """Class to manage MFL export requests"""
+    """Class to manage MFL export requests
+
+    Subclasses declare an MFLEndpoint, its params are validated when the request is built
+    and the subclass is added to the endpoints registry. Every request also takes a fields keyword,
+    the keys kept by the response's derived views (see MFLResponse).
+    """
     request_base_type = "export"
-    pass
+    endpoint = None
+    request_params = MFLExportRequestParams()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        endpoint = cls.__dict__.get('endpoint')
+        if endpoint is not None:
+            cls.request_type = endpoint.request_type
+            cls.response_type = endpoint.response_type
+            endpoint.request_class = cls
+            endpoints[endpoint.method] = endpoint
+
+    def __init__(self, *args, fields=None, **kwargs):
+        names = self.endpoint.argument_names
+        if len(args) > len(names):
+            raise TypeError(f"{type(self).__name__} takes at most {len(names)} arguments ({len(args)} given)")
+        values = dict(zip(names, args))
+        for name, value in kwargs.items():
+            if name not in names:
+                raise TypeError(f"{type(self).__name__} got an unexpected keyword argument '{name}'")
+            if name in values:
+                raise TypeError(f"{type(self).__name__} got multiple values for argument '{name}'")
+            values[name] = value
+
+        for param in self.endpoint.params:
+            setattr(self, param.name, param.validate(values.get(param.name), self.endpoint.request_type))
+        self.stream = bool(values.get('stream', False))
+        if isinstance(fields, str):
+            # a bare key, not an iterable of its characters
+            fields = (fields,)
+        self.fields = tuple(sorted(fields)) if fields is not None else None
+        self.json = 1
 
 ##############################################################################
 
 #### MFLRostersRequest #######################################################
 
-class MFLRostersRequestParams:
-    """A non-data descriptor that returns MFL rosters request params as a dictionary"""
-    def __get__(self, obj, type):
-        params = {'TYPE' : obj.request_type, 'L' : obj.league_id}
-        if obj.franchise is not None:
-            params['FRANCHISE'] = obj.franchise
-        if obj.week is not None:
-            params['W'] = obj.week
-        params['JSON'] = obj.json
-        return params
-
 class MFLRostersRequest(MFLExportRequest):
     """Class to manage MFL rosters request"""
-    request_type = "rosters"
-    request_params = MFLRostersRequestParams()
-
-    def __init__(self, league_id: str, franchise: str=None, week: int=None):
-        self.league_id = league_id
-        self.franchise = franchise
-        self.week = week
-        self.json = 1
-
-    def make_request(self):
-        response = super().make_request()
-        return MFLRostersResponse(response)
+    endpoint = MFLEndpoint('rosters', "rosters", (
+        MFLParam('league_id', 'L', required=True),
+        MFLParam('franchise', 'FRANCHISE'),
+        MFLParam('week', 'W', convert=to_week),
+    ), MFLRostersResponse, ttl=300, priority=20)
 
 ##############################################################################
 
 #### MFLPlayersRequest #######################################################
 
-class MFLPlayersRequestParams:
-    """A non-data descriptor that returns MFL players request params as a dictionary"""
-    def __get__(self, obj, type):
-        params = {'TYPE' : obj.request_type}
-        if obj.league_id is not None:
-            params['L'] = obj.league_id
-        if obj.details:
-            params['DETAILS'] = 1
-        if obj.since is not None:
-            params['SINCE'] = obj.since
-        if obj.players is not None:
-            params['PLAYERS'] = obj.players
-        params['JSON'] = obj.json
-        return params
-
 class MFLPlayersRequest(MFLExportRequest):
     """Class to manage MFL players request"""
-    request_type = "players"
-    request_params = MFLPlayersRequestParams()
-
-    def __init__(self, league_id: str=None, details: bool=False, since: int=None, players: str=None):
-        self.league_id = league_id
-        self.details = details
-        self.since = since
-        self.players = players
-        self.json = 1
-
-    def make_request(self):
-        response = super().make_request()
-        return MFLPlayersResponse(response)
+    endpoint = MFLEndpoint('players', "players", (
+        MFLParam('league_id', 'L'),
+        MFLParam('details', 'DETAILS', flag=True),
+        MFLParam('since', 'SINCE', convert=int),
+        MFLParam('players', 'PLAYERS'),
+    ), MFLPlayersResponse, stream=True, ttl=3600, priority=30)
 
 ##############################################################################
 
 #### MFLLeagueRequest ########################################################
 
-class MFLLeagueRequestParams:
-    """A non-data descriptor that returns MFL league request params as a dictionary"""
-    def __get__(self, obj, type):
-        params = {'TYPE' : obj.request_type, 'L' : obj.league_id, 'JSON' : obj.json}
-        return params
-
 class MFLLeagueRequest(MFLExportRequest):
     """Class to manage MFL league request"""
-    request_type = "league"
-    request_params = MFLLeagueRequestParams()
-
-    def __init__(self, league_id: str):
-        self.league_id = league_id
-        self.json = 1
-
-    def make_request(self):
-        response = super().make_request()
-        return MFLLeagueResponse(response)
+    endpoint = MFLEndpoint('league', "league", (
+        MFLParam('league_id', 'L', required=True),
+    ), MFLLeagueResponse, ttl=3600, priority=20)
 
 ##############################################################################
 
 #### MFLLiveScoringRequest ###################################################
 
-class MFLLiveScoringRequestParams:
-    """A non-data descriptor that returns MFL live scoring request params as a dictionary"""
-    def __get__(self, obj, type):
-        params = {'TYPE' : obj.request_type, 'L' : obj.league_id}
-        if obj.week is not None:
-            params['W'] = obj.week
-        if obj.details:
-            params['DETAILS'] = 1
-        params['JSON'] = obj.json
-        return params
-
 class MFLLiveScoringRequest(MFLExportRequest):
     """Class to manage MFL live scoring request"""
-    request_type = "liveScoring"
-    request_params = MFLLiveScoringRequestParams()
-
-    def __init__(self, league_id: str, week: int=None, details: bool=False):
-        self.league_id = league_id
-        self.week = week
-        self.details = details
-        self.json = 1
-
-    def make_request(self):
-        response = super().make_request()
-        return MFLLiveScoringResponse(response)
+    endpoint = MFLEndpoint('live_scoring', "liveScoring", (
+        MFLParam('league_id', 'L', required=True),
+        MFLParam('week', 'W', convert=to_week),
+        MFLParam('details', 'DETAILS', flag=True),
+    ), MFLLiveScoringResponse, ttl=0, priority=0)
 
 ##############################################################################
 
 #### MFLPlayerScoresRequest ##################################################
 
-class MFLPlayerScoresRequestParams:
-    """A non-data descriptor that returns MFL player scores request params as a dictionary"""
-    def __get__(self, obj, type):
-        params = {'TYPE' : obj.request_type, 'L' : obj.league_id}
-        if obj.week is not None:
-            params['W'] = obj.week
-        #if obj.year is not None:
-        #    params['YEAR'] = obj.year
-        if obj.players is not None:
-            params['PLAYERS'] = obj.players
-        if obj.status is not None:
-            params['STATUS'] = obj.status
-        if obj.rules:
-            params['RULES'] = 1
-        if obj.count is not None:
-            params['COUNT'] = obj.count
-        params['JSON'] = obj.json
-        return params
+def chunk_player_ids(player_ids, chunk_size: int=100, max_length: int=1500) -> list:
+    """Split player ids into comma separated PLAYERS values of at most chunk_size ids and max_length characters"""
+    chunks, chunk, length = [], [], 0
+    for player_id in player_ids:
+        player_id = str(player_id)
+        if chunk and (len(chunk) >= chunk_size or length + 1 + len(player_id) > max_length):
+            chunks.append(','.join(chunk))
+            chunk, length = [], 0
+        chunk.append(player_id)
+        length += len(player_id) + (1 if length else 0)
+    if chunk:
+        chunks.append(','.join(chunk))
+    return chunks
 
 class MFLPlayerScoresRequest(MFLExportRequest):
     """Class to manage MFL player scores request"""
-    request_type = "playerScores"
-    request_params = MFLPlayerScoresRequestParams()
-
-    def __init__(self, league_id: str, week: int=None, year: int=None, players: str=None, status: str=None, rules: bool=False, count: int=None):
-        self.league_id = league_id
-        self.week = week
-        self.year = year # TO DO ignored, MFLRequest.default_year always used
-        self.players = players
-        self.status = status
-        self.rules = rules
-        self.count = count
-        self.json = 1
+    endpoint = MFLEndpoint('player_scores', "playerScores", (
+        MFLParam('league_id', 'L', required=True),
+        MFLParam('week', 'W', convert=to_week),
+        MFLParam('year', None, convert=int), # sent as the URL year, see MFLRequestUrl
+        MFLParam('players', 'PLAYERS'),
+        MFLParam('status', 'STATUS'),
+        MFLParam('rules', 'RULES', flag=True),
+        MFLParam('count', 'COUNT', convert=int),
+    ), MFLPlayerScoresResponse, stream=True, ttl=60, priority=10)
 
-    def make_request(self):
-        response = super().make_request()
-        return MFLPlayerScoresResponse(response)
+##############################################################################
+
+#### MFLTransactionsRequest ##################################################
+
+class MFLTransactionsRequest(MFLExportRequest):
+    """Class to manage MFL transactions request"""
+    endpoint = MFLEndpoint('transactions', "transactions", (
+        MFLParam('league_id', 'L', required=True),
+        MFLParam('week', 'W', convert=to_week),
+        MFLParam('trans_type', 'TRANS_TYPE'),
+        MFLParam('franchise', 'FRANCHISE'),
+        MFLParam('days', 'DAYS', convert=int),
+        MFLParam('count', 'COUNT', convert=int),
+    ), MFLTransactionsResponse, ttl=300, priority=20, description="All non-pending transactions for a league, optionally limited to a week, "
+                                            "transaction type (comma separated), franchise, the last days or a count.")
+
+##############################################################################
+
+#### MFLStandingsRequest #####################################################
+
+class MFLStandingsRequest(MFLExportRequest):
+    """Class to manage MFL league standings request"""
+    endpoint = MFLEndpoint('standings', "leagueStandings", (
+        MFLParam('league_id', 'L', required=True),
+        MFLParam('column_names', 'COLUMN_NAMES', flag=True),
+        MFLParam('all', 'ALL', flag=True),
+    ), MFLStandingsResponse, ttl=300, priority=20, description="The current league standings, with column_names the standings column names "
+                                            "and with all every standings field including those hidden on the site.")
+
+##############################################################################
+
+#### MFLScheduleRequest ######################################################
+
+class MFLScheduleRequest(MFLExportRequest):
+    """Class to manage MFL schedule request"""
+    endpoint = MFLEndpoint('schedule', "schedule", (
+        MFLParam('league_id', 'L', required=True),
+        MFLParam('week', 'W', convert=to_week),
+        MFLParam('franchise', 'F'),
+    ), MFLScheduleResponse, ttl=3600, priority=30, description="The fantasy schedule of a league, optionally limited to a week or a franchise, "
+                                            "with scores and results of played matchups.")
+
+##############################################################################
+
+#### MFLProjectedScoresRequest ###############################################
+
+class MFLProjectedScoresRequest(MFLExportRequest):
+    """Class to manage MFL projected scores request"""
+    endpoint = MFLEndpoint('projected_scores', "projectedScores", (
+        MFLParam('league_id', 'L'),
+        MFLParam('week', 'W', convert=to_week),
+        MFLParam('players', 'PLAYERS'),
+        MFLParam('position', 'POSITION'),
+        MFLParam('status', 'STATUS'),
+        MFLParam('count', 'COUNT', convert=int),
+    ), MFLProjectedScoresResponse, ttl=600, priority=10, description="Expected fantasy points for players in a week under the league's scoring rules, "
+                                            "optionally limited to players, a position, free agents (status='freeagent') or a count.")
+
+##############################################################################
+
+#### MFLDraftResultsRequest ##################################################
+
+class MFLDraftResultsRequest(MFLExportRequest):
+    """Class to manage MFL draft results request"""
+    endpoint = MFLEndpoint('draft_results', "draftResults", (
+        MFLParam('league_id', 'L', required=True),
+    ), MFLDraftResultsResponse, ttl=300, priority=30, description="Draft picks of a league, made and still pending, for every draft unit.")
+
+##############################################################################
+
+#### MFLRulesRequest #########################################################
+
+class MFLRulesRequest(MFLExportRequest):
+    """Class to manage MFL rules request"""
+    endpoint = MFLEndpoint('rules', "rules", (
+        MFLParam('league_id', 'L', required=True),
+    ), MFLRulesResponse, ttl=3600, priority=30, description="The scoring rules of a league, the event, range and points of every rule by position.")
 
 ##############################################################################
 
@@ -207,14 +384,11 @@ class MFLLoginRequest(MFLRequest):
     """Class to manage MFL login requests"""
     request_base_type = "login"
     request_params = MFLLoginRequestParams()
+    response_type = MFLLoginResponse
 
     def __init__(self, username, password):
         self.username = username
         self.password = password
 
-    def make_request(self):
-        response = super().make_request()
-        return MFLLoginResponse(response)
-
 ##############################################################################
 
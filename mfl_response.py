@@ -1,26 +1,149 @@
+from mfl_records import RosterEntry, Player, PlayerScore, LiveScoringPlayer, FranchiseLiveScore, intern, to_int
 import re
-import dict_digger
+import time
 
 ### MFLResponse ###############################################################
 
-class ResponseDescriptor():
+class MFLResponseError(Exception):
+    """Raised when MFL answers an export request with an error object instead of the export"""
+
+class MFLHTTPError(Exception):
+    """Raised when MFL answers with an HTTP error status, once the transport has no retries left
+
+    Attributes:
+        status_code (int): HTTP status code of the last attempt.
+        host (str): MFL host that answered.
+        response: requests.Response of the last attempt, its body is not read.
+    """
+
+    def __init__(self, status_code: int, host: str, response=None):
+        super().__init__(f"MFL host {host} answered with HTTP status {status_code}")
+        self.status_code = status_code
+        self.host = host
+        self.response = response
+
+def as_list(value) -> list:
+    """MFL returns a single object instead of a one item list when there is only one record, 
+        normalize to a list (None becomes an empty list)
+    """
+    if value is None:
+        return []
+    if hasattr(value, 'keys'):
+        return [value]
+    return value
+
+def dig(value, *path, fail: bool=False):
+    """Nested lookup in decoded JSON (dicts and lists, or lazy simdjson proxies),
+        returns None (or raises KeyError with fail=True) when an item along the path is missing
+    """
+    for key in path:
+        try:
+            value = value[key]
+        except(KeyError, IndexError, TypeError):
+            if fail:
+                raise KeyError(key)
+            return None
+    return value
+
+def project(record, fields):
+    """The record itself when fields is None, otherwise a dict of only the keys of record in fields"""
+    if fields is None:
+        return record
+    return {key : record[key] for key in fields if key in record}
+
+def error_text(error) -> str:
+    """Text of an MFL error object, {"$t" : text} or a bare value"""
+    text = dig(error, '$t')
+    return text if isinstance(text, str) else str(error)
+
+def iter_json_stream(raw_response, *path):
+    """Incrementally parse a streamed response body and yield the objects found at path one at a time,
+        whether MFL sent them as a list or as a single object. The body can only be consumed once.
+
+    Raises:
+        MFLResponseError: MFL sent an error object instead of the export.
+    """
+    try:
+        import ijson
+    except ImportError:
+        raise ImportError("Streaming MFL responses requires the ijson package")
+
+    prefix = '.'.join(path)
+    item_prefix = prefix + '.item'
+    raw_response.raw.decode_content = True
+    try:
+        builder, depth = None, 0
+        for event_path, event, value in ijson.parse(raw_response.raw):
+            if builder is None:
+                if event_path == 'error' and event != 'map_key':
+                    if event not in ('start_map', 'start_array'):
+                        raise MFLResponseError(error_text(value))
+                    builder, is_error = ijson.ObjectBuilder(), True
+                elif event != 'start_map' or event_path not in (prefix, item_prefix):
+                    continue
+                else:
+                    builder, is_error = ijson.ObjectBuilder(), False
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+                if depth == 0:
+                    if is_error:
+                        raise MFLResponseError(error_text(builder.value))
+                    yield builder.value
+                    builder = None
+    finally:
+        raw_response.close()
+
+def timed_build(obj, name: str, build):
+    """Call build() and report its duration to the instance's after_parse hooks, if there are any"""
+    hooks = obj.hooks
+    if hooks is None or not hooks.after_parse:
+        return build()
+
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    for hook in hooks.after_parse:
+        hook(obj, name, elapsed)
+    return value
+
+class CachedResponseDescriptor():
+    """Non-data descriptor that builds its value on first access and caches it in the instance's __dict__,
+        so later reads are plain attribute lookups until MFLResponse.invalidate() is called
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, type):
+        if obj is None:
+            return self
+        value = timed_build(obj, self.name, lambda: self.build(obj))
+        obj.__dict__[self.name] = value
+        return value
+
+    def build(self, obj):
+        raise NotImplementedError
+
+class ResponseDescriptor(CachedResponseDescriptor):
     """Non-data descriptor to retrieve nested values in instance's json_response"""
     def __init__(self, *path):
         self.path = path
 
-    def __get__(self, obj, type):
+    def build(self, obj):
         try:
-            return dict_digger.dig(obj.json_response, *self.path, fail=True)
+            return dig(obj.json_response, *self.path, fail=True)
         except(IndexError, KeyError):
             raise AttributeError("Item not present in instance attribute 'json_response'")
 
-class ResponseJsonDescriptor():
+class ResponseJsonDescriptor(CachedResponseDescriptor):
     """Non-data descriptor to retrieve JSON object from the instance's raw_response 
         (if the raw_response was written in JSON format, if not it returns an empty dict)
     """
-    def __get__(self, obj, type):
+    def build(self, obj):
         try:
-            return obj.raw_response.json()
+            return obj.decode()
         except:
             return {}
 
@@ -36,15 +159,41 @@ class MFLResponse:
 
     json_response = ResponseJsonDescriptor()
     status_code = ResponseStatusCodeDescriptor()
+    hooks = None
+    decoder = None
+    fields = None
 
-    def __init__(self, response):
+    def __init__(self, response, stream: bool=False, hooks=None, decoder=None, fields=None):
         """Init MFLResponse class
         
         Args:
             raw_response: requests.Response() Object contains the server's response to the HTTP request.
+            stream: True when the body has not been downloaded yet and should be parsed incrementally.
+            hooks: MFLHooks whose after_parse callbacks time the JSON decode and derived view builds.
+            decoder: Function decoding the body bytes (see mfl_json), requests' json() is used when None.
+            fields: Keys kept when derived views copy MFL records (franchises, standings, ...), all when None.
 
         """
         self.raw_response = response
+        self.stream = stream
+        self.hooks = hooks
+        self.decoder = decoder
+        self.fields = frozenset(fields) if fields is not None else None
+
+    def decode(self):
+        """Decode raw_response with the configured decoder"""
+        if self.decoder is None:
+            return self.raw_response.json()
+        return self.decoder(self.raw_response.content)
+
+    def invalidate(self):
+        """Drop the cached json_response and every cached derived view, 
+            they are rebuilt from raw_response on next access
+        """
+        for klass in type(self).__mro__:
+            for name, attr in vars(klass).items():
+                if isinstance(attr, CachedResponseDescriptor):
+                    self.__dict__.pop(name, None)
 
 ##############################################################################
 
@@ -52,32 +201,81 @@ class MFLResponse:
 
 class MFLExportResponse(MFLResponse):
     """Class to manage MFL Export responses"""
-    def __init__(self, response):
+
+    # set once a streamed body turned out to be an error object
+    stream_error = None
+    # set by the session on streamed responses, callable returning the response of the request sent again after logging in
+    resend = None
+
+    def __init__(self, response, stream: bool=False, hooks=None, decoder=None, fields=None):
+        super().__init__(response, stream, hooks, decoder, fields)
+
+        # decode once, the result is the cached json_response. Streamed bodies are parsed as they are iterated
+        if stream:
+            return
         try:
-            response.json()
+            self.json_response = timed_build(self, 'json_response', self.decode)
         except(AttributeError):
             raise ValueError("response is not valid JSON")
 
-        super().__init__(response)
+    # MFL answers requests that need a (valid) cookie with an error object rather than a 401
+    auth_error_pattern = re.compile('logged in|login|cookie|not authorized', re.IGNORECASE)
+
+    @property
+    def error(self) -> str:
+        """Text of the error object MFL sent instead of the export, None when there is none"""
+        if self.stream and 'json_response' not in self.__dict__:
+            return self.stream_error
+        error = dig(self.json_response, 'error')
+        return error_text(error) if error is not None else None
+
+    @property
+    def is_auth_error(self) -> bool:
+        """True when MFL rejected the request because the user cookie is missing, invalid or expired"""
+        if self.status_code in (401, 403):
+            return True
+        error = self.error
+        return error is not None and self.auth_error_pattern.search(error) is not None
+
+    def iter_records(self, *path):
+        """Yield the records at path one at a time, incrementally parsed from the body when the response is streamed
+
+        Raises:
+            MFLResponseError: MFL sent an error object instead of the export. A streamed body is only read here,
+                    when the error rejected the user cookie and the response has a resend callback the request
+                    is sent again (after logging in) and its records are yielded instead.
+        """
+        if self.stream and 'json_response' not in self.__dict__:
+            return self.iter_stream(path)
+        return iter(as_list(dig(self.json_response, *path)))
+
+    def iter_stream(self, path):
+        try:
+            yield from iter_json_stream(self.raw_response, *path)
+        except MFLResponseError as error:
+            self.stream_error = str(error)
+            if self.resend is None or not self.is_auth_error:
+                raise
+            yield from self.resend().iter_records(*path)
 
 ##############################################################################
 
 #### MFLRostersResponse ######################################################
 
-class RostersResponseDescriptor():
+class RostersResponseDescriptor(CachedResponseDescriptor):
     
-    def __get__(self, obj, type):
+    def build(self, obj):
         
-        rosters_json_raw = dict_digger.dig(obj.json_response, 'rosters', 'franchise')
+        rosters_json_raw = as_list(dig(obj.json_response, 'rosters', 'franchise'))
 
         franchise_dict = {}
         for franchise in rosters_json_raw:
             
             player_dict = {}
-            for player in franchise['player']:
-                player_dict[ player['id'] ] = { 'status' : player['status'], 'salary' : player['salary'] }
+            for player in as_list(franchise.get('player')):
+                player_dict[ intern(player['id']) ] = RosterEntry.from_json(player)
 
-            franchise_dict[ franchise['id'] ] = { 'week' :  franchise['week'], 'players' : player_dict }
+            franchise_dict[ intern(franchise['id']) ] = { 'week' :  franchise['week'], 'players' : player_dict }
 
         return franchise_dict
 
@@ -86,31 +284,21 @@ class MFLRostersResponse(MFLExportResponse):
     
     rosters = RostersResponseDescriptor() 
     week = ResponseDescriptor('rosters', 'franchise', 0, 'week')
-    
-    def __init__(self, response):
-        super().__init__(response)
 
 ##############################################################################
 
 #### MFLPlayersResponse ######################################################
 
-class PlayersResponseDescriptor():
+class PlayersResponseDescriptor(CachedResponseDescriptor):
     
-    def __get__(self, obj, type):
+    def build(self, obj):
         
-        players_json_raw = dict_digger.dig(obj.json_response, 'players', 'player')
-
-        # TO DO handle this better
-        if players_json_raw is None:
-            return {}
+        players_json_raw = as_list(dig(obj.json_response, 'players', 'player'))
 
         player_dict = {}
         for player in players_json_raw:
 
-            player_dict[ player['id'] ] = { 'name' :  player['name'], 
-                                            'position' : player['position'], 
-                                            'team' : player['team'],
-                                            'status' : player.get('status', '') }
+            player_dict[ intern(player['id']) ] = Player.from_json(player)
 
         return player_dict
 
@@ -120,18 +308,19 @@ class MFLPlayersResponse(MFLExportResponse):
     players = PlayersResponseDescriptor() 
     timestamp = ResponseDescriptor('players', 'timestamp')
 
-    def __init__(self, response):
-        super().__init__(response)
+    def iter_players(self):
+        """Yield raw player records one at a time"""
+        return self.iter_records('players', 'player')
 
 ##############################################################################
 
 #### MFLLeagueResponse #######################################################
 
-class FranchisesResponseDescriptor():
+class FranchisesResponseDescriptor(CachedResponseDescriptor):
     
-    def __get__(self, obj, type):
+    def build(self, obj):
         
-        franchises_json_raw = dict_digger.dig(obj.json_response, 'league', 'franchises', 'franchise')
+        franchises_json_raw = as_list(dig(obj.json_response, 'league', 'franchises', 'franchise'))
 
         franchise_dict = {}
         for franchise in franchises_json_raw:
@@ -139,7 +328,7 @@ class FranchisesResponseDescriptor():
             franchise_id = franchise['id']
             franchise_dict[franchise_id] = {}
             for key in franchise:
-                if(key != 'id'):
+                if(key != 'id' and (obj.fields is None or key in obj.fields)):
                     franchise_dict[franchise_id][key] = franchise[key]
 
         return franchise_dict
@@ -148,42 +337,29 @@ class FranchisesResponseDescriptor():
 class MFLLeagueResponse(MFLExportResponse):
     
     franchises = FranchisesResponseDescriptor() 
-    
-    def __init__(self, response):
-        super().__init__(response)
 
 ##############################################################################
 
 #### MFLLiveScoringResponse ##################################################
 
-class FranchiseLiveScoringResponseDescriptor():
+class FranchiseLiveScoringResponseDescriptor(CachedResponseDescriptor):
     
-    def __get__(self, obj, type):
+    def build(self, obj):
         
-        matchups_raw_json = dict_digger.dig(obj.json_response, 'liveScoring', 'matchup')
+        matchups_raw_json = as_list(dig(obj.json_response, 'liveScoring', 'matchup'))
 
         franchise_dict = {}
         for matchup in matchups_raw_json:
 
-            franchise_pair_json = dict_digger.dig(matchup, 'franchise')
+            franchise_pair_json = as_list(dig(matchup, 'franchise'))
             #print(franchise_pair_json)
             for franchise in franchise_pair_json:
-                players = dict_digger.dig(franchise, 'players', 'player')
+                players = as_list(dig(franchise, 'players', 'player'))
                 player_dict = {}
                 for player in players:
+                    player_dict[ intern(player['id']) ] = LiveScoringPlayer.from_json(player)
 
-                    player_id = player['id']
-                    player_dict[player_id] = {}
-                    for key in player:
-                        if(key != 'id'):
-                            player_dict[player_id][key] = player[key]
-
-                franchise_dict[ franchise['id'] ] = { 'playersCurrentlyPlaying' : franchise['playersCurrentlyPlaying'], 
-                                                        'isHome' : franchise['isHome'],
-                                                        'gameSecondsRemaining' : franchise['gameSecondsRemaining'], 
-                                                        'playersYetToPlay' : franchise['playersYetToPlay'], 
-                                                        'score' : franchise['score'], 
-                                                        'players' : player_dict }
+                franchise_dict[ intern(franchise['id']) ] = FranchiseLiveScore.from_json(franchise, player_dict)
 
         return franchise_dict
 
@@ -192,25 +368,34 @@ class MFLLiveScoringResponse(MFLExportResponse):
     
     franchise_live_scoring = FranchiseLiveScoringResponseDescriptor() 
     week = ResponseDescriptor('liveScoring', 'week')
-    
-    def __init__(self, response):
-        super().__init__(response)
+
+    def to_arrays(self, league_id: str=None, level: str='player') -> dict:
+        """Typed NumPy columns built directly from json_response, see mfl_columnar.live_scoring_to_arrays"""
+        import mfl_columnar
+        return mfl_columnar.live_scoring_to_arrays(self.json_response, league_id, level)
+
+    def to_frame(self, league_id: str=None, level: str='player'):
+        """pandas.DataFrame of to_arrays()"""
+        import mfl_columnar
+        return mfl_columnar.to_frame(self.to_arrays(league_id, level))
 
 ##############################################################################
 
 #### MFLPlayerScoresResponse #################################################
 
-class PlayerScoresResponseDescriptor():
+class PlayerScoresResponseDescriptor(CachedResponseDescriptor):
+
+    def __init__(self, root: str='playerScores'):
+        self.root = root
     
-    def __get__(self, obj, type):
+    def build(self, obj):
         
-        player_scores_json_raw = dict_digger.dig(obj.json_response, 'playerScores', 'playerScore')
+        player_scores_json_raw = as_list(dig(obj.json_response, self.root, 'playerScore'))
 
         player_dict = {}
         for player in player_scores_json_raw:
 
-            player_id = player['id']
-            player_dict[player_id] = { 'isAvailable' : player['isAvailable'], 'score' : player['score'] }
+            player_dict[ intern(player['id']) ] = PlayerScore.from_json(player)
 
         return player_dict
 
@@ -219,26 +404,138 @@ class MFLPlayerScoresResponse(MFLExportResponse):
     player_scores = PlayerScoresResponseDescriptor() 
     week = ResponseDescriptor('playerScores', 'week')
 
-    def __init__(self, response):
-        super().__init__(response)
+    def iter_player_scores(self):
+        """Yield raw playerScore records one at a time"""
+        return self.iter_records('playerScores', 'playerScore')
+
+    def to_arrays(self, league_id: str=None) -> dict:
+        """Typed NumPy columns built directly from json_response, see mfl_columnar.player_scores_to_arrays"""
+        import mfl_columnar
+        return mfl_columnar.player_scores_to_arrays(self.json_response, league_id)
+
+    def to_frame(self, league_id: str=None):
+        """pandas.DataFrame of to_arrays()"""
+        import mfl_columnar
+        return mfl_columnar.to_frame(self.to_arrays(league_id))
+
+##############################################################################
+
+#### MFLTransactionsResponse #################################################
+
+class RecordsResponseDescriptor(CachedResponseDescriptor):
+    """Non-data descriptor that returns the records at path in instance's json_response as a list"""
+    def __init__(self, *path):
+        self.path = path
+
+    def build(self, obj):
+        return [project(record, obj.fields) for record in as_list(dig(obj.json_response, *self.path))]
+
+class KeyedRecordsResponseDescriptor(RecordsResponseDescriptor):
+    """Non-data descriptor that returns the records at path in instance's json_response keyed by id"""
+    def build(self, obj):
+        records = as_list(dig(obj.json_response, *self.path))
+        return {intern(record['id']) : project(record, obj.fields) for record in records}
+
+
+class MFLTransactionsResponse(MFLExportResponse):
+
+    transactions = RecordsResponseDescriptor('transactions', 'transaction')
+
+##############################################################################
+
+#### MFLStandingsResponse ####################################################
+
+class MFLStandingsResponse(MFLExportResponse):
+
+    standings = KeyedRecordsResponseDescriptor('leagueStandings', 'franchise')
+
+##############################################################################
+
+#### MFLScheduleResponse #####################################################
+
+class ScheduleResponseDescriptor(CachedResponseDescriptor):
+    """Non-data descriptor that returns week -> list of matchups, each matchup a list of franchise results"""
+    def build(self, obj):
+        
+        weekly_schedule_json_raw = as_list(dig(obj.json_response, 'schedule', 'weeklySchedule'))
+
+        week_dict = {}
+        for weekly_schedule in weekly_schedule_json_raw:
+            week_dict[ to_int(weekly_schedule['week']) ] = [[project(franchise, obj.fields) for franchise in as_list(matchup.get('franchise'))]
+                                                                    for matchup in as_list(weekly_schedule.get('matchup'))]
+
+        return week_dict
+
+
+class MFLScheduleResponse(MFLExportResponse):
+
+    schedule = ScheduleResponseDescriptor()
+
+##############################################################################
+
+#### MFLProjectedScoresResponse ##############################################
+
+class MFLProjectedScoresResponse(MFLExportResponse):
+
+    player_scores = PlayerScoresResponseDescriptor('projectedScores')
+    week = ResponseDescriptor('projectedScores', 'week')
+
+##############################################################################
+
+#### MFLDraftResultsResponse #################################################
+
+class DraftPicksResponseDescriptor(CachedResponseDescriptor):
+    """Non-data descriptor that returns the draft picks of every draft unit as one list"""
+    def build(self, obj):
+        draft_units = as_list(dig(obj.json_response, 'draftResults', 'draftUnit'))
+        return [project(pick, obj.fields) for draft_unit in draft_units for pick in as_list(draft_unit.get('draftPick'))]
+
+
+class MFLDraftResultsResponse(MFLExportResponse):
+
+    draft_picks = DraftPicksResponseDescriptor()
+
+##############################################################################
+
+#### MFLRulesResponse ########################################################
+
+class PositionRulesResponseDescriptor(CachedResponseDescriptor):
+    """Non-data descriptor that returns the scoring rules as a list of (positions, rules) pairs,
+        positions a tuple of position codes and rules a list of {'event', 'range', 'points'} strings
+    """
+    def build(self, obj):
+
+        position_rules_json_raw = as_list(dig(obj.json_response, 'rules', 'positionRules'))
+
+        position_rules = []
+        for position_rule in position_rules_json_raw:
+            positions = tuple(dig(position_rule, 'positions').split('|'))
+            rules = [{key : dig(rule, key, '$t') for key in ('event', 'range', 'points')} for rule in as_list(position_rule.get('rule'))]
+            position_rules.append((positions, rules))
+
+        return position_rules
+
+
+class MFLRulesResponse(MFLExportResponse):
+
+    position_rules = PositionRulesResponseDescriptor()
 
 ##############################################################################
 
 #### MFLLoginResponse ########################################################
 
 class MFLLoginResponseCookie:
-    """A non-data descriptor that returns a formatted MFL login request URL string"""
+    """A non-data descriptor that returns the MFL_USER_ID cookie from a login response (None if the login failed)"""
     
-    # regex pattern to find cookie in response text
-    regex_pattern = 'MFL_USER_ID="([^"]*)">OK'
+    # regex pattern to find cookie in response text, compiled once
+    regex_pattern = re.compile('MFL_USER_ID="([^"]*)">OK')
 
     def __get__(self, obj, type):
-        cookie =  re.search(self.regex_pattern, obj.text).group(1)
+        match = self.regex_pattern.search(obj.raw_response.text)
         
-        if cookie is not None:
-            return cookie
+        if match is not None:
+            return match.group(1)
         else:
-            print("Failed to retrieve cookie")
             return None
 
 class MFLLoginResponse(MFLResponse):
@@ -246,7 +543,4 @@ class MFLLoginResponse(MFLResponse):
 
     cookie = MFLLoginResponseCookie()
 
-    def __init__(self, response):
-        super().__init__(response)
-
 ##############################################################################
\ No newline at end of file
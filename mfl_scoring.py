@@ -0,0 +1,211 @@
+'''
+mfl_scoring.py
+
+MFLRuleSet and MFLScoringEngine objects
+
+'''
+
+from typing import NamedTuple
+import re
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def require_numpy():
+    if numpy is None:
+        raise ImportError("The MFL scoring engine requires the numpy package")
+
+### MFLRuleSet ###############################################################
+
+class MFLScoringRule(NamedTuple):
+    """One scoring rule: points for an event whose value lies in [low, high]
+
+    kind is 'flat' (points once), 'per_unit' (points times the value, MFL '*x') or
+    'per_n' (points for every full per units, MFL 'x/n').
+    """
+    event: str
+    low: float
+    high: float
+    kind: str
+    points: float
+    per: float = 1.0
+
+range_pattern = re.compile(r'\s*(-?\d+(?:\.\d+)?)\s*(?:-\s*(-?\d+(?:\.\d+)?))?\s*')
+
+def parse_range(text: str) -> tuple:
+    """(low, high) from an MFL rule range like '0-999', '-99--1' or '5'"""
+    match = range_pattern.fullmatch(text or '')
+    if match is None:
+        raise ValueError(f"Invalid scoring rule range {text!r}")
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) is not None else low
+    return low, high
+
+def parse_points(text: str) -> tuple:
+    """(kind, points, per) from MFL rule points like '*.04', '1/25' or '6'"""
+    text = (text or '').strip()
+    try:
+        if text.startswith('*'):
+            return 'per_unit', float(text[1:]), 1.0
+        if '/' in text:
+            points, per = text.split('/', 1)
+            return 'per_n', float(points), float(per)
+        return 'flat', float(text), 1.0
+    except(ValueError):
+        raise ValueError(f"Invalid scoring rule points {text!r}")
+
+def make_rule(event: str, range: str, points: str) -> MFLScoringRule:
+    low, high = parse_range(range)
+    kind, points, per = parse_points(points)
+    return MFLScoringRule(event, low, high, kind, points, per)
+
+class MFLRuleSet:
+    """Class to hold a set of scoring rules by position
+
+    Usage:
+        rule_set = MFLRuleSet.from_response(session.rules())
+        what_if = rule_set.override('#P', '*6', name='6pt passing TD')
+
+    Attributes:
+        position_rules (dict): position -> list of MFLScoringRule.
+        name (str): Label of the rule set.
+    """
+
+    def __init__(self, position_rules: dict, name: str=None):
+        self.position_rules = position_rules
+        self.name = name
+
+    @classmethod
+    def from_response(cls, response, name: str=None):
+        """Rule set from an MFLRulesResponse, a rule listed for several positions applies to each of them"""
+        position_rules = {}
+        for positions, rules in response.position_rules:
+            parsed = [make_rule(rule['event'], rule['range'], rule['points']) for rule in rules]
+            for position in positions:
+                position_rules.setdefault(position, []).extend(parsed)
+        return cls(position_rules, name)
+
+    @property
+    def events(self) -> set:
+        return {rule.event for rules in self.position_rules.values() for rule in rules}
+
+    def override(self, event: str, points: str, range: str=None, positions=None, name: str=None):
+        """Copy of the rule set with new points for event, limited to one range and some positions when given.
+            With a range, a rule is added to positions that have no rule for event and range yet.
+        """
+        low_high = parse_range(range) if range is not None else None
+        kind, value, per = parse_points(points)
+        positions = set(positions) if positions is not None else set(self.position_rules)
+
+        position_rules = {}
+        for position, rules in self.position_rules.items():
+            if position not in positions:
+                position_rules[position] = list(rules)
+                continue
+            replaced = False
+            new_rules = []
+            for rule in rules:
+                if rule.event == event and (low_high is None or (rule.low, rule.high) == low_high):
+                    rule = rule._replace(kind=kind, points=value, per=per)
+                    replaced = True
+                new_rules.append(rule)
+            if not replaced and low_high is not None:
+                new_rules.append(MFLScoringRule(event, *low_high, kind, value, per))
+            position_rules[position] = new_rules
+        return type(self)(position_rules, name)
+
+##############################################################################
+
+### MFLScoringEngine #########################################################
+
+def stats_to_arrays(records: dict, player_ids, weeks, events=None) -> dict:
+    """event -> float64 array of shape (players, weeks) from {(player id, week) : {event : value}}
+
+    Weeks without a record are NaN, so no rule scores them. Events missing from a record are 0.
+    """
+    require_numpy()
+    player_index = {player_id : index for index, player_id in enumerate(player_ids)}
+    week_index = {week : index for index, week in enumerate(weeks)}
+    if events is None:
+        events = {event for record in records.values() for event in record}
+
+    shape = (len(player_index), len(week_index))
+    present = numpy.zeros(shape, dtype=numpy.bool_)
+    arrays = {event : numpy.zeros(shape) for event in events}
+    for (player_id, week), record in records.items():
+        row, column = player_index.get(player_id), week_index.get(week)
+        if row is None or column is None:
+            continue
+        present[row, column] = True
+        for event, value in record.items():
+            array = arrays.get(event)
+            if array is not None:
+                array[row, column] = float(value)
+    for array in arrays.values():
+        array[~present] = numpy.nan
+    return arrays
+
+class MFLScoringEngine:
+    """Class to compute fantasy points locally for many rule sets, players and weeks at once
+
+    Each rule is one vectorized pass over the (players, weeks) stats of the positions it applies to,
+    and rule sets sharing a rule (same event, range, kind and per) are scored in a single pass.
+    Rules whose event has no stats array are skipped. Events MFL scores per occurrence
+    (e.g. touchdown distance) need per occurrence stats and are not reproduced from weekly totals.
+
+    Usage:
+        engine = MFLScoringEngine([rule_set, what_if])
+        points = engine.score(stats_to_arrays(records, player_ids, weeks), positions)
+        points.shape == (2, len(player_ids), len(weeks))
+    """
+
+    def __init__(self, rule_sets):
+        require_numpy()
+        self.rule_sets = [rule_sets] if isinstance(rule_sets, MFLRuleSet) else list(rule_sets)
+
+    def score(self, stats: dict, positions) -> 'numpy.ndarray':
+        """Fantasy points of shape (rule sets, players, weeks)
+
+        Args:
+            stats: event -> array of shape (players, weeks), see stats_to_arrays.
+            positions: Position code of each player, in stats row order.
+        """
+        positions = numpy.asarray(positions)
+        shape = next(iter(stats.values())).shape if stats else (len(positions), 0)
+        if shape[0] != len(positions):
+            raise ValueError("positions must have one entry per stats row")
+
+        points = numpy.zeros((len(self.rule_sets),) + shape)
+        for position in numpy.unique(positions):
+            rows = numpy.flatnonzero(positions == position)
+            totals = numpy.zeros((len(self.rule_sets), len(rows), shape[1]))
+
+            # (event, low, high, kind, per) -> points per rule set, so shared rules are computed once
+            passes = {}
+            for index, rule_set in enumerate(self.rule_sets):
+                for rule in rule_set.position_rules.get(position, ()):
+                    if rule.event not in stats:
+                        continue
+                    key = (rule.event, rule.low, rule.high, rule.kind, rule.per)
+                    passes.setdefault(key, numpy.zeros(len(self.rule_sets)))[index] += rule.points
+
+            values_by_event = {}
+            for (event, low, high, kind, per), rule_points in passes.items():
+                values = values_by_event.get(event)
+                if values is None:
+                    values = values_by_event[event] = stats[event][rows]
+                in_range = (values >= low) & (values <= high)
+                if kind == 'flat':
+                    units = in_range.astype(numpy.float64)
+                elif kind == 'per_unit':
+                    units = numpy.where(in_range, values, 0.0)
+                else:
+                    units = numpy.where(in_range, numpy.floor(values / per), 0.0)
+                totals += rule_points[:, None, None] * units
+
+            points[:, rows, :] = totals
+        return points
+
+##############################################################################
@@ -0,0 +1,81 @@
+'''
+mfl_singleflight.py
+
+MFLSingleFlight object
+
+'''
+
+import threading
+import time
+
+class MFLSingleFlightCall:
+    """A call in flight (or recently finished) that waiters share the result of"""
+    __slots__ = ('event', 'result', 'error', 'expires')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.expires = None
+
+class MFLSingleFlight:
+    """Class to coalesce identical MFL requests
+
+    While a request is in flight every identical request waits for it and receives the same parsed
+    MFLResponse instead of sending its own. With a ttl the finished result keeps being shared for that
+    many seconds (a micro cache), failures are never shared once the call has returned.
+
+    Attributes:
+        ttl (float): Seconds a finished result is still handed out, 0 only coalesces in-flight calls.
+        calls (int): Number of calls actually executed.
+        shared (int): Number of calls answered with another call's result.
+    """
+
+    def __init__(self, ttl: float=0):
+        self.ttl = ttl
+        self.calls = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, function):
+        """Run function() unless an identical call (same key) is in flight or still fresh, and return its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and (call.expires is None or time.monotonic() < call.expires):
+                self.shared += 1
+                leader = False
+            else:
+                if len(self._calls) > 1024:
+                    self._purge()
+                call = MFLSingleFlightCall()
+                self._calls[key] = call
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                if self.ttl and call.error is None:
+                    call.expires = time.monotonic() + self.ttl
+                else:
+                    call.expires = 0
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def _purge(self):
+        now = time.monotonic()
+        for key in [key for key, call in self._calls.items() if call.expires is not None and call.expires <= now]:
+            del self._calls[key]
@@ -0,0 +1,233 @@
+'''
+mfl_transport.py
+
+MFLTransport object
+
+'''
+
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib.parse import urlsplit
+import random
+import requests
+import threading
+import time
+
+# urllib3 decodes br bodies when one of these is installed, only then is br offered
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+class MFLCircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker for its host is open"""
+
+def build_response(url: str, status_code: int, headers: dict, content: bytes) -> requests.Response:
+    """Build a requests.Response from a stored status code, headers and body"""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers) or 'utf-8'
+    response._content = content
+    return response
+
+### MFLRetryPolicy ##########################################################
+
+class MFLRetryPolicy:
+    """Class to decide when and how long to wait before retrying an idempotent MFL export request
+
+    Attributes:
+        max_retries: Number of retries after the first attempt.
+        backoff_factor: Base delay in seconds, doubled on each retry (full jitter is applied).
+        max_backoff: Longest delay in seconds, a larger Retry-After returns the response instead of waiting.
+        retry_statuses: Response status codes that are retried.
+    """
+
+    def __init__(self, max_retries: int=2, backoff_factor: float=0.5, max_backoff: float=30.0,
+                    retry_statuses: tuple=(429, 500, 502, 503, 504)):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = retry_statuses
+
+    def delay(self, attempt: int, response=None) -> float:
+        """Seconds to wait before retry number attempt + 1, None when the request should not be retried"""
+        if attempt >= self.max_retries:
+            return None
+
+        retry_after = self.retry_after(response) if response is not None else None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_backoff else None
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    @staticmethod
+    def retry_after(response):
+        value = response.headers.get('Retry-After')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except(ValueError):
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except(TypeError, ValueError):
+            return None
+
+##############################################################################
+
+### MFLCircuitBreaker ########################################################
+
+class MFLCircuitBreaker:
+    """Class to fail fast on hosts that keep failing
+
+    After failure_threshold consecutive failures the host's circuit opens and requests raise
+    MFLCircuitOpenError without being sent. Once reset_timeout seconds have passed a single trial
+    request is let through, its success closes the circuit and its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int=5, reset_timeout: float=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = {}
+        self._opened_at = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, host: str) -> bool:
+        with self._lock:
+            return host in self._opened_at
+
+    def allow(self, host: str) -> bool:
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return True
+            if time.monotonic() - opened_at >= self.reset_timeout:
+                # half-open, let one trial request through and hold the others until it reports back
+                self._opened_at[host] = time.monotonic()
+                return True
+            return False
+
+    def record_success(self, host: str):
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+
+    def record_failure(self, host: str):
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.failure_threshold:
+                self._opened_at[host] = time.monotonic()
+
+##############################################################################
+
+### MFLTransport #############################################################
+
+class MFLTransport:
+    """Class to manage the pooled keep-alive HTTP connections used to send MFL requests
+
+    Attributes:
+        pool_connections: Number of per-host connection pools to cache.
+        pool_maxsize: Maximum number of connections kept open per host.
+        keep_alive: When False every request asks the server to close the connection.
+        connect_timeout: Seconds to wait for a connection to be established.
+        read_timeout: Seconds to wait for the server to send a response.
+        cache: Optional MFLResponseCache consulted before export requests are sent.
+        retry_policy: MFLRetryPolicy for export requests that time out, fail to connect or return a retry status,
+                    MFLRetryPolicy(max_retries=0) disables retries.
+        circuit_breaker: Optional MFLCircuitBreaker tracking failures per host.
+        compress: Ask for gzip, deflate (and br when brotli is installed) encoded bodies, 
+                    False asks for uncompressed bodies.
+    """
+
+    def __init__(self, pool_connections: int=10, pool_maxsize: int=10, keep_alive: bool=True,
+                    connect_timeout: float=5.0, read_timeout: float=30.0, cache=None,
+                    retry_policy: MFLRetryPolicy=None, circuit_breaker: MFLCircuitBreaker=None, compress: bool=True):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.cache = cache
+        self.retry_policy = retry_policy if retry_policy is not None else MFLRetryPolicy()
+        self.circuit_breaker = circuit_breaker
+        self.compress = compress
+
+        self.http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.http_session.mount('https://', adapter)
+        self.http_session.mount('http://', adapter)
+
+        # the MFL_USER_ID cookie is sent explicitly with each request, never keep cookies set by responses
+        self.http_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        if not keep_alive:
+            self.http_session.headers['Connection'] = 'close'
+
+        # bodies are decoded by urllib3 as they are read, response.raw.tell() still counts the encoded bytes
+        self.http_session.headers['Accept-Encoding'] = self.accept_encoding if compress else 'identity'
+
+    @property
+    def accept_encoding(self) -> str:
+        return 'gzip, deflate, br' if brotli is not None else 'gzip, deflate'
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+    def post(self, url: str, data: dict, cookies: dict, stream: bool=False):
+        if stream:
+            # streamed bodies are read once by the caller, they can't be cached
+            return self.send(url, data, cookies, stream=True)
+        if self.cache is not None:
+            return self.cache.fetch(url, data, cookies, self.send)
+        return self.send(url, data, cookies)
+
+    def send(self, url: str, data: dict, cookies: dict, headers: dict=None, stream: bool=False):
+        host = urlsplit(url).netloc
+        # only export requests (which carry a TYPE) are idempotent and safe to retry
+        retry_policy = self.retry_policy if 'TYPE' in data else None
+        attempt = 0
+        while True:
+            if self.circuit_breaker is not None and not self.circuit_breaker.allow(host):
+                raise MFLCircuitOpenError(f"Circuit breaker open for {host}")
+
+            try:
+                response = self.http_session.post(url=url, data=data, cookies=cookies, headers=headers, timeout=self.timeout, stream=stream)
+            except(requests.ConnectionError, requests.Timeout):
+                self._record(host, False)
+                delay = retry_policy.delay(attempt) if retry_policy is not None else None
+                if delay is None:
+                    raise
+            else:
+                failed = response.status_code >= 500 or response.status_code == 429
+                self._record(host, not failed)
+                if retry_policy is None or response.status_code not in retry_policy.retry_statuses:
+                    return response
+                delay = retry_policy.delay(attempt, response)
+                if delay is None:
+                    return response
+                response.close()
+
+            attempt += 1
+            time.sleep(delay)
+
+    def _record(self, host, success):
+        if self.circuit_breaker is None:
+            return
+        if success:
+            self.circuit_breaker.record_success(host)
+        else:
+            self.circuit_breaker.record_failure(host)
+
+    def close(self):
+        self.http_session.close()
+
+##############################################################################
@@ -5,9 +5,14 @@ MyFantasyLeagueAPISession object
 
 '''
 
-from mfl_request import MFLRequest, MFLLoginRequest, MFLRostersRequest, MFLPlayersRequest, MFLLeagueRequest, MFLLiveScoringRequest, MFLPlayerScoresRequest
-from mfl_response import MFLResponse
-import json
+from mfl_request import MFLLoginRequest, MFLRostersRequest, MFLPlayersRequest, MFLLeagueRequest, MFLLiveScoringRequest, MFLPlayerScoresRequest, chunk_player_ids, endpoints
+from mfl_json import get_decoder
+from mfl_response import MFLHTTPError, MFLResponse
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # annotation only, importing mfl_transport loads requests
+    from mfl_transport import MFLTransport
 
 class MyFantasyLeagueAPISession():
     """The summary line for a class docstring should fit on one line.
@@ -28,7 +33,7 @@ class MyFantasyLeagueAPISession():
     host = "www67.myfantasyleague.com"
     protocol = "https"
 
-    def __init__(self, year, league_id="", username="", password=""):
+    def __init__(self, year, league_id="", username="", password="", transport: 'MFLTransport'=None, player_store=None, singleflight=None, hooks=None, cookie_store=None, json_decoder='auto'):
         """Example of docstring on the __init__ method.
 
         The __init__ method may be documented in either the class level
@@ -52,11 +57,20 @@ class MyFantasyLeagueAPISession():
         self.username = username
         self.password = password
         self.user_cookie = ""
-
-        '''Initialize MFLRequest class variables'''
-        MFLRequest.host = self.host
-        MFLRequest.protocol = self.protocol
-        MFLRequest.default_year = self.year
+        if transport is None:
+            # requests is the bulk of import time, only load it once a session is actually created
+            from mfl_transport import MFLTransport
+            transport = MFLTransport()
+        self.transport = transport
+        self.player_store = player_store
+        self.singleflight = singleflight
+        self.hooks = hooks
+        self.cookie_store = cookie_store
+        self.json_decoder = get_decoder(json_decoder)
+
+    def close(self):
+        """Close the pooled connections held by this session's transport"""
+        self.transport.close()
 
     @classmethod
     def initalize_generic_session(cls, year):
@@ -67,20 +81,70 @@ class MyFantasyLeagueAPISession():
         return cls(year, league_id)
 
     @classmethod
-    def initialize_authenticated_league_session(cls, year, league_id, username, password):
-        new_instance = cls(year, league_id, username, password)
+    def initialize_authenticated_league_session(cls, year, league_id, username, password, cookie_store=None):
+        new_instance = cls(year, league_id, username, password, cookie_store=cookie_store)
         new_instance.login()
         return new_instance
 
-    def login(self):
+    def login(self, force: bool=False):
+        """Set the session's user cookie, reusing a valid cookie from the cookie_store when there is one
+
+        Args:
+            force: Ignore the current cookie (it was rejected) and log in again unless another
+                    process already stored a newer one.
+        """
+        if self.cookie_store is None:
+            self.user_cookie = self.login_with_credentials_cookie()
+            return
+
+        if not force:
+            cookie = self.cookie_store.get(self.username, self.year)
+            if cookie:
+                self.user_cookie = cookie
+                return
+
+        rejected_cookie = self.user_cookie if force else None
+        with self.cookie_store.lock():
+            # another worker may have logged in while we waited for the lock
+            cookie = self.cookie_store.get(self.username, self.year)
+            if not cookie or cookie == rejected_cookie:
+                cookie = self.login_with_credentials_cookie()
+                self.cookie_store.set(self.username, self.year, cookie)
+        self.user_cookie = cookie
+
+    def login_with_credentials_cookie(self) -> str:
         response = self.login_with_credentials(self.username, self.password)
-        self.user_cookie = response.cookie
-        MFLRequest.user_cookie = self.user_cookie
-        print(self.user_cookie + " " + str(response.status_code))
+        if response.cookie is None:
+            raise ValueError(f"MFL login failed for user '{self.username}' (status code {response.status_code})")
+        return response.cookie
 
     def login_with_credentials(self, username: str, password: str):       
         request = MFLLoginRequest(username=username, password=password)
-        response = request.make_request()
+        response = request.bind_session(self).make_request()
+        return response
+
+    def send(self, request) -> MFLResponse:
+        """Bind a request to this session and send it, logging in again once if MFL rejects the user cookie
+
+        Raises:
+            MFLHTTPError: MFL answered with an HTTP error status the transport did not retry away.
+        """
+        try:
+            response = request.bind_session(self).make_request()
+            rejected = getattr(response, 'is_auth_error', False)
+        except MFLHTTPError as error:
+            if not self.username or error.status_code not in (401, 403):
+                raise
+            rejected = True
+        if self.username and rejected:
+            self.login(force=True)
+            response = request.bind_session(self).make_request()
+        elif self.username and getattr(response, 'stream', False):
+            # a streamed error body is only seen once the records are iterated, see MFLExportResponse.iter_records
+            def resend():
+                self.login(force=True)
+                return request.bind_session(self).make_request()
+            response.resend = resend
         return response
 
     def rosters(self, league_id: str=None, franchise: int=None, week: int=None) -> MFLResponse:
@@ -100,10 +164,10 @@ class MyFantasyLeagueAPISession():
         league_id = league_id if league_id is not None else self.league_id
         
         request = MFLRostersRequest(league_id, franchise, week)
-        response = request.make_request()
+        response = self.send(request)
         return response
 
-    def players(self, league_id: str=None, details: bool=False, since: int=None, players: str=None) -> MFLResponse:
+    def players(self, league_id: str=None, details: bool=False, since: int=None, players: str=None, stream: bool=False) -> MFLResponse:
         """All player IDs, names and positions that MyFantasyLeague.com has in database for the current year. 
         
         Args:
@@ -111,17 +175,24 @@ class MyFantasyLeagueAPISession():
             details: Set this value to True to return complete player details, including player IDs from other sources.
             since: Pass a unix timestamp via this parameter to receive only changes to the player database since that time.
             players: Pass a list of player ids separated by commas (or just a single player id) to receive back just the info on those players.
+            stream: Set this value to True to parse the body incrementally through MFLPlayersResponse.iter_players().
         
         Returns: 
             MFLPlayersResponse
+
+        When the session has a player_store and since is not set, the response is answered from the local store,
+        which only downloads the changes since its last sync once its refresh_interval has passed.
         """
         league_id = league_id if league_id is not None else self.league_id
+
+        if self.player_store is not None and since is None and not stream:
+            return self.player_store.players_response(self, league_id, players, details)
         
-        request = MFLPlayersRequest(league_id, details, since, players)
-        response = request.make_request()
+        request = MFLPlayersRequest(league_id, details, since, players, stream)
+        response = self.send(request)
         return response
 
-    def league(self, league_id: str=None) -> MFLResponse:
+    def league(self, league_id: str=None, fields=None) -> MFLResponse:
         """General league setup parameters for a given league, including: league name, roster size, IR/TS size, starting and ending week, 
         starting lineup requirements, franchise names, division names, and more. If you pass the cookie of a user with commissioner access, 
         it will return otherwise private owner information, like owner names, email addresses, etc.
@@ -130,6 +201,7 @@ class MyFantasyLeagueAPISession():
 
         Args:
             league_id: League Id
+            fields: Franchise keys to keep in MFLLeagueResponse.franchises (e.g. ('name', 'icon') or 'name'), all when None.
         
         Returns:
             MFLLeagueResponse
@@ -137,8 +209,8 @@ class MyFantasyLeagueAPISession():
         """
         league_id = league_id if league_id is not None else self.league_id
         
-        request = MFLLeagueRequest(league_id)
-        response = request.make_request()
+        request = MFLLeagueRequest(league_id, fields=fields)
+        response = self.send(request)
         return response     
 
     def live_scoring(self, league_id: str=None, week: int=None, details: bool=False) -> MFLResponse:
@@ -159,10 +231,10 @@ class MyFantasyLeagueAPISession():
         league_id = league_id if league_id is not None else self.league_id
         
         request = MFLLiveScoringRequest(league_id, week, details)
-        response = request.make_request()
+        response = self.send(request)
         return response
 
-    def player_scores(self, league_id: str=None, week: int=None, year: int=None, players: str=None, status: str=None, rules: bool=False, count: int=None) -> MFLResponse:
+    def player_scores(self, league_id: str=None, week: int=None, year: int=None, players: str=None, status: str=None, rules: bool=False, count: int=None, stream: bool=False) -> MFLResponse:
         """All player scores for a given league/week, including all rostered players as well as all free agents
 
         Args:
@@ -178,6 +250,7 @@ class MyFantasyLeagueAPISession():
             rules: If set, and a league id passed, it re-calculates the fantasy score for each player according to 
                     that league's rules. This is only valid when specifying the current year and current week.
             count: Limit the result to this many players.
+            stream: Set this value to True to parse the body incrementally through MFLPlayerScoresResponse.iter_player_scores().
         
         Returns:
             MFLPlayerScoresResponse
@@ -187,10 +260,64 @@ class MyFantasyLeagueAPISession():
         league_id = league_id if league_id is not None else self.league_id
         year = year if year is not None else self.year
 
-        # TO DO when specifying players this breaks
-        request = MFLPlayerScoresRequest(league_id, week, year, players, status, rules, count)
-        response = request.make_request()
+        request = MFLPlayerScoresRequest(league_id, week, year, players, status, rules, count, stream)
+        response = self.send(request)
         return response
 
-#TO DO debug raw response option
-#TO DO error checking and exception handling
\ No newline at end of file
+    def bulk_player_scores(self, player_ids, weeks, league_id: str=None, year: int=None, chunk_size: int=100, max_workers: int=8) -> dict:
+        """Scores for many players over many weeks, fetched as concurrent player_scores requests
+
+        Args:
+            player_ids: Iterable of player ids.
+            weeks: Iterable of weeks (or 'YTD' / 'AVG').
+            league_id: League Id
+            year: The year for the data to be returned. Default is year set in instance of MyFantasyLeagueAPISession
+            chunk_size: Maximum number of player ids sent in one request, chunks are also kept under the URL length limit.
+            max_workers: Number of requests run concurrently.
+
+        Returns:
+            dict of player_id -> week -> score
+
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        chunks = chunk_player_ids(player_ids, chunk_size)
+        scores = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.player_scores, league_id, week, year, chunk) : week for week in weeks for chunk in chunks}
+            for future in as_completed(futures):
+                week = futures[future]
+                for player_id, player_score in future.result().player_scores.items():
+                    scores.setdefault(player_id, {})[week] = player_score['score']
+        return scores
+
+### Registry endpoints #######################################################
+
+def endpoint_method(endpoint):
+    """A session method sending the endpoint's request, league_id defaults to the session league"""
+    def method(self, league_id: str=None, *args, **kwargs) -> MFLResponse:
+        league_id = league_id if league_id is not None else self.league_id
+        request = endpoint.request_class(league_id, *args, **kwargs)
+        response = self.send(request)
+        return response
+
+    method.__name__ = endpoint.method
+    method.__qualname__ = f"MyFantasyLeagueAPISession.{endpoint.method}"
+    method.__doc__ = (f"{endpoint.description}\n\n        Args:\n            {', '.join(endpoint.argument_names + ('fields',))}"
+                        f"\n\n        Returns:\n            {endpoint.response_type.__name__}\n        ")
+    return method
+
+def add_endpoint_methods(cls, make_method=endpoint_method):
+    """Add a method for every registry endpoint the class does not define itself, 
+        call again after declaring new MFLExportRequest subclasses
+    """
+    for name, endpoint in endpoints.items():
+        if name not in vars(cls):
+            setattr(cls, name, make_method(endpoint))
+    return cls
+
+add_endpoint_methods(MyFantasyLeagueAPISession)
+
+##############################################################################
+
+#TO DO debug raw response option
\ No newline at end of file
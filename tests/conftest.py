@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# the modules live at the repository root and import each other by top level name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import payloads
+from mfl_stub import MFLStubServer
+
+def default_bodies() -> dict:
+    return {
+        'league' : payloads.league(),
+        'rosters' : payloads.rosters(),
+        'players' : payloads.players(200, details=True),
+        'liveScoring' : payloads.live_scoring(),
+        'playerScores' : payloads.player_scores(200),
+        'rules' : payloads.rules(),
+    }
+
+@pytest.fixture
+def stub():
+    with MFLStubServer(default_bodies()) as server:
+        yield server
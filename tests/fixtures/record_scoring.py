@@ -0,0 +1,61 @@
+'''
+record_scoring.py
+
+Records the rules and playerScores exports the scoring engine test compares against, run from the repository root:
+
+    python tests/fixtures/record_scoring.py
+
+The scores are worked out by hand from scoring_stats.json under payloads.rules(), so the engine is
+checked against numbers it did not produce.
+
+'''
+
+import os
+import sys
+
+fixtures = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(fixtures))
+sys.path.insert(0, os.path.dirname(os.path.dirname(fixtures)))
+
+import payloads
+from mfl_replay import MFLRecordingTransport
+from mfl_stub import MFLStubServer
+
+archive_path = os.path.join(fixtures, 'scoring.zip')
+
+# week -> player id -> fantasy points, see the stats of the same player and week in scoring_stats.json
+scores = {
+    '1' : {
+        '10001' : '18.00',  # QB: 2 #P *4 + 287 PY 1/25 + 1 IN *-2 + 12 RY 1/10 = 8 + 11 - 2 + 1
+        '10002' : '23.50',  # RB: 112 RY 1/10 + RY 100-149 + 1 #R *6 + 3 CC *.5 + 24 CY 1/10 = 11 + 3 + 6 + 1.5 + 2
+        '10003' : '18.50',  # WR: 7 CC *.5 + 98 CY 1/10 + 1 #C *6 = 3.5 + 9 + 6
+        '10004' : '6.00',   # TE: 4 CC *.5 + 41 CY 1/10 = 2 + 4
+        '10005' : '11.00',  # PK: 3 #FG *3 + 2 EP = 9 + 2
+        '10006' : '13.00',  # Def: 3 SK + PA 0-0 = 3 + 10
+    },
+    '2' : {
+        '10001' : '32.00',  # QB: 3 #P *4 + 310 PY 1/25 + 1 #R *6 + 25 RY 1/10 = 12 + 12 + 6 + 2
+        '10002' : '34.00',  # RB: 155 RY 1/10 + RY 150-999 + 2 #R *6 + 2 CC *.5 + 9 CY 1/10 = 15 + 6 + 12 + 1 + 0
+        '10003' : '0.00',   # WR: played without a catch
+        '10005' : '7.00',   # PK: 1 #FG *3 + 4 EP = 3 + 4
+        '10006' : '5.00',   # Def: 1 SK + PA 7-13 = 1 + 4
+    },
+}
+
+def player_scores(path, params, cookie):
+    week = params['W']
+    return payloads.envelope({'playerScores' : {'week' : week, 'playerScore' : [
+        {'id' : player_id, 'score' : score, 'isAvailable' : '0'} for player_id, score in scores[week].items()]}})
+
+def record(path: str=archive_path):
+    if os.path.exists(path):
+        os.remove(path)
+    with MFLStubServer({'rules' : payloads.rules(), 'playerScores' : player_scores}, compress=False) as server:
+        session = server.session(2024, '12345', transport=MFLRecordingTransport(path, compress=False))
+        session.rules()
+        for week in scores:
+            session.player_scores(week=week)
+        session.close()
+
+if __name__ == '__main__':
+    record()
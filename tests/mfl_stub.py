@@ -0,0 +1,179 @@
+'''
+mfl_stub.py
+
+MFLStubServer object, a local stand-in for the MFL API used by the tests and benchmarks
+
+'''
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qs
+import gzip
+import hashlib
+import json
+import threading
+import time
+
+class MFLStubRequest(NamedTuple):
+    """One request as the stub server received it"""
+    path: str
+    params: dict
+    cookie: str
+    headers: dict
+
+class MFLStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are separate writes, with Nagle on every keep-alive response waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.stub.count_connection()
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length', 0))
+        params = {key : values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+        cookie = self.headers.get('Cookie') or ''
+        cookie = cookie.split('MFL_USER_ID=', 1)[1].split(';', 1)[0] if 'MFL_USER_ID=' in cookie else ''
+        stub.log(MFLStubRequest(self.path, params, cookie, dict(self.headers)))
+
+        if self.path.endswith('/login'):
+            body = f'<status MFL_USER_ID="{stub.login_cookie(params.get("USERNAME", ""))}">OK</status>'.encode()
+            return self.reply(200, {'Content-Type' : 'application/xml'}, body)
+
+        request_type = params.get('TYPE')
+        delay = stub.delays.get(request_type)
+        if delay:
+            time.sleep(delay)
+
+        fault = stub.next_fault(request_type)
+        if fault is not None:
+            return self.reply(*fault)
+
+        body = stub.body(request_type, self.path, params, cookie)
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.headers.get('If-None-Match') == etag:
+            return self.reply(304, {'ETag' : etag}, b'')
+        self.reply(200, {'Content-Type' : 'application/json', 'ETag' : etag}, body)
+
+    def reply(self, status: int, headers: dict, body: bytes):
+        headers = dict(headers)
+        if body and self.server.stub.compress and 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+            body = gzip.compress(body, compresslevel=6)
+            headers['Content-Encoding'] = 'gzip'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class MFLStubServer:
+    """Local HTTP server answering MFL export and login requests
+
+    Usage:
+        with MFLStubServer({'rosters' : payloads.rosters()}) as server:
+            session = server.session(2024, '12345')
+            session.rosters()
+            server.count('rosters') == 1
+
+    Attributes:
+        bodies (dict): Export TYPE -> JSON body, a dict, bytes or a callable(path, params, cookie) returning either.
+        delays (dict): Export TYPE -> seconds slept before answering.
+        faults (dict): Export TYPE -> list of (status, headers, body) answered, in order, before the body.
+        compress (bool): gzip bodies when the client accepts it.
+        requests (list): MFLStubRequest of every request received.
+        connections (int): Number of TCP connections accepted.
+    """
+
+    def __init__(self, bodies: dict=None, compress: bool=True):
+        self.bodies = dict(bodies or {})
+        self.delays = {}
+        self.faults = {}
+        self.compress = compress
+        self.requests = []
+        self.connections = 0
+        self._encoded = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), MFLStubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self._server.server_address[1]}"
+
+    def session(self, year=2024, league_id: str="", **kwargs):
+        """MyFantasyLeagueAPISession sending its export requests to this server"""
+        from session import MyFantasyLeagueAPISession
+        return self.configure(MyFantasyLeagueAPISession(year, league_id, **kwargs))
+
+    def configure(self, session):
+        session.host = self.host
+        session.protocol = 'http'
+        return session
+
+    @staticmethod
+    def login_cookie(username: str) -> str:
+        return f"cookie-{username}"
+
+    def fail(self, request_type: str, status: int, count: int=1, headers: dict=None, body: bytes=b''):
+        """Answer the next count requests of request_type with status"""
+        with self._lock:
+            self.faults.setdefault(request_type, []).extend([(status, headers or {}, body)] * count)
+
+    def next_fault(self, request_type: str):
+        with self._lock:
+            faults = self.faults.get(request_type)
+            return faults.pop(0) if faults else None
+
+    def body(self, request_type: str, path: str, params: dict, cookie: str) -> bytes:
+        body = self.bodies.get(request_type, {})
+        if callable(body):
+            body = body(path, params, cookie)
+            return body if isinstance(body, bytes) else json.dumps(body).encode()
+        if isinstance(body, bytes):
+            return body
+        # static bodies are encoded once, large payloads would otherwise dominate the timings
+        cached = self._encoded.get(request_type)
+        if cached is None or cached[0] is not body:
+            cached = self._encoded[request_type] = (body, json.dumps(body).encode())
+        return cached[1]
+
+    def log(self, request: MFLStubRequest):
+        with self._lock:
+            self.requests.append(request)
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def count(self, request_type: str=None) -> int:
+        """Number of requests received, only those of request_type when given"""
+        with self._lock:
+            return sum(1 for request in self.requests if request_type is None or request.params.get('TYPE') == request_type)
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.faults.clear()
+            self.connections = 0
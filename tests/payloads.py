@@ -0,0 +1,93 @@
+'''
+payloads.py
+
+Deterministic MFL export bodies shaped like the real API's JSON, sized by argument
+
+'''
+
+import random
+
+positions = ('QB', 'RB', 'WR', 'TE', 'PK', 'Def')
+teams = ('ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE', 'DAL', 'DEN', 'DET', 'GBP', 'HOU', 'IND', 'JAC', 'KCC',
+            'LAC', 'LAR', 'LVR', 'MIA', 'MIN', 'NEP', 'NOS', 'NYG', 'NYJ', 'PHI', 'PIT', 'SEA', 'SFO', 'TBB', 'TEN', 'WAS')
+
+def franchise_ids(franchises: int) -> list:
+    return [f"{index:04d}" for index in range(1, franchises + 1)]
+
+def player_ids(count: int) -> list:
+    return [str(10000 + index) for index in range(count)]
+
+def envelope(body: dict) -> dict:
+    body.update({'version' : '1.0', 'encoding' : 'utf-8'})
+    return body
+
+def league(franchises: int=12) -> dict:
+    return envelope({'league' : {'id' : '12345', 'name' : 'Stub League', 'rosterSize' : '30', 'startWeek' : '1', 'endWeek' : '17',
+                        'franchises' : {'count' : str(franchises), 'franchise' : [
+                            {'id' : franchise_id, 'name' : f"Franchise {franchise_id}", 'icon' : f"https://example.com/{franchise_id}.png",
+                                'division' : str(int(franchise_id) % 2), 'waiverSortOrder' : franchise_id, 'bbidAvailableBalance' : '100.00'}
+                            for franchise_id in franchise_ids(franchises)]}}})
+
+def rosters(franchises: int=12, players: int=30, week: int=1) -> dict:
+    ids = player_ids(franchises * players)
+    return envelope({'rosters' : {'franchise' : [
+        {'id' : franchise_id, 'week' : str(week), 'player' : [
+            {'id' : ids[index * players + slot], 'status' : 'ROSTER' if slot < players - 2 else 'INJURED_RESERVE',
+                'salary' : f"{(slot % 7) + 0.5:.2f}", 'contractYear' : str(slot % 4), 'contractInfo' : ''}
+            for slot in range(players)]}
+        for index, franchise_id in enumerate(franchise_ids(franchises))]}})
+
+def players(count: int=2500, details: bool=False, timestamp: int=1700000000) -> dict:
+    generator = random.Random(count)
+    records = []
+    for index, player_id in enumerate(player_ids(count)):
+        record = {'id' : player_id, 'name' : f"Player{index}, Stub", 'position' : positions[index % len(positions)],
+                    'team' : teams[index % len(teams)], 'status' : 'R' if index % 9 == 0 else ''}
+        if details:
+            record.update({'draft_year' : str(2010 + index % 14), 'draft_team' : teams[(index * 7) % len(teams)],
+                            'draft_round' : str(1 + index % 7), 'draft_pick' : str(1 + index % 32),
+                            'birthdate' : str(600000000 + generator.randrange(300000000)), 'college' : f"College {index % 120}",
+                            'height' : str(68 + index % 10), 'weight' : str(180 + index % 140), 'jersey' : str(index % 99),
+                            'espn_id' : str(3000000 + index), 'stats_id' : str(20000 + index), 'cbs_id' : str(1800000 + index),
+                            'rotoworld_id' : str(9000 + index), 'sportsdata_id' : f"{generator.getrandbits(128):032x}",
+                            'fleaflicker_id' : str(12000 + index), 'twitter_username' : f"stub_player_{index}",
+                            'nfl_id' : f"player{index}-stub"})
+        records.append(record)
+    return envelope({'players' : {'timestamp' : str(timestamp), 'player' : records}})
+
+def player_scores(count: int=2000, week: int=1) -> dict:
+    generator = random.Random(count * 100 + week)
+    return envelope({'playerScores' : {'week' : str(week), 'playerScore' : [
+        {'id' : player_id, 'score' : f"{generator.uniform(0, 35):.2f}" if index % 11 else '', 'isAvailable' : '1' if index % 3 == 0 else '0'}
+        for index, player_id in enumerate(player_ids(count))]}})
+
+def live_scoring(franchises: int=12, players: int=22, week: int=1, seconds_remaining: int=0) -> dict:
+    generator = random.Random(franchises * 1000 + week)
+    ids = player_ids(franchises * players)
+    franchise_records = []
+    for index, franchise_id in enumerate(franchise_ids(franchises)):
+        player_records = [{'id' : ids[index * players + slot], 'score' : f"{generator.uniform(0, 30):.2f}",
+                            'gameSecondsRemaining' : str(seconds_remaining), 'status' : 'starter' if slot < 9 else 'nonstarter',
+                            'updatedStats' : ''} for slot in range(players)]
+        franchise_records.append({'id' : franchise_id, 'score' : f"{sum(float(player['score']) for player in player_records[:9]):.2f}",
+                                    'gameSecondsRemaining' : str(seconds_remaining * 9), 'playersYetToPlay' : '0' if not seconds_remaining else '9',
+                                    'playersCurrentlyPlaying' : '0', 'isHome' : str(index % 2), 'players' : {'player' : player_records}})
+    return envelope({'liveScoring' : {'week' : str(week), 'matchup' : [
+        {'franchise' : franchise_records[index:index + 2]} for index in range(0, len(franchise_records), 2)]}})
+
+def error(message: str) -> dict:
+    return envelope({'error' : {'$t' : message}})
+
+def rule(event: str, range: str, points: str) -> dict:
+    return {'event' : {'$t' : event}, 'range' : {'$t' : range}, 'points' : {'$t' : points}}
+
+def rules() -> dict:
+    return envelope({'rules' : {'positionRules' : [
+        {'positions' : 'QB|RB|WR|TE', 'rule' : [
+            rule('#P', '0-99', '*4'), rule('PY', '-50-999', '1/25'), rule('IN', '0-99', '*-2'),
+            rule('#R', '0-99', '*6'), rule('RY', '-50-999', '1/10'), rule('RY', '100-149', '3'), rule('RY', '150-999', '6'),
+            rule('#C', '0-99', '*6'), rule('CY', '-50-999', '1/10'), rule('CC', '0-99', '*.5'),
+        ]},
+        {'positions' : 'PK', 'rule' : [rule('#FG', '0-99', '*3'), rule('EP', '0-99', '*1')]},
+        {'positions' : 'Def', 'rule' : [rule('SK', '0-99', '*1'), rule('PA', '0-0', '10'), rule('PA', '1-6', '7'), rule('PA', '7-13', '4')]},
+    ]}})
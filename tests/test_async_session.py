@@ -0,0 +1,65 @@
+import asyncio
+import inspect
+
+from async_session import AsyncMyFantasyLeagueAPISession
+from mfl_metrics import MFLHooks, MFLMetricsCollector
+from mfl_request import endpoints
+from mfl_singleflight import MFLSingleFlight
+
+def async_session(stub, **kwargs):
+    session = AsyncMyFantasyLeagueAPISession(2024, '12345', **kwargs)
+    stub.configure(session.session)
+    return session
+
+def test_session_options_reach_the_wrapped_session(stub):
+    hooks = MFLHooks()
+    metrics = hooks.register(MFLMetricsCollector())
+    singleflight = MFLSingleFlight()
+
+    async def run():
+        async with async_session(stub, hooks=hooks, singleflight=singleflight, json_decoder='stdlib') as session:
+            assert session.session.hooks is hooks
+            assert session.session.singleflight is singleflight
+            assert session.session.json_decoder.__name__ == 'stdlib_decoder'
+            await session.rosters()
+
+    asyncio.run(run())
+    assert metrics.latency['rosters'].count == 1
+    assert singleflight.calls == 1
+
+def test_stream_is_forwarded(stub):
+    async def run():
+        async with async_session(stub) as session:
+            players = await session.players(details=True, stream=True)
+            scores = await session.player_scores(week=1, stream=True)
+            return players, scores
+
+    players, scores = asyncio.run(run())
+    assert players.stream and scores.stream
+    assert sum(1 for _ in players.iter_players()) == 200
+    assert sum(1 for _ in scores.iter_player_scores()) == 200
+
+def test_gather_many_keeps_call_order(stub):
+    async def run():
+        async with async_session(stub, max_concurrency=4) as session:
+            return await session.gather_many([('rosters', None, None), ('live_scoring', None, {'week' : 1}), ('rules', None, None)])
+
+    rosters, live_scoring, rules = asyncio.run(run())
+    assert len(rosters.rosters) == 12
+    assert len(live_scoring.franchise_live_scoring) == 12
+    assert rules.position_rules
+
+def test_every_registry_endpoint_has_an_async_method():
+    for name in endpoints:
+        assert inspect.iscoroutinefunction(getattr(AsyncMyFantasyLeagueAPISession, name)), name
+
+def test_arguments_are_forwarded_as_given(stub):
+    async def run():
+        async with async_session(stub) as session:
+            league = await session.league(fields='name')
+            rosters = await session.rosters('54321', week=2)
+            return league, rosters
+
+    league, rosters = asyncio.run(run())
+    assert league.franchises['0001'] == {'name' : 'Franchise 0001'}
+    assert stub.requests[-1].params == {'TYPE' : 'rosters', 'L' : '54321', 'W' : '2', 'JSON' : '1'}
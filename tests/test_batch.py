@@ -0,0 +1,65 @@
+import threading
+import time
+
+import payloads
+from mfl_batch import MFLBatchEngine, MFLTokenBucket
+
+def test_token_bucket_spaces_requests_after_the_burst():
+    bucket = MFLTokenBucket(rate=20, capacity=2)
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # two tokens right away, the other four at 20 per second
+    assert 0.18 <= time.monotonic() - started < 0.5
+
+def test_rate_limit_caps_requests_per_second(stub):
+    with MFLBatchEngine(stub.session(2024), max_workers=4, rate=20, burst=1) as engine:
+        started = time.monotonic()
+        results = list(engine.refresh([str(10000 + index) for index in range(10)], ['rosters']))
+        elapsed = time.monotonic() - started
+    assert [result.error for result in results] == [None] * 10
+    assert elapsed >= 9 / 20
+
+def test_concurrency_is_capped_per_host(stub):
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def rosters(path, params, cookie):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return payloads.rosters()
+    stub.bodies['rosters'] = rosters
+
+    session = stub.session(2024)
+    # the same server under a second host name, it gets its own cap
+    other_host = stub.session(2024)
+    other_host.host = other_host.host.replace('127.0.0.1', 'localhost')
+    with MFLBatchEngine(session, max_workers=8, rate=1000, per_host_concurrency=2) as engine:
+        for index in range(8):
+            engine.submit('rosters', str(10000 + index))
+        assert len(list(engine.as_completed())) == 8
+        assert peak[0] == 2
+
+        peak[0] = 0
+        for index in range(8):
+            engine.submit('rosters', str(10000 + index), session=session if index % 2 else other_host)
+        assert len(list(engine.as_completed())) == 8
+        assert peak[0] == 4
+
+def test_live_scoring_jumps_queued_rosters(stub):
+    stub.delays['league'] = 0.2
+    with MFLBatchEngine(stub.session(2024), max_workers=1, rate=1000) as engine:
+        engine.submit('league', '10000')
+        # the only worker is busy with league while the rest queue up
+        time.sleep(0.05)
+        for index in range(3):
+            engine.submit('rosters', str(10001 + index))
+        engine.submit('live_scoring', '10004')
+        results = list(engine.as_completed())
+    assert [result.job.method for result in results] == ['league', 'live_scoring', 'rosters', 'rosters', 'rosters']
+    assert [request.params['TYPE'] for request in stub.requests] == ['league', 'liveScoring', 'rosters', 'rosters', 'rosters']
+    assert [request.params['L'] for request in stub.requests[2:]] == ['10001', '10002', '10003']
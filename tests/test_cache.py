@@ -0,0 +1,119 @@
+import json
+import time
+
+import pytest
+
+import payloads
+from mfl_cache import MFLCacheEntry, MFLMemoryCacheBackend, MFLResponseCache, MFLSqliteCacheBackend
+from mfl_transport import MFLTransport
+
+def cached_session(stub, cache, **kwargs):
+    return stub.session(2024, '12345', transport=MFLTransport(cache=cache), **kwargs)
+
+def entry(key: str, size: int) -> MFLCacheEntry:
+    return MFLCacheEntry(key, 'rosters', 200, {'ETag' : f'"{key}"'}, b'x' * size, time.time())
+
+def test_fresh_entry_is_a_hit(stub):
+    cache = MFLResponseCache(ttls={'rosters' : 60})
+    session = cached_session(stub, cache)
+    first = session.rosters().rosters
+    assert session.rosters().rosters == first
+    assert stub.count('rosters') == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.bytes_saved == len(json.dumps(payloads.rosters()))
+    assert cache.hit_ratio == 0.5
+
+def test_stale_entry_is_revalidated(stub):
+    cache = MFLResponseCache(ttls={'rosters' : 0.05})
+    session = cached_session(stub, cache)
+    first = session.rosters().rosters
+    time.sleep(0.1)
+
+    assert session.rosters().rosters == first
+    assert 'If-None-Match' not in stub.requests[0].headers
+    assert stub.requests[1].headers['If-None-Match'].startswith('"')
+    assert (cache.revalidations, cache.misses) == (1, 1)
+    assert cache.bytes_saved == len(json.dumps(payloads.rosters()))
+
+def test_changed_body_replaces_stale_entry(stub):
+    cache = MFLResponseCache(ttls={'rosters' : 0.05})
+    session = cached_session(stub, cache)
+    session.rosters()
+    time.sleep(0.1)
+
+    stub.bodies['rosters'] = payloads.rosters(franchises=2)
+    assert len(session.rosters().rosters) == 2
+    assert len(session.rosters().rosters) == 2
+    assert (cache.hits, cache.revalidations, cache.misses) == (1, 0, 2)
+
+def test_zero_ttl_is_never_cached(stub):
+    cache = MFLResponseCache(ttls={'rosters' : 0})
+    session = cached_session(stub, cache)
+    session.rosters()
+    session.rosters()
+    assert stub.count('rosters') == 2
+    assert cache.stats()['misses'] == 0
+
+def test_error_body_is_not_cached(stub):
+    stub.bodies['rosters'] = payloads.error('API usage limit exceeded')
+    cache = MFLResponseCache(ttls={'rosters' : 60})
+    session = cached_session(stub, cache)
+    session.rosters()
+    session.rosters()
+    assert stub.count('rosters') == 2
+
+def test_entries_are_separated_by_cookie(stub):
+    cache = MFLResponseCache(ttls={'rosters' : 60})
+    transport = MFLTransport(cache=cache)
+    owner, other = stub.session(2024, '12345', transport=transport), stub.session(2024, '12345', transport=transport)
+    owner.user_cookie, other.user_cookie = 'cookie-owner', 'cookie-other'
+    owner.rosters()
+    other.rosters()
+    owner.rosters()
+    assert [request.cookie for request in stub.requests] == ['cookie-owner', 'cookie-other']
+    assert cache.hits == 1
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MFLMemoryCacheBackend(max_bytes=300)
+    for key in 'abc':
+        backend.set(entry(key, 100))
+    backend.get('a')
+    backend.set(entry('d', 100))
+    assert backend.get('b') is None
+    assert [key for key in 'acd' if backend.get(key) is not None] == ['a', 'c', 'd']
+    assert backend.total_bytes == 300
+
+    backend.set(entry('e', 301))
+    assert backend.get('e') is None
+    assert backend.total_bytes == 300
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / 'cache.sqlite')
+
+def test_sqlite_backend_round_trip_and_persistence(sqlite_path):
+    MFLSqliteCacheBackend(sqlite_path).set(entry('a', 10))
+    stored = MFLSqliteCacheBackend(sqlite_path).get('a')
+    assert (stored.request_type, stored.status_code, stored.etag, stored.body) == ('rosters', 200, '"a"', b'x' * 10)
+
+def test_sqlite_backend_evicts_least_recently_used(sqlite_path):
+    backend = MFLSqliteCacheBackend(sqlite_path, max_bytes=300)
+    for key in 'abc':
+        backend.set(entry(key, 100))
+        time.sleep(0.01)
+    backend.get('a')
+    time.sleep(0.01)
+    backend.set(entry('d', 100))
+    assert backend.get('b') is None
+    assert [key for key in 'acd' if backend.get(key) is not None] == ['a', 'c', 'd']
+    assert backend.total_bytes == 300
+
+def test_sqlite_backend_serves_session_hits(stub, sqlite_path):
+    session = cached_session(stub, MFLResponseCache(MFLSqliteCacheBackend(sqlite_path), ttls={'rosters' : 60}))
+    first = session.rosters().rosters
+
+    # a new cache on the same file, as after a restart
+    cache = MFLResponseCache(MFLSqliteCacheBackend(sqlite_path), ttls={'rosters' : 60})
+    assert cached_session(stub, cache).rosters().rosters == first
+    assert stub.count('rosters') == 1
+    assert cache.hits == 1
@@ -0,0 +1,87 @@
+import pytest
+
+import payloads
+
+numpy = pytest.importorskip('numpy')
+
+from mfl_columnar import live_scoring_to_arrays, player_scores_to_arrays, stack_arrays, week_sentinels
+
+def test_player_scores_columns(stub):
+    stub.bodies['playerScores'] = payloads.player_scores(50, week=3)
+    arrays = stub.session(2024, '12345').player_scores(week=3).to_arrays('12345')
+
+    assert {column : array.dtype for column, array in arrays.items()} == {
+        'player_id' : numpy.int32, 'score' : numpy.float32, 'is_available' : numpy.bool_, 'week' : numpy.int16, 'league_id' : numpy.int32}
+    assert {array.shape for array in arrays.values()} == {(50,)}
+    assert arrays['player_id'][:2].tolist() == [10000, 10001]
+    # every 11th player has no score yet
+    assert arrays['score'][0] == 0
+    assert arrays['is_available'][:4].tolist() == [True, False, False, True]
+    assert set(arrays['week'].tolist()) == {3}
+    assert set(arrays['league_id'].tolist()) == {12345}
+
+def test_player_scores_without_league_id():
+    assert 'league_id' not in player_scores_to_arrays(payloads.player_scores(5))
+
+def test_live_scoring_player_level(stub):
+    stub.bodies['liveScoring'] = payloads.live_scoring(franchises=4, players=5, week=2)
+    arrays = stub.session(2024, '12345').live_scoring().to_arrays('12345')
+
+    assert {column : array.dtype for column, array in arrays.items()} == {
+        'franchise_id' : numpy.int32, 'player_id' : numpy.int32, 'score' : numpy.float32, 'game_seconds_remaining' : numpy.int32,
+        'is_starter' : numpy.bool_, 'week' : numpy.int16, 'league_id' : numpy.int32}
+    assert {array.shape for array in arrays.values()} == {(20,)}
+    assert arrays['franchise_id'].tolist() == [1] * 5 + [2] * 5 + [3] * 5 + [4] * 5
+    assert arrays['is_starter'].all()
+
+def test_live_scoring_franchise_level():
+    body = payloads.live_scoring(franchises=4, players=12, seconds_remaining=60)
+    arrays = live_scoring_to_arrays(body, level='franchise')
+
+    assert {column : array.dtype for column, array in arrays.items()} == {
+        'franchise_id' : numpy.int32, 'score' : numpy.float32, 'game_seconds_remaining' : numpy.int32,
+        'players_yet_to_play' : numpy.int16, 'players_currently_playing' : numpy.int16, 'is_home' : numpy.bool_, 'week' : numpy.int16}
+    assert {array.shape for array in arrays.values()} == {(4,)}
+    assert arrays['game_seconds_remaining'].tolist() == [540] * 4
+    assert arrays['players_yet_to_play'].tolist() == [9] * 4
+    assert arrays['is_home'].tolist() == [False, True, False, True]
+    franchise = body['liveScoring']['matchup'][0]['franchise'][0]
+    assert arrays['score'][0] == numpy.float32(franchise['score'])
+
+def test_unknown_level_is_rejected():
+    with pytest.raises(ValueError):
+        live_scoring_to_arrays(payloads.live_scoring(), level='matchup')
+
+def test_stack_arrays_concatenates_weeks_and_leagues():
+    stacked = stack_arrays(player_scores_to_arrays(payloads.player_scores(10, week=week), league_id)
+                            for league_id in ('10001', '10002') for week in (1, 2))
+    assert {column : array.dtype for column, array in stacked.items()} == {
+        'player_id' : numpy.int32, 'score' : numpy.float32, 'is_available' : numpy.bool_, 'week' : numpy.int16, 'league_id' : numpy.int32}
+    assert {array.shape for array in stacked.values()} == {(40,)}
+    assert stacked['week'].tolist() == ([1] * 10 + [2] * 10) * 2
+    assert stacked['league_id'].tolist() == [10001] * 20 + [10002] * 20
+    assert all(array.flags['C_CONTIGUOUS'] for array in stacked.values())
+    assert stack_arrays([]) == {}
+
+def test_stack_arrays_rejects_different_columns():
+    with pytest.raises(ValueError):
+        stack_arrays([player_scores_to_arrays(payloads.player_scores(5), '10001'), player_scores_to_arrays(payloads.player_scores(5))])
+
+@pytest.mark.parametrize('week', ['YTD', 'AVG'])
+def test_year_to_date_and_average_weeks_get_sentinels(week):
+    body = payloads.player_scores(5)
+    body['playerScores']['week'] = week
+    arrays = player_scores_to_arrays(body)
+    assert set(arrays['week'].tolist()) == {week_sentinels[week]}
+    assert week_sentinels[week] < 1
+
+@pytest.mark.parametrize('week', ['', None, 'week 3'])
+def test_non_numeric_week_is_rejected(week):
+    body = payloads.player_scores(5)
+    body['playerScores']['week'] = week
+    with pytest.raises(ValueError):
+        player_scores_to_arrays(body)
+
+def test_non_numeric_league_id_is_rejected():
+    with pytest.raises(ValueError, match='abc'):
+        player_scores_to_arrays(payloads.player_scores(5), league_id='abc')
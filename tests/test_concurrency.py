@@ -0,0 +1,49 @@
+import threading
+
+from mfl_singleflight import MFLSingleFlight
+from mfl_transport import MFLTransport
+from session import MyFantasyLeagueAPISession
+
+threads = 32
+requests_per_thread = 10
+
+def echo(path, params, cookie):
+    """A rosters body naming the year, league and cookie the server saw"""
+    year = path.split('/')[1]
+    return {'rosters' : {'franchise' : [{'id' : '0001', 'week' : f"{year}|{params['L']}|{cookie}", 'player' : []}]}}
+
+def test_concurrent_sessions_keep_their_own_context(stub):
+    stub.bodies['rosters'] = echo
+    stub.delays['rosters'] = 0.001
+    # one transport and one single-flight group shared by every session, as in a worker pool
+    transport = MFLTransport(pool_maxsize=threads)
+    singleflight = MFLSingleFlight()
+    barrier = threading.Barrier(threads)
+    mismatches = []
+
+    def run(index):
+        session = stub.configure(MyFantasyLeagueAPISession(2000 + index, f"{10000 + index}", transport=transport, singleflight=singleflight))
+        session.user_cookie = f"cookie-{index}"
+        expected = f"{2000 + index}|{10000 + index}|cookie-{index}"
+        barrier.wait()
+        for _ in range(requests_per_thread):
+            try:
+                week = session.rosters().week
+            except Exception as error:
+                week = repr(error)
+            if week != expected:
+                mismatches.append((expected, week))
+
+    workers = [threading.Thread(target=run, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert mismatches == []
+    assert stub.count('rosters') == threads * requests_per_thread
+    for request in stub.requests:
+        index = int(request.cookie.rsplit('-', 1)[1])
+        assert request.path == f"/{2000 + index}/export"
+        assert request.params['L'] == f"{10000 + index}"
+    transport.close()
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('cryptography')
+
+from mfl_cookie_store import MFLCookieStore
+from mfl_replay import MFLReplayTransport
+from session import MyFantasyLeagueAPISession
+
+class LoginCountingTransport(MFLReplayTransport):
+    """Replay transport answering every login with a new cookie, login-1, login-2, ..."""
+
+    def __init__(self, archive_path: str):
+        super().__init__(archive_path)
+        self.logins = 0
+
+    def send(self, url: str, data: dict, cookies: dict, headers: dict=None, stream: bool=False):
+        if 'TYPE' not in data:
+            self.logins += 1
+            self.replay_cookie = f"login-{self.logins}"
+        return super().send(url, data, cookies, headers, stream)
+
+@pytest.fixture
+def key():
+    return MFLCookieStore.generate_key()
+
+@pytest.fixture
+def transport(tmp_path):
+    return LoginCountingTransport(str(tmp_path / 'empty.zip'))
+
+def session(store, transport) -> MyFantasyLeagueAPISession:
+    return MyFantasyLeagueAPISession(2024, '12345', 'owner', 'secret', transport=transport, cookie_store=store)
+
+def test_cookie_is_encrypted_at_rest(tmp_path, key):
+    path = str(tmp_path / 'cookies')
+    MFLCookieStore(path, key).set('owner', 2024, 'secret-cookie')
+    with open(path, 'rb') as store_file:
+        assert b'secret-cookie' not in store_file.read()
+
+    assert MFLCookieStore(path, key).get('owner', 2024) == 'secret-cookie'
+    assert MFLCookieStore(path, key).get('owner', 2025) is None
+    assert MFLCookieStore(path, MFLCookieStore.generate_key()).get('owner', 2024) is None
+
+def test_expired_cookie_is_not_returned(tmp_path, key):
+    store = MFLCookieStore(str(tmp_path / 'cookies'), key, max_age=0.05)
+    store.set('owner', 2024, 'cookie')
+    assert store.get('owner', 2024) == 'cookie'
+    time.sleep(0.1)
+    assert store.get('owner', 2024) is None
+
+def test_lock_is_reentrant_and_exclusive(tmp_path, key):
+    store = MFLCookieStore(str(tmp_path / 'cookies'), key)
+    acquired = threading.Event()
+
+    def other_thread():
+        with store.lock():
+            acquired.set()
+
+    with store.lock():
+        # set() takes the lock again from the thread holding it
+        store.set('owner', 2024, 'cookie')
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        assert not acquired.wait(0.1)
+    assert acquired.wait(1)
+    thread.join()
+
+def test_sessions_sharing_a_store_log_in_once(tmp_path, key, transport):
+    store = MFLCookieStore(str(tmp_path / 'cookies'), key)
+    first, second = session(store, transport), session(store, transport)
+    first.login()
+    second.login()
+    assert transport.logins == 1
+    assert first.user_cookie == second.user_cookie == 'login-1'
+
+def test_forced_login_reuses_a_cookie_another_session_stored(tmp_path, key, transport):
+    store = MFLCookieStore(str(tmp_path / 'cookies'), key)
+    first, second = session(store, transport), session(store, transport)
+    first.login()
+    second.login()
+
+    # the stored cookie is the rejected one, log in again
+    first.login(force=True)
+    assert transport.logins == 2
+    assert first.user_cookie == 'login-2'
+
+    # second's cookie was rejected too, but first already stored a newer one
+    second.login(force=True)
+    assert transport.logins == 2
+    assert second.user_cookie == 'login-2'
+    assert store.get('owner', 2024) == 'login-2'
+
+def test_session_without_store_logs_in_every_time(transport):
+    owner = session(None, transport)
+    owner.login()
+    owner.login()
+    assert transport.logins == 2
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from mfl_cache import MFLResponseCache
+from mfl_response import MFLHTTPError
+from mfl_transport import MFLCircuitBreaker, MFLCircuitOpenError, MFLRetryPolicy, MFLTransport
+
+def transport(**kwargs) -> MFLTransport:
+    kwargs.setdefault('retry_policy', MFLRetryPolicy(max_retries=2, backoff_factor=0))
+    return MFLTransport(**kwargs)
+
+def test_retry_status_is_retried_until_success(stub):
+    stub.fail('rosters', 503, count=2)
+    session = stub.session(2024, '12345', transport=transport())
+    assert len(session.rosters().rosters) == 12
+    assert stub.count('rosters') == 3
+
+def test_retry_after_is_honoured(stub):
+    stub.fail('rosters', 429, headers={'Retry-After' : '0.3'})
+    session = stub.session(2024, '12345', transport=transport())
+    started = time.monotonic()
+    session.rosters()
+    assert time.monotonic() - started >= 0.3
+    assert stub.count('rosters') == 2
+
+def test_exhausted_retries_raise_http_error(stub):
+    stub.fail('rosters', 503, count=5, body=b'<html>Service Unavailable</html>')
+    session = stub.session(2024, '12345', transport=transport())
+    with pytest.raises(MFLHTTPError) as error:
+        session.rosters()
+    assert error.value.status_code == 503
+    assert error.value.host == stub.host
+    assert stub.count('rosters') == 3
+
+def test_client_error_is_not_retried(stub):
+    stub.fail('rosters', 404)
+    session = stub.session(2024, '12345', transport=transport())
+    with pytest.raises(MFLHTTPError) as error:
+        session.rosters()
+    assert error.value.status_code == 404
+    assert stub.count('rosters') == 1
+
+def test_unauthorized_logs_in_again_once(stub):
+    stub.fail('rosters', 401)
+    session = stub.session(2024, '12345', username='owner', password='secret', transport=transport())
+    session.user_cookie = 'expired'
+
+    def login(force=False):
+        session.user_cookie = 'fresh'
+    session.login = login
+
+    session.rosters()
+    assert [request.cookie for request in stub.requests] == ['expired', 'fresh']
+
+def test_circuit_breaker_fails_fast(stub):
+    stub.fail('rosters', 503, count=10)
+    breaker = MFLCircuitBreaker(failure_threshold=2, reset_timeout=60)
+    session = stub.session(2024, '12345', transport=transport(retry_policy=MFLRetryPolicy(max_retries=0), circuit_breaker=breaker))
+    for _ in range(2):
+        with pytest.raises(MFLHTTPError):
+            session.rosters()
+    with pytest.raises(MFLCircuitOpenError):
+        session.rosters()
+    assert stub.count('rosters') == 2
+    assert breaker.is_open(stub.host)
+
+def test_stale_entry_is_served_when_the_server_fails(stub):
+    cache = MFLResponseCache(ttls={'rosters' : 0.05})
+    session = stub.session(2024, '12345', transport=transport(cache=cache))
+    fresh = session.rosters().rosters
+    time.sleep(0.1)
+
+    stub.fail('rosters', 503, count=3)
+    assert session.rosters().rosters == fresh
+    assert cache.stale_hits == 1
@@ -0,0 +1,32 @@
+import os
+
+import payloads
+from mfl_history import MFLHistoryLoader
+
+def test_final_week_is_stored_and_read_back(stub, tmp_path):
+    loader = MFLHistoryLoader(stub.session(2024, '12345'), str(tmp_path))
+    loader.load([1])
+    assert loader.is_cached(1)
+    requests = stub.count()
+
+    history = loader.load([1])
+    assert stub.count() == requests
+    assert loader.disk_loads == 1
+    assert len(history[1]['player_scores'].player_scores) == 200
+
+def test_week_in_progress_is_not_stored(stub, tmp_path):
+    stub.bodies['liveScoring'] = payloads.live_scoring(seconds_remaining=1800)
+    loader = MFLHistoryLoader(stub.session(2024, '12345'), str(tmp_path))
+    loader.load([1])
+    assert not os.path.exists(loader.week_directory(1))
+
+def test_error_body_is_not_stored(stub, tmp_path):
+    stub.bodies['playerScores'] = payloads.error('API usage limit exceeded')
+    loader = MFLHistoryLoader(stub.session(2024, '12345'), str(tmp_path))
+    history = loader.load([1])
+    assert history[1]['player_scores'].error == 'API usage limit exceeded'
+    assert not os.path.exists(loader.week_directory(1))
+
+    stub.bodies['playerScores'] = payloads.player_scores(200)
+    loader.load([1])
+    assert loader.is_cached(1)
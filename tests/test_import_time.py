@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# loaded on first use only: requests by the transport, the rest by the modules that need them
+heavy_modules = ('requests', 'urllib3', 'http.client', 'concurrent.futures', 'sqlite3', 'ijson', 'numpy',
+                    'mfl_transport', 'mfl_cache', 'mfl_replay', 'mfl_player_store', 'mfl_pipeline', 'mfl_scoring')
+
+def imported_modules(code: str) -> dict:
+    """module -> cumulative import time in microseconds, from python -X importtime -c code"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=root, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+def test_session_import_stays_light():
+    modules = imported_modules('import session')
+    assert 'session' in modules
+    assert [name for name in heavy_modules if name in modules] == []
+
+def test_package_loads_modules_on_first_access():
+    code = ("import importlib.util, sys\n"
+            "spec = importlib.util.spec_from_file_location('mfl_package', '__init__.py', submodule_search_locations=['.'])\n"
+            "package = importlib.util.module_from_spec(spec)\n"
+            "spec.loader.exec_module(package)\n"
+            "assert not [name for name in sys.modules if name.startswith('mfl_') or name == 'session'], sorted(sys.modules)\n"
+            "package.MFLSingleFlight\n"
+            "assert 'mfl_singleflight' in sys.modules, sorted(sys.modules)\n"
+            "assert 'session' not in sys.modules and 'requests' not in sys.modules, sorted(sys.modules)\n")
+    subprocess.run([sys.executable, '-c', code], cwd=root, check=True)
@@ -0,0 +1,23 @@
+import json
+
+import pytest
+
+from mfl_json import get_decoder, materialize, stdlib_decoder
+import payloads
+
+body = json.dumps(payloads.rosters(franchises=2, players=3)).encode()
+
+@pytest.mark.parametrize('name', ['stdlib', 'orjson', 'simdjson', 'auto'])
+def test_decoders_agree(name):
+    try:
+        decode = get_decoder(name)
+    except ImportError:
+        pytest.skip(f"{name} is not installed")
+    assert materialize(decode(body)) == json.loads(body)
+
+def test_unknown_decoder_is_rejected():
+    with pytest.raises(ValueError):
+        get_decoder('yaml')
+
+def test_callable_is_returned_unchanged():
+    assert get_decoder(stdlib_decoder) is stdlib_decoder
@@ -0,0 +1,70 @@
+import copy
+
+import pytest
+
+import payloads
+from mfl_league_state import LeagueState
+
+def rosters(*franchise_ids, move: str=None) -> dict:
+    """Rosters of 2 franchises with 3 players each, only of franchise_ids when given, with player move traded from 0001 to 0002"""
+    body = copy.deepcopy(payloads.rosters(franchises=2, players=3))
+    franchises = body['rosters']['franchise']
+    if move is not None:
+        player = next(player for player in franchises[0]['player'] if player['id'] == move)
+        franchises[0]['player'].remove(player)
+        franchises[1]['player'].append(player)
+    if franchise_ids:
+        body['rosters']['franchise'] = [franchise for franchise in franchises if franchise['id'] in franchise_ids]
+    return body
+
+def update_rosters(state, stub, session, body):
+    stub.bodies['rosters'] = body
+    return state.update(session.rosters())
+
+def test_full_rosters_update_moves_player(stub):
+    session = stub.session(2024, '12345')
+    state = update_rosters(LeagueState(), stub, session, rosters())
+    assert state.franchise_of('10000') == '0001'
+
+    update_rosters(state, stub, session, rosters(move='10000'))
+    assert state.franchise_of('10000') == '0002'
+    assert '10000' not in state.roster('0001')['players']
+    assert '10000' in state.roster('0002')['players']
+
+def test_new_franchise_first_then_old_franchise(stub):
+    session = stub.session(2024, '12345')
+    state = update_rosters(LeagueState(), stub, session, rosters())
+
+    update_rosters(state, stub, session, rosters('0002', move='10000'))
+    assert state.franchise_of('10000') == '0002'
+    # the old roster no longer holding the player must not clear the new franchise
+    update_rosters(state, stub, session, rosters('0001', move='10000'))
+    assert state.franchise_of('10000') == '0002'
+
+def test_old_franchise_first_then_new_franchise(stub):
+    session = stub.session(2024, '12345')
+    state = update_rosters(LeagueState(), stub, session, rosters())
+
+    update_rosters(state, stub, session, rosters('0001', move='10000'))
+    assert state.franchise_of('10000') is None
+    update_rosters(state, stub, session, rosters('0002', move='10000'))
+    assert state.franchise_of('10000') == '0002'
+
+@pytest.mark.parametrize('week', [3, '3'])
+def test_lookup_normalizes_week(stub, week):
+    stub.bodies['rosters'] = rosters()
+    stub.bodies['playerScores'] = payloads.player_scores(10, week=3)
+    stub.bodies['players'] = payloads.players(10)
+    state = LeagueState().refresh(stub.session(2024, '12345'), week=week)
+
+    franchise_id, player, score = state.lookup('10001', week)
+    assert franchise_id == '0001'
+    assert player.name == 'Player1, Stub'
+    assert score is state.score('10001', 3) is state.score('10001', '3')
+    assert score is not None
+    assert state.lookup('10001', 4) == ('0001', player, None)
+    assert state.lookup('99999', 3) == (None, None, None)
+
+def test_unknown_response_type_is_rejected(stub):
+    with pytest.raises(ValueError):
+        LeagueState().update(stub.session(2024, '12345').live_scoring())
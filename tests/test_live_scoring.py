@@ -0,0 +1,102 @@
+import copy
+
+import payloads
+from mfl_live_scoring import LiveScoringEvent, LiveScoringPoller
+
+def live_scoring(seconds_remaining: int=60) -> dict:
+    return payloads.live_scoring(franchises=2, players=3, seconds_remaining=seconds_remaining)
+
+def franchise(body: dict, index: int=0) -> dict:
+    return body['liveScoring']['matchup'][0]['franchise'][index]
+
+def poller(stub, **kwargs) -> LiveScoringPoller:
+    kwargs.setdefault('min_interval', 10)
+    kwargs.setdefault('max_interval', 30)
+    kwargs.setdefault('idle_interval', 600)
+    kwargs.setdefault('backoff', 2)
+    return LiveScoringPoller(stub.session(2024, '12345'), **kwargs)
+
+def test_first_poll_has_no_events(stub):
+    stub.bodies['liveScoring'] = live_scoring()
+    live = poller(stub)
+    assert live.poll() == []
+    assert set(live.snapshot) == {'0001', '0002'}
+    assert live.polls == 1
+    assert stub.requests[-1].params['TYPE'] == 'liveScoring'
+
+def test_franchise_and_player_field_events(stub):
+    body = live_scoring()
+    stub.bodies['liveScoring'] = body
+    live = poller(stub)
+    live.poll()
+
+    body = copy.deepcopy(body)
+    franchise(body)['score'] = '99.50'
+    franchise(body)['gameSecondsRemaining'] = '30'
+    player = franchise(body)['players']['player'][1]
+    player['score'] = '12.25'
+    player['status'] = 'nonstarter'
+    stub.bodies['liveScoring'] = body
+
+    assert live.poll() == [
+        LiveScoringEvent('0001', None, 'score', float(franchise(live_scoring())['score']), 99.5),
+        LiveScoringEvent('0001', None, 'gameSecondsRemaining', 540, 30),
+        LiveScoringEvent('0001', player['id'], 'score', float(franchise(live_scoring())['players']['player'][1]['score']), 12.25),
+        LiveScoringEvent('0001', player['id'], 'status', 'starter', 'nonstarter'),
+    ]
+
+def test_player_added_and_removed_events(stub):
+    body = live_scoring()
+    stub.bodies['liveScoring'] = body
+    live = poller(stub)
+    live.poll()
+
+    body = copy.deepcopy(body)
+    players = franchise(body, 1)['players']['player']
+    removed = players.pop(0)
+    added = dict(players[0], id='99999')
+    players.append(added)
+    stub.bodies['liveScoring'] = body
+
+    assert live.poll() == [
+        LiveScoringEvent('0002', '99999', 'player', None, added),
+        LiveScoringEvent('0002', removed['id'], 'player', removed, None),
+    ]
+
+def test_unchanged_polls_back_off_and_changes_reset(stub):
+    body = live_scoring()
+    stub.bodies['liveScoring'] = body
+    live = poller(stub)
+    intervals = []
+    for _ in range(4):
+        live.poll()
+        intervals.append(live.interval)
+    assert intervals == [20, 30, 30, 30]
+
+    body = copy.deepcopy(body)
+    franchise(body)['score'] = '99.50'
+    stub.bodies['liveScoring'] = body
+    assert live.poll()
+    assert live.interval == 10
+
+def test_final_games_switch_to_idle_interval(stub):
+    stub.bodies['liveScoring'] = live_scoring(seconds_remaining=0)
+    live = poller(stub)
+    live.poll()
+    assert live.is_final
+    assert live.interval == 600
+
+def test_run_yields_only_non_empty_event_lists(stub):
+    body = live_scoring()
+    changed = copy.deepcopy(body)
+    franchise(changed)['score'] = '99.50'
+    bodies = [body, body, changed]
+    stub.bodies['liveScoring'] = lambda path, params, cookie: bodies[min(live.polls, len(bodies) - 1)]
+    live = poller(stub)
+
+    sleeps = []
+    for events in live.run(sleep=sleeps.append):
+        live.stop()
+    assert [event.field for event in events] == ['score']
+    assert live.polls == 3
+    assert sleeps == [20, 30]
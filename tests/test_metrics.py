@@ -0,0 +1,38 @@
+import threading
+
+from mfl_metrics import MFLHooks, MFLMetricsCollector
+from mfl_singleflight import MFLSingleFlight
+
+def test_bytes_are_counted_once_per_shared_response(stub):
+    stub.delays['rosters'] = 0.2
+    hooks = MFLHooks()
+    metrics = hooks.register(MFLMetricsCollector())
+    session = stub.session(2024, '12345', hooks=hooks, singleflight=MFLSingleFlight())
+
+    barrier = threading.Barrier(10)
+    responses = []
+
+    def call():
+        barrier.wait()
+        responses.append(session.rosters())
+
+    threads = [threading.Thread(target=call) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stub.count('rosters') == 1
+    assert len({id(response) for response in responses}) == 1
+    assert metrics.latency['rosters'].count == 10
+    assert metrics.payload_bytes['rosters'] == len(responses[0].raw_response.content)
+    assert 0 < metrics.wire_bytes['rosters'] < metrics.payload_bytes['rosters']
+
+def test_separate_responses_are_each_counted(stub):
+    hooks = MFLHooks()
+    metrics = hooks.register(MFLMetricsCollector())
+    session = stub.session(2024, '12345', hooks=hooks)
+    size = len(session.rosters().raw_response.content)
+    session.rosters()
+    assert metrics.payload_bytes['rosters'] == 2 * size
+    assert 'mfl_response_bytes_total{type="rosters"} %d' % (2 * size) in metrics.to_prometheus()
@@ -0,0 +1,35 @@
+import pytest
+
+import payloads
+
+numpy = pytest.importorskip('numpy')
+
+from mfl_pipeline import MFLPipeline
+
+def pipeline(stub, **kwargs) -> MFLPipeline:
+    return MFLPipeline(2024, session_options={'host' : stub.host, 'protocol' : 'http'}, **kwargs)
+
+def test_rows_of_every_league_and_week(stub):
+    stub.bodies['playerScores'] = payloads.player_scores(50)
+    result = pipeline(stub, max_workers=2).run(['10001', '10002', '10003'], weeks=[1, 2])
+    assert result.errors == []
+    assert sorted(set(result.rosters['league_id'].tolist())) == [10001, 10002, 10003]
+    assert len(result.rosters) == 3 * 12 * 30
+    assert len(result.scores) == 3 * 2 * 50
+
+def test_failed_league_has_no_rows(stub):
+    def player_scores(path, params, cookie):
+        # the second week of one league is not JSON, its rosters and first week were already fetched
+        return b'<html>' if params['L'] == '10002' and params['W'] == '2' else payloads.player_scores(50, int(params['W']))
+    stub.bodies['playerScores'] = player_scores
+
+    result = pipeline(stub, max_workers=1).run(['10001', '10002', '10003'], weeks=[1, 2])
+    assert [league_id for league_id, _ in result.errors] == ['10002']
+    assert 10002 not in result.rosters['league_id']
+    assert 10002 not in result.scores['league_id']
+    assert len(result.scores) == 2 * 2 * 50
+
+def test_non_numeric_league_id_is_rejected(stub):
+    with pytest.raises(ValueError, match='abc'):
+        pipeline(stub, max_workers=1).run(['10001', 'abc'])
+    assert stub.count() == 0
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+import payloads
+from mfl_player_store import MFLPlayerStore
+from mfl_response import MFLResponseError
+
+def test_sync_full_then_since_delta(stub):
+    session = stub.session(2024, '12345')
+    store = MFLPlayerStore()
+    assert store.sync(session) == 200
+    assert store.timestamp == '1700000000'
+    assert 'SINCE' not in stub.requests[-1].params
+
+    stub.bodies['players'] = payloads.players(3, details=True, timestamp=1700000500)
+    assert store.sync(session) == 3
+    assert stub.requests[-1].params['SINCE'] == '1700000000'
+    assert store.timestamp == '1700000500'
+    assert len(store) == 200
+
+def test_error_body_leaves_store_untouched(stub):
+    session = stub.session(2024, '12345')
+    store = MFLPlayerStore()
+    store.sync(session)
+    synced_at = store.synced_at
+
+    stub.bodies['players'] = payloads.error('API usage limit exceeded')
+    with pytest.raises(MFLResponseError, match='API usage limit exceeded'):
+        store.sync(session)
+    assert store.timestamp == '1700000000'
+    assert store.synced_at == synced_at
+
+def test_body_without_timestamp_is_rejected(stub):
+    session = stub.session(2024, '12345')
+    store = MFLPlayerStore()
+    stub.bodies['players'] = {'players' : {'player' : [{'id' : '1', 'name' : 'Doe, John', 'position' : 'QB', 'team' : 'KCC'}]}}
+    with pytest.raises(MFLResponseError):
+        store.sync(session)
+    assert store.timestamp is None
+    assert store.synced_at == 0
+    assert len(store) == 0
+
+def test_concurrent_stale_lookups_sync_once(stub):
+    stub.delays['players'] = 0.1
+    store = MFLPlayerStore()
+    session = stub.session(2024, '12345', player_store=store)
+    barrier = threading.Barrier(8)
+    counts = []
+
+    def lookup():
+        barrier.wait()
+        counts.append(len(session.players().players))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counts == [200] * 8
+    assert stub.count('players') == 1
+
+def test_session_of_another_season_replaces_the_store(stub):
+    def players(path, params, cookie):
+        # 2023 had fewer players, with a timestamp of its own
+        return payloads.players(5, timestamp=1600000000) if path.startswith('/2023/') else payloads.players(200)
+    stub.bodies['players'] = players
+    store = MFLPlayerStore()
+    current = stub.session(2024, '12345', player_store=store)
+    previous = stub.session(2023, '12345', player_store=store)
+
+    assert len(current.players().players) == 200
+    assert store.year == '2024'
+
+    assert len(previous.players().players) == 5
+    assert 'SINCE' not in stub.requests[-1].params
+    assert stub.requests[-1].path == '/2023/export'
+    assert (store.year, store.timestamp, len(store)) == ('2023', '1600000000', 5)
+
+    assert len(current.players().players) == 200
+    assert 'SINCE' not in stub.requests[-1].params
+    assert stub.count('players') == 3
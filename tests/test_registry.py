@@ -0,0 +1,42 @@
+import pytest
+
+import payloads
+from mfl_batch import MFLBatchEngine
+from mfl_cache import MFLResponseCache
+from mfl_request import MFLEndpoint, MFLExportRequest, MFLParam, endpoints
+from mfl_response import MFLRulesResponse
+from session import MyFantasyLeagueAPISession, add_endpoint_methods
+
+@pytest.fixture
+def accolades_endpoint():
+    class MFLAccoladesRequest(MFLExportRequest):
+        endpoint = MFLEndpoint('accolades', "accolades", (
+            MFLParam('league_id', 'L', required=True),
+        ), MFLRulesResponse, ttl=900, priority=5)
+    yield MFLAccoladesRequest.endpoint
+    del endpoints['accolades']
+
+def test_cache_ttls_come_from_the_registry():
+    ttls = MFLResponseCache().ttls
+    assert ttls == {endpoint.request_type : endpoint.ttl for endpoint in endpoints.values()}
+    assert ttls['liveScoring'] == 0
+    assert MFLResponseCache(ttls={'liveScoring' : 5}).ttls['liveScoring'] == 5
+
+def test_new_endpoint_gets_caching_and_priority(stub, accolades_endpoint):
+    assert MFLResponseCache().ttl_for({'TYPE' : 'accolades'}) == 900
+    with MFLBatchEngine(stub.session(2024, '12345'), max_workers=1) as engine:
+        assert engine.submit('live_scoring', '12345').priority == 0
+        assert engine.submit('rosters', '12345').priority == 20
+        assert engine.submit('accolades', '12345').priority == 5
+        assert engine.submit('refresh_everything', '12345').priority == MFLBatchEngine.default_priority
+        list(engine.as_completed())
+
+def test_new_endpoint_gets_a_session_method(stub, accolades_endpoint):
+    stub.bodies['accolades'] = payloads.rules()
+    session = stub.session(2024, '12345')
+    add_endpoint_methods(type(session))
+    try:
+        assert session.accolades().position_rules
+        assert stub.requests[-1].params == {'TYPE' : 'accolades', 'L' : '12345', 'JSON' : '1'}
+    finally:
+        del MyFantasyLeagueAPISession.accolades
@@ -0,0 +1,17 @@
+import pytest
+
+from mfl_replay import MFLRecordingTransport, MFLReplayMissError, MFLReplayTransport
+from session import MyFantasyLeagueAPISession
+
+def test_recorded_exports_replay_without_network(stub, tmp_path):
+    path = str(tmp_path / 'exports.zip')
+    recording = stub.session(2024, '12345', transport=MFLRecordingTransport(path))
+    rosters = recording.rosters(week=1).rosters
+    players = list(recording.players(details=True, stream=True).iter_players())
+    recording.close()
+
+    session = MyFantasyLeagueAPISession(2024, '12345', transport=MFLReplayTransport(path))
+    assert session.rosters(week=1).rosters == rosters
+    assert list(session.players(details=True, stream=True).iter_players()) == players
+    with pytest.raises(MFLReplayMissError):
+        session.rosters(week=2)
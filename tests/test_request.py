@@ -0,0 +1,44 @@
+import pytest
+
+from mfl_request import MFLLeagueRequest, MFLPlayerScoresRequest, MFLRostersRequest, chunk_player_ids
+
+def test_params_are_validated_and_serialized():
+    request = MFLRostersRequest('12345', week='3')
+    assert request.request_params == {'TYPE' : 'rosters', 'L' : '12345', 'W' : 3, 'JSON' : 1}
+    with pytest.raises(ValueError):
+        MFLRostersRequest(None)
+    with pytest.raises(ValueError):
+        MFLRostersRequest('12345', week='third')
+    with pytest.raises(TypeError):
+        MFLRostersRequest('12345', season=2024)
+
+def test_request_year_overrides_session_year(stub):
+    session = stub.session(2024, '12345')
+    session.player_scores(week=1)
+    session.player_scores(week=1, year=2021)
+    session.rosters()
+    assert [request.path for request in stub.requests] == ['/2024/export', '/2021/export', '/2024/export']
+    assert 'year' not in MFLPlayerScoresRequest('12345', 1, 2021).request_params
+
+def test_bulk_player_scores_uses_year(stub):
+    session = stub.session(2024, '12345')
+    scores = session.bulk_player_scores(range(10000, 10250), weeks=[1, 2], year=2022, chunk_size=100)
+    assert {request.path for request in stub.requests} == {'/2022/export'}
+    assert stub.count('playerScores') == 6
+    assert len(scores) == 200
+
+def test_chunks_respect_size_and_length():
+    chunks = chunk_player_ids(range(1000, 1250), chunk_size=100, max_length=300)
+    assert ','.join(chunks).split(',') == [str(player_id) for player_id in range(1000, 1250)]
+    assert all(len(chunk) <= 300 and chunk.count(',') < 100 for chunk in chunks)
+
+@pytest.mark.parametrize('fields, keys', [('name', ['name']), (['name'], ['name']), (('name', 'icon'), ['icon', 'name'])])
+def test_league_fields_keep_only_those_keys(stub, fields, keys):
+    franchises = stub.session(2024, '12345').league(fields=fields).franchises
+    assert all(sorted(franchise) == keys for franchise in franchises.values())
+    assert franchises['0001']['name'] == 'Franchise 0001'
+
+def test_bare_string_field_is_one_key():
+    assert MFLLeagueRequest('12345', fields='name').fields == ('name',)
+    assert MFLLeagueRequest('12345', fields=['name', 'icon']).fields == ('icon', 'name')
+    assert MFLLeagueRequest('12345').fields is None
@@ -0,0 +1,50 @@
+import json
+
+import payloads
+from mfl_response import MFLRostersResponse, MFLPlayersResponse, as_list, dig
+from mfl_transport import build_response
+
+def rosters_response(decoder=None):
+    body = json.dumps(payloads.rosters(franchises=4, players=5)).encode()
+    return MFLRostersResponse(build_response('http://stub/2024/export', 200, {'Content-Type' : 'application/json'}, body), decoder=decoder)
+
+class CountingDecoder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, content):
+        self.calls += 1
+        return json.loads(content)
+
+def test_body_is_decoded_once():
+    decoder = CountingDecoder()
+    response = rosters_response(decoder)
+    for _ in range(10):
+        response.json_response
+        response.rosters
+        response.week
+    assert decoder.calls == 1
+
+def test_derived_views_are_cached():
+    response = rosters_response()
+    assert response.rosters is response.rosters
+    assert response.week == '1'
+    assert len(response.rosters) == 4
+    assert len(response.rosters['0001']['players']) == 5
+
+def test_invalidate_rebuilds_from_raw_response():
+    decoder = CountingDecoder()
+    response = rosters_response(decoder)
+    rosters = response.rosters
+    response.invalidate()
+    assert response.rosters is not rosters
+    assert response.rosters == rosters
+    assert decoder.calls == 2
+
+def test_single_record_is_normalized_to_a_list():
+    body = json.dumps({'players' : {'timestamp' : '1', 'player' : {'id' : '1', 'name' : 'Doe, John', 'position' : 'QB', 'team' : 'KCC'}}}).encode()
+    response = MFLPlayersResponse(build_response('http://stub/2024/export', 200, {}, body))
+    assert list(response.players) == ['1']
+    assert as_list(None) == []
+    assert dig({'a' : [{'b' : 1}]}, 'a', 0, 'b') == 1
+    assert dig({'a' : []}, 'a', 0, 'b') is None
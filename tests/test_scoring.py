@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from mfl_replay import MFLReplayTransport
+from mfl_scoring import MFLRuleSet, MFLScoringEngine, MFLScoringRule, parse_points, parse_range, stats_to_arrays
+from session import MyFantasyLeagueAPISession
+
+fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+@pytest.mark.parametrize('text, expected', [
+    ('0-999', (0.0, 999.0)),
+    ('-99--1', (-99.0, -1.0)),
+    ('-50-999', (-50.0, 999.0)),
+    ('5', (5.0, 5.0)),
+    (' 1 - 6 ', (1.0, 6.0)),
+    ('0.5-1.5', (0.5, 1.5)),
+])
+def test_parse_range(text, expected):
+    assert parse_range(text) == expected
+
+@pytest.mark.parametrize('text', ['', None, 'abc', '1-', '1-2-3'])
+def test_parse_range_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_range(text)
+
+@pytest.mark.parametrize('text, expected', [
+    ('*.04', ('per_unit', 0.04, 1.0)),
+    ('*-2', ('per_unit', -2.0, 1.0)),
+    ('1/25', ('per_n', 1.0, 25.0)),
+    ('6', ('flat', 6.0, 1.0)),
+    ('-2', ('flat', -2.0, 1.0)),
+])
+def test_parse_points(text, expected):
+    assert parse_points(text) == expected
+
+@pytest.mark.parametrize('text', ['*', '1/', 'six', '*x'])
+def test_parse_points_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_points(text)
+
+def score(rules, values, position='QB'):
+    """Points of one player over len(values) weeks of a single event 'E'"""
+    engine = MFLScoringEngine(MFLRuleSet({position : rules}))
+    stats = {'E' : numpy.array([values], dtype=float)}
+    return engine.score(stats, [position])[0, 0].tolist()
+
+def test_flat_rule_scores_once_inside_its_range():
+    assert score([MFLScoringRule('E', 100, 149, 'flat', 3.0)], [99, 100, 149, 150]) == [0.0, 3.0, 3.0, 0.0]
+
+def test_per_unit_rule_multiplies_the_value():
+    assert score([MFLScoringRule('E', 0, 99, 'per_unit', 0.5)], [0, 3, 7, 100]) == [0.0, 1.5, 3.5, 0.0]
+
+def test_per_n_rule_counts_full_units():
+    assert score([MFLScoringRule('E', 0, 999, 'per_n', 1.0, 25.0)], [24, 25, 287, 310]) == [0.0, 1.0, 11.0, 12.0]
+
+def test_missing_week_scores_nothing():
+    assert score([MFLScoringRule('E', 0, 999, 'per_unit', 1.0)], [float('nan'), 4]) == [0.0, 4.0]
+
+def test_rules_only_apply_to_their_positions():
+    engine = MFLScoringEngine(MFLRuleSet({'QB' : [MFLScoringRule('E', 0, 99, 'per_unit', 4.0)]}))
+    points = engine.score({'E' : numpy.array([[2.0], [2.0]])}, ['QB', 'RB'])
+    assert points[0, :, 0].tolist() == [8.0, 0.0]
+
+def test_override_scores_every_rule_set_in_one_engine():
+    rule_set = MFLRuleSet({'QB' : [MFLScoringRule('#P', 0, 99, 'per_unit', 4.0)]})
+    what_if = rule_set.override('#P', '*6')
+    points = MFLScoringEngine([rule_set, what_if]).score({'#P' : numpy.array([[3.0]])}, ['QB'])
+    assert points[:, 0, 0].tolist() == [12.0, 18.0]
+
+def test_engine_matches_recorded_player_scores():
+    session = MyFantasyLeagueAPISession(2024, '12345', transport=MFLReplayTransport(os.path.join(fixtures, 'scoring.zip')))
+    with open(os.path.join(fixtures, 'scoring_stats.json')) as stats_file:
+        fixture = json.load(stats_file)
+
+    player_ids = sorted(fixture['positions'])
+    weeks = sorted(fixture['stats'])
+    records = {(player_id, week) : stats for week, players in fixture['stats'].items() for player_id, stats in players.items()}
+    rule_set = MFLRuleSet.from_response(session.rules())
+    points = MFLScoringEngine(rule_set).score(stats_to_arrays(records, player_ids, weeks, rule_set.events),
+                                                [fixture['positions'][player_id] for player_id in player_ids])
+
+    compared = 0
+    for column, week in enumerate(weeks):
+        for player_id, player_score in session.player_scores(week=week).player_scores.items():
+            assert points[0, player_ids.index(player_id), column] == pytest.approx(player_score.score), (player_id, week)
+            compared += 1
+    assert compared == 11
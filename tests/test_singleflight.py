@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from mfl_singleflight import MFLSingleFlight
+
+callers = 100
+
+def burst(function, count: int=callers) -> list:
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def call(index):
+        barrier.wait()
+        results[index] = function()
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_identical_callers_share_one_upstream_request(stub):
+    stub.delays['rosters'] = 0.3
+    singleflight = MFLSingleFlight()
+    session = stub.session(2024, '12345', singleflight=singleflight)
+
+    responses = burst(session.rosters)
+    assert stub.count('rosters') == 1
+    assert len({id(response) for response in responses}) == 1
+    assert singleflight.calls == 1
+    assert singleflight.shared == callers - 1
+
+def test_distinct_requests_are_not_coalesced(stub):
+    session = stub.session(2024, '12345', singleflight=MFLSingleFlight())
+    session.rosters(week=1)
+    session.rosters(week=2)
+    assert stub.count('rosters') == 2
+
+def test_ttl_shares_finished_results(stub):
+    session = stub.session(2024, '12345', singleflight=MFLSingleFlight(ttl=60))
+    assert session.rosters() is session.rosters()
+    assert stub.count('rosters') == 1
+
+def test_failures_are_not_kept():
+    singleflight = MFLSingleFlight(ttl=60)
+
+    def fail():
+        raise ValueError("upstream failed")
+    with pytest.raises(ValueError):
+        singleflight.do('key', fail)
+    assert singleflight.do('key', lambda: 'ok') == 'ok'
+    assert singleflight.calls == 2
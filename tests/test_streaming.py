@@ -0,0 +1,43 @@
+import pytest
+
+import payloads
+from mfl_response import MFLResponseError
+
+def test_streamed_records_match_buffered(stub):
+    session = stub.session(2024, '12345')
+    streamed = list(session.players(details=True, stream=True).iter_players())
+    assert streamed == payloads.players(200, details=True)['players']['player']
+
+def test_streamed_error_body_raises(stub):
+    stub.bodies['players'] = payloads.error('API usage limit exceeded')
+    session = stub.session(2024, '12345')
+    response = session.players(stream=True)
+    with pytest.raises(MFLResponseError, match='API usage limit exceeded'):
+        list(response.iter_players())
+    assert response.error == 'API usage limit exceeded'
+    assert not response.is_auth_error
+
+def test_streamed_auth_error_logs_in_again_once(stub):
+    def players(path, params, cookie):
+        return payloads.players(3) if cookie == 'fresh' else payloads.error('Invalid cookie, you need to be logged in')
+    stub.bodies['players'] = players
+    session = stub.session(2024, '12345', username='owner', password='secret')
+    session.user_cookie = 'expired'
+
+    logins = []
+    def login(force=False):
+        logins.append(force)
+        session.user_cookie = 'fresh'
+    session.login = login
+
+    assert [player['id'] for player in session.players(stream=True).iter_players()] == payloads.player_ids(3)
+    assert logins == [True]
+    assert [request.cookie for request in stub.requests] == ['expired', 'fresh']
+
+def test_streamed_auth_error_without_credentials_raises(stub):
+    stub.bodies['players'] = payloads.error('Invalid cookie, you need to be logged in')
+    response = stub.session(2024, '12345').players(stream=True)
+    with pytest.raises(MFLResponseError):
+        list(response.iter_players())
+    assert response.is_auth_error
+    assert stub.count('players') == 1
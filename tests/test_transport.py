@@ -0,0 +1,18 @@
+from mfl_transport import MFLTransport
+
+def test_pooled_transport_reuses_one_connection(stub):
+    session = stub.session(2024, '12345', transport=MFLTransport())
+    for week in range(1, 11):
+        session.rosters(week=week)
+    assert stub.connections == 1
+
+def test_keep_alive_off_opens_a_connection_per_request(stub):
+    session = stub.session(2024, '12345', transport=MFLTransport(keep_alive=False))
+    for week in range(1, 11):
+        session.rosters(week=week)
+    assert stub.connections == 10
+
+def test_accept_encoding(stub):
+    stub.session(2024, '12345', transport=MFLTransport()).rosters()
+    stub.session(2024, '12345', transport=MFLTransport(compress=False)).rosters()
+    assert [request.headers['Accept-Encoding'] for request in stub.requests] == [MFLTransport().accept_encoding, 'identity']